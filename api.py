@@ -0,0 +1,325 @@
+import asyncio
+import base64
+import concurrent.futures
+import hashlib
+import json
+import struct
+import threading
+from urllib.parse import parse_qsl, urlsplit
+
+# API local de control y estado. Solo escucha en la interfaz de loopback:
+#   GET  /status          estado actual
+#   POST /start, /pause, /resume, /reset
+#   POST /mode?mode=...   (o cuerpo JSON {"mode": "..."})
+#   GET  /events          WebSocket con los eventos (tick, state, start, pause,
+#                         resume, reset, mode_change, finish); también acepta
+#                         comandos {"command": "start"}
+# Cada evento se serializa y se enmarca una sola vez y el mismo bloque de bytes
+# se encola a todos los clientes. Las colas son acotadas: un cliente que no
+# consume a tiempo se desconecta en lugar de acumular memoria.
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+QUEUE_SIZE = 64
+MAX_HEADER = 8192
+MAX_BODY = 4096
+MAX_MESSAGE = 4096
+COMMAND_TIMEOUT = 5.0
+CLOSE_TIMEOUT = 1.0
+# Comandos de los clientes (POST /<comando> o por WebSocket); los demás que
+# entiende el manejador, como "subscribe", son internos del servidor
+COMMANDS = ("start", "pause", "resume", "reset", "mode")
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# Códigos de la trama de cierre (RFC 6455, 7.4.1)
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_TOO_BIG = 1009
+
+LOOPBACK_NAMES = ("127.0.0.1", "localhost", "::1")
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+def encode_frame(opcode, payload):
+    # Tramas del servidor: sin máscara y en un solo fragmento
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+def encode_event(kind, data):
+    message = dict(data, type=kind)
+    return encode_frame(OP_TEXT, json.dumps(message, separators=(",", ":")).encode("utf-8"))
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1(key.encode("ascii") + WS_GUID).digest()).decode("ascii")
+
+def is_loopback(value):
+    # Host u Origin deben apuntar a loopback (evita el "DNS rebinding" desde un navegador)
+    try:
+        host = urlsplit(value if "://" in value else "//" + value).hostname
+    except ValueError:
+        return False
+    return host in LOOPBACK_NAMES
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class Client:
+    def __init__(self, writer):
+        self.writer = writer
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.closed = False
+
+class ControlServer:
+    # handler(command, params) corre en el hilo de la interfaz (vía schedule) y
+    # devuelve el estado como dict; un ValueError se responde como 400 y
+    # cualquier otro error como 500 (503 si la aplicación se está cerrando).
+    def __init__(self, handler, schedule, port=DEFAULT_PORT, host=HOST):
+        self.handler = handler
+        self.schedule = schedule
+        self.host = host
+        self.port = port
+        self.clients = set()
+        self.loop = None
+        self.server = None
+        self.ready = threading.Event()
+        self.error = None
+        self.closing = False
+        self.thread = threading.Thread(target=self.run, name="pomodoro-api", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.ready.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self.handle, self.host, self.port, limit=MAX_HEADER))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            self.loop.close()
+            return
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            # Al cortar las conexiones, las corrutinas de cada cliente terminan solas
+            for client in list(self.clients):
+                self.drop(client)
+            self.loop.run_until_complete(asyncio.sleep(0.1))
+            self.loop.close()
+
+    def stop(self):
+        self.closing = True
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+
+    def publish(self, kind, data):
+        # Llamado desde el hilo de la interfaz; sin clientes no se serializa nada
+        if not self.clients or self.loop is None:
+            return
+        frame = encode_event(kind, data)
+        self.loop.call_soon_threadsafe(self.broadcast, frame)
+
+    def broadcast(self, frame):
+        for client in list(self.clients):
+            try:
+                client.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self.drop(client)
+
+    def drop(self, client):
+        if not client.closed:
+            client.closed = True
+            self.clients.discard(client)
+            client.writer.transport.abort()
+
+    async def call(self, command, params):
+        # Ejecuta el comando en el hilo de la interfaz y espera el resultado
+        future = concurrent.futures.Future()
+        def run():
+            try:
+                future.set_result(self.handler(command, params))
+            except Exception as e:
+                future.set_exception(e)
+        try:
+            self.schedule(run)
+            return await asyncio.wait_for(asyncio.wrap_future(future), COMMAND_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ApiError(503, "La interfaz no respondió a tiempo") from None
+        except ValueError as e:
+            raise ApiError(400, str(e)) from None
+        except Exception as e:
+            # P. ej. TclError o RuntimeError de Tk mientras se cierra la ventana
+            if self.closing:
+                raise ApiError(503, "La aplicación se está cerrando") from None
+            raise ApiError(500, f"Error interno: {e}") from None
+
+    async def handle(self, reader, writer):
+        try:
+            method, path, headers = await self.read_request(reader)
+            url = urlsplit(path)
+            if url.path == "/events":
+                if headers.get("upgrade", "").lower() != "websocket" or "sec-websocket-key" not in headers:
+                    raise ApiError(400, "Se esperaba una conexión WebSocket")
+                await self.stream(reader, writer, headers["sec-websocket-key"])
+                return
+            params = dict(parse_qsl(url.query))
+            command = url.path[1:]
+            if method == "GET" and url.path == "/status":
+                result = await self.call("status", params)
+            elif method == "POST" and command in COMMANDS:
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY:
+                    raise ApiError(413, "Cuerpo demasiado grande")
+                if length:
+                    params.update(self.parse_json(await reader.readexactly(length)))
+                result = await self.call(command, params)
+            elif url.path == "/status" or command in COMMANDS:
+                raise ApiError(405, "Método no permitido")
+            else:
+                raise ApiError(404, "Ruta desconocida")
+            await self.respond(writer, 200, result)
+        except ApiError as e:
+            await self.respond(writer, e.status, {"error": str(e)})
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise ApiError(400, "Petición mal formada") from None
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        if not is_loopback(headers.get("host", "")):
+            raise ApiError(403, "Host no permitido")
+        if "origin" in headers and not is_loopback(headers["origin"]):
+            raise ApiError(403, "Origen no permitido")
+        return method, path, headers
+
+    def parse_json(self, body):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            raise ApiError(400, "JSON inválido") from None
+        if not isinstance(data, dict):
+            raise ApiError(400, "Se esperaba un objeto JSON")
+        return data
+
+    async def respond(self, writer, status, data):
+        body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                     "Content-Type: application/json; charset=utf-8\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     "Connection: close\r\n\r\n".encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def stream(self, reader, writer, key):
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                      "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n").encode("latin-1"))
+        client = Client(writer)
+        self.clients.add(client)
+        client.queue.put_nowait(encode_event("state", await self.call("subscribe", {})))
+        sender = asyncio.ensure_future(self.send_loop(client))
+        try:
+            code = await self.receive_loop(reader, client)
+            # Cierre ordenado: la trama de cierre se escribe antes de soltar al cliente
+            if code is not None:
+                self.reply(client, encode_frame(OP_CLOSE, code))
+                if not client.closed:
+                    try:
+                        await asyncio.wait_for(sender, CLOSE_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+
+    async def send_loop(self, client):
+        try:
+            while True:
+                frame = await client.queue.get()
+                client.writer.write(frame)
+                await client.writer.drain()
+                if frame[0] & 0x0F == OP_CLOSE:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.drop(client)
+
+    async def receive_loop(self, reader, client):
+        # Devuelve el contenido de la trama de cierre que hay que enviar, o None
+        # si el cliente ya se soltó
+        while not client.closed:
+            first, second = await reader.readexactly(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if not second & 0x80:
+                # Los clientes deben enmascarar sus tramas
+                return struct.pack("!H", CLOSE_PROTOCOL_ERROR)
+            if length == 126:
+                (length,) = struct.unpack("!H", await reader.readexactly(2))
+            elif length == 127:
+                (length,) = struct.unpack("!Q", await reader.readexactly(8))
+            if length > MAX_MESSAGE:
+                return struct.pack("!H", CLOSE_TOO_BIG)
+            mask = await reader.readexactly(4)
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(length)))
+            if opcode == OP_CLOSE:
+                return payload[:2]
+            if opcode == OP_PING:
+                self.reply(client, encode_frame(OP_PONG, payload))
+            elif opcode == OP_TEXT:
+                await self.command(client, payload)
+
+    async def command(self, client, payload):
+        try:
+            params = self.parse_json(payload)
+            name = params.pop("command", None)
+            if not isinstance(name, str):
+                raise ApiError(400, "Falta el comando")
+            if name not in COMMANDS:
+                raise ApiError(400, f"Comando desconocido: {name}")
+            await self.call(name, params)
+        except ApiError as e:
+            # Los resultados llegan como eventos; solo los errores van a un cliente
+            self.reply(client, encode_event("error", {"error": str(e)}))
+
+    def reply(self, client, frame):
+        try:
+            client.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.drop(client)
@@ -0,0 +1,101 @@
+import array
+import math
+import os
+import threading
+
+# Sonido por modo: archivo opcional junto al programa y, si no se puede cargar,
+# un tono sintetizado con estas notas (Hz). "loops" son las repeticiones extra.
+DEFAULT_CUES = {
+    "Pomodoro": {"file": "alarm_sound.mp3", "notes": (880, 660, 880), "loops": 0},
+    "Descanso Corto": {"file": "alarm_sound.mp3", "notes": (523, 659), "loops": 0},
+    "Descanso Largo": {"file": "alarm_sound.mp3", "notes": (523, 659, 784), "loops": 0},
+}
+
+NOTE_SECONDS = 0.18
+FADE_SECONDS = 0.01
+
+class AudioManager:
+    # Decodifica los sonidos de aviso una sola vez en buffers mixer.Sound y los
+    # reproduce en un canal reservado. La carga corre en un hilo aparte la
+    # primera vez que se pide, así que play() nunca lee ni decodifica nada.
+    def __init__(self, base_dir, cues=None, volume=0.8):
+        self.base_dir = base_dir
+        self.cues = cues or DEFAULT_CUES
+        self.volume = volume
+        self.sounds = {}
+        self.channel = None
+        self.ready = threading.Event()
+        self.loading = False
+
+    def preload(self):
+        if self.loading:
+            return
+        self.loading = True
+        threading.Thread(target=self.load, name="pomodoro-audio", daemon=True).start()
+
+    def load(self):
+        try:
+            from pygame import mixer
+            if not mixer.get_init():
+                mixer.init()
+            # Canal 0 reservado: la reproducción automática de pygame no lo usa
+            mixer.set_reserved(1)
+            self.channel = mixer.Channel(0)
+            decoded = {}
+            by_path = {}
+            for mode, cue in self.cues.items():
+                decoded[mode] = self.load_cue(mixer, cue, by_path)
+            self.sounds = decoded
+            self.ready.set()
+        except Exception as e:
+            print("Error al inicializar el audio:", e)
+
+    def load_cue(self, mixer, cue, by_path):
+        path = cue.get("file")
+        if path:
+            if not os.path.isabs(path):
+                path = os.path.join(self.base_dir, path)
+            # Varios modos pueden compartir archivo: se decodifica una sola vez
+            if path in by_path:
+                return by_path[path]
+            if os.path.exists(path):
+                try:
+                    by_path[path] = mixer.Sound(path)
+                    return by_path[path]
+                except Exception as e:
+                    print(f"Error al decodificar {path}:", e)
+        return mixer.Sound(buffer=self.synthesize(mixer, cue.get("notes") or (880,)))
+
+    def synthesize(self, mixer, notes):
+        # Tono senoidal en PCM de 16 bits con el formato que usa el mezclador
+        frequency, _, channels = mixer.get_init()
+        note_samples = int(frequency * NOTE_SECONDS)
+        fade = max(1, int(frequency * FADE_SECONDS))
+        samples = array.array("h")
+        for note in notes:
+            step = 2 * math.pi * note / frequency
+            for i in range(note_samples):
+                envelope = min(1.0, i / fade, (note_samples - i) / fade)
+                value = int(16000 * envelope * math.sin(step * i))
+                samples.extend([value] * channels)
+        return samples.tobytes()
+
+    def set_volume(self, volume):
+        self.volume = max(0.0, min(1.0, volume))
+        if self.channel is not None:
+            self.channel.set_volume(self.volume)
+
+    def play(self, mode):
+        # Devuelve False si el audio aún no está listo o no está disponible
+        if not self.ready.is_set():
+            return False
+        sound = self.sounds.get(mode)
+        if sound is None:
+            return False
+        self.channel.set_volume(self.volume)
+        self.channel.play(sound, loops=self.cues.get(mode, {}).get("loops", 0))
+        return True
+
+    def stop(self):
+        if self.channel is not None:
+            self.channel.stop()
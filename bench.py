@@ -0,0 +1,334 @@
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+from core import MODES, VirtualClock
+from instrumentation import rss_bytes
+from main import PomodoroApp
+from theme import DEFAULT_THEME, PALETTES
+
+# Banco de pruebas de rendimiento. Corre bajo un servidor X virtual (Xvfb) si
+# no hay pantalla, con una carpeta de datos temporal y sin red, así que los
+# resultados se pueden repetir y comparar entre versiones:
+#   python bench.py --output actual.json --compare anterior.json
+# Mide el arranque en frío hasta el primer cuadro, el costo de CPU por tick en
+# modo normal y compacto, la latencia de toggle_compact_mode, change_mode y
+# del cambio de tema, y la memoria y el número de widgets a lo largo de una jornada simulada.
+HERE = os.path.dirname(os.path.abspath(__file__))
+REGRESSION = 0.10     # --compare marca empeoramientos de más del 10 %
+# Solo se comparan costos, donde menos es mejor: tiempos, memoria, widgets que
+# quedan y arranques fallidos. El resto (pomodoros, horas simuladas) describe
+# la corrida y no puede empeorar.
+COST_SUFFIXES = ("_ms", "_us", "_bytes")
+COST_NAMES = ("widget_growth", "failed")
+STARTUP_TIMEOUT = 60  # segundos por arranque antes de darlo por fallido
+
+def start_xvfb():
+    # -displayfd deja que Xvfb elija un número de pantalla libre y lo escriba
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen(["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "1280x1024x24",
+                                "-nolisten", "tcp"], pass_fds=(write_fd,),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        display = f.readline().strip()
+    if not display:
+        process.kill()
+        raise RuntimeError("Xvfb no informó la pantalla")
+    os.environ["DISPLAY"] = ":" + display
+    return process
+
+def isolate(home):
+    # Datos en una carpeta temporal y sin descargar el ícono, también para los
+    # procesos hijos
+    os.environ.update(POMODORO_HOME=home, POMODORO_OFFLINE="1")
+    return dict(os.environ)
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+def parse_startup_report(text):
+    phases = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            try:
+                phases[parts[0]] = float(parts[1])
+            except ValueError:
+                pass
+    return phases
+
+def output_tail(output, lines=20):
+    # La salida parcial de un proceso cortado por tiempo llega como bytes
+    if isinstance(output, bytes):
+        output = output.decode(errors="replace")
+    return "\n".join((output or "").splitlines()[-lines:])
+
+def bench_startup(runs, home):
+    # Cada arranque es un proceso nuevo: incluye importar Python y Tk. Un
+    # arranque que se cuelga o no informa se anota como fallido y se sigue
+    # con el resto; las estadísticas solo usan los que terminaron.
+    env = isolate(home)
+    first_frame = []
+    process_wall = []
+    phases = {}
+    failures = []
+    for run in range(runs):
+        started = time.perf_counter()
+        try:
+            result = subprocess.run([sys.executable, os.path.join(HERE, "main.py"),
+                                     "--startup-check", "1e9"],
+                                    env=env, capture_output=True, text=True, timeout=STARTUP_TIMEOUT)
+        except subprocess.TimeoutExpired as e:
+            failures.append({"run": run, "error": f"sin terminar tras {STARTUP_TIMEOUT} s",
+                             "stderr": output_tail(e.stderr)})
+            print(f"Arranque {run + 1}: sin terminar tras {STARTUP_TIMEOUT} s", file=sys.stderr)
+            continue
+        elapsed = (time.perf_counter() - started) * 1000
+        report = parse_startup_report(result.stderr)
+        if "total" not in report:
+            failures.append({"run": run, "error": f"sin informe (código {result.returncode})",
+                             "stderr": output_tail(result.stderr)})
+            print(f"Arranque {run + 1}: sin informe (código {result.returncode})", file=sys.stderr)
+            continue
+        process_wall.append(elapsed)
+        first_frame.append(report.pop("total"))
+        for phase, value in report.items():
+            phases.setdefault(phase, []).append(value)
+    results = {"failed": len(failures)}
+    if first_frame:
+        results.update(first_frame_ms=summarize(first_frame), process_ms=summarize(process_wall),
+                       phases_median_ms={phase: statistics.median(v) for phase, v in phases.items()})
+    if failures:
+        results["failures"] = failures
+    return results
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+class AppHarness:
+    # Aplicación real sobre un reloj virtual: cada tick avanza un segundo
+    # simulado y ejecuta el mismo trabajo que el planificador de Tk.
+    def __init__(self):
+        self.clock = VirtualClock()
+        self.root = tk.Tk()
+        self.app = PomodoroApp(self.root, clock=self.clock)
+        self.root.update()
+
+    def tick(self):
+        self.clock.advance(1.0)
+        self.app.scheduler.tick()
+        # Vacía los callbacks pendientes (avisos del hilo del temporizador,
+        # redibujados "idle") como lo haría el bucle de eventos
+        self.root.update()
+
+    def ensure_running(self):
+        app = self.app
+        # Al terminar un período el núcleo ya pasó al modo siguiente, detenido
+        if not app.timer_running:
+            app.start_timer()
+
+    def close(self):
+        self.app.on_close()
+
+def bench_ticks(harness, ticks):
+    app = harness.app
+    results = {}
+    for compact in (False, True):
+        if app.compact_mode != compact:
+            app.toggle_compact_mode()
+            harness.root.update()
+        harness.ensure_running()
+        for _ in range(10):
+            harness.tick()
+        samples = []
+        for _ in range(ticks):
+            harness.ensure_running()
+            cpu = time.process_time()
+            harness.tick()
+            samples.append((time.process_time() - cpu) * 1e6)
+        results["compact" if compact else "normal"] = {"cpu_us": summarize(samples)}
+    if app.compact_mode:
+        app.toggle_compact_mode()
+        harness.root.update()
+    return results
+
+def timed_ms(harness, action):
+    started = time.perf_counter()
+    action()
+    harness.root.update_idletasks()
+    return (time.perf_counter() - started) * 1000
+
+def bench_latency(harness, repeats):
+    app = harness.app
+    # El primer paso a compacto construye la vista: se informa por separado
+    first_compact = timed_ms(harness, app.toggle_compact_mode)
+    timed_ms(harness, app.toggle_compact_mode)
+    toggles = [timed_ms(harness, app.toggle_compact_mode) for _ in range(repeats * 2)]
+    if app.compact_mode:
+        app.toggle_compact_mode()
+    harness.root.update()
+    changes = []
+    for i in range(repeats):
+        mode = MODES[(i + 1) % len(MODES)]
+        changes.append(timed_ms(harness, lambda: app.change_mode(mode, confirm=False)))
+    app.change_mode("Pomodoro", confirm=False)
+    harness.root.update()
+    # Cambio de tema: una pasada sobre estilos y widgets, debe caber en un cuadro
+    names = list(PALETTES)
+    themes = []
+    for i in range(repeats):
+        name = names[(i + 1) % len(names)]
+        themes.append(timed_ms(harness, lambda: app.theme.set_theme(name)))
+    app.theme.set_theme(DEFAULT_THEME)
+    harness.root.update()
+    return {
+        "toggle_compact_first_ms": first_compact,
+        "toggle_compact_ms": summarize(toggles),
+        "change_mode_ms": summarize(changes),
+        "theme_switch_ms": summarize(themes),
+    }
+
+def bench_soak(harness, hours, sample_minutes):
+    # Jornada simulada: períodos seguidos, con una muestra de memoria y widgets
+    # cada sample_minutes minutos simulados
+    app = harness.app
+    samples = []
+    started = time.perf_counter()
+    ticks = int(hours * 3600)
+    finished = app.pomodoro_count
+    for second in range(ticks):
+        harness.ensure_running()
+        harness.tick()
+        if second % (sample_minutes * 60) == 0 or second == ticks - 1:
+            samples.append({
+                "minute": second // 60,
+                "rss_bytes": rss_bytes(),
+                "widgets": count_widgets(harness.root),
+                "after_callbacks": len(harness.root.tk.splitlist(harness.root.tk.call("after", "info"))),
+            })
+    first, last = samples[0], samples[-1]
+    return {
+        "simulated_hours": hours,
+        "wall_seconds": time.perf_counter() - started,
+        "pomodoros": app.pomodoro_count - finished,
+        "rss_growth_bytes": (last["rss_bytes"] or 0) - (first["rss_bytes"] or 0),
+        "widget_growth": last["widgets"] - first["widgets"],
+        "samples": samples,
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except OSError:
+        return None
+
+def flatten(data, prefix=""):
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, name + ".")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+def is_cost(name):
+    # La unidad puede estar en la métrica o en su grupo (first_frame_ms.median)
+    parts = name.split(".")
+    if parts[-1] == "n":
+        return False
+    return any(part.endswith(COST_SUFFIXES) or part in COST_NAMES for part in parts)
+
+def compare(current, previous):
+    # Lista los costos que empeoraron más de REGRESSION respecto a la anterior
+    old = dict(flatten(previous.get("results", {})))
+    regressions = []
+    for name, value in flatten(current["results"]):
+        before = old.get(name)
+        if before is None or not is_cost(name):
+            continue
+        if before == 0:
+            # Sin base (p. ej. ningún arranque fallido): cualquier aumento cuenta
+            change = math.inf if value > 0 else 0.0
+        else:
+            change = (value - before) / abs(before)
+        if change > REGRESSION:
+            regressions.append((name, before, value, change))
+    return regressions
+
+def run(args):
+    xvfb = None
+    if not os.environ.get("DISPLAY") and not args.no_xvfb:
+        xvfb = start_xvfb()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as home:
+            results["startup"] = bench_startup(args.startup_runs, home)
+        with tempfile.TemporaryDirectory() as home:
+            isolate(home)
+            harness = AppHarness()
+            try:
+                results["tick"] = bench_ticks(harness, args.ticks)
+                results["latency"] = bench_latency(harness, args.repeats)
+                results["soak"] = bench_soak(harness, args.soak_hours, args.sample_minutes)
+            finally:
+                harness.close()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait(timeout=10)
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "tk": tk.TkVersion,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento del Pomodoro")
+    parser.add_argument("--output", "-o", help="archivo JSON de resultados (por defecto, stdout)")
+    parser.add_argument("--compare", metavar="JSON", help="resultados anteriores para comparar")
+    parser.add_argument("--startup-runs", type=int, default=10)
+    parser.add_argument("--ticks", type=int, default=600, help="ticks medidos por modo")
+    parser.add_argument("--repeats", type=int, default=50, help="repeticiones de cada cambio")
+    parser.add_argument("--soak-hours", type=float, default=8.0)
+    parser.add_argument("--sample-minutes", type=int, default=10)
+    parser.add_argument("--no-xvfb", action="store_true", help="usar la pantalla actual aunque no haya DISPLAY")
+    args = parser.parse_args(argv)
+    report = run(args)
+    failed = report["results"]["startup"]["failed"]
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if failed:
+        print(f"{failed} de {args.startup_runs} arranques fallaron", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f))
+        for name, before, value, change in regressions:
+            print(f"Regresión: {name} {before:.4g} -> {value:.4g} ({change:+.0%})", file=sys.stderr)
+        return 1 if regressions or failed else 0
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
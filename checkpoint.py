@@ -0,0 +1,66 @@
+import mmap
+import os
+import struct
+import zlib
+from collections import namedtuple
+
+STATE_IDLE = 0
+STATE_RUNNING = 1
+STATE_PAUSED = 2
+
+# Registro de tamaño fijo: secuencia, estado, modo, pomodoros, segundos
+# restantes, fecha límite absoluta (reloj de pared) y hora de guardado, seguido
+# de un CRC32. Hay dos ranuras que se escriben de forma alterna: al leer se toma
+# la de mayor secuencia con CRC válido, así que una escritura cortada a medias
+# deja siempre intacto el registro anterior. Con --sync, otra instancia puede
+# haber escrito el mismo archivo (la líder anterior), así que la secuencia se
+# vuelve a leer de las ranuras antes de cada escritura.
+RECORD = struct.Struct("<QB16sIddd")
+CRC = struct.Struct("<I")
+SLOT_SIZE = 64
+FILE_SIZE = 2 * SLOT_SIZE
+
+Checkpoint = namedtuple("Checkpoint", "seq state mode count remaining deadline saved_at")
+
+class SessionCheckpoint:
+    def __init__(self, path):
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o600)
+        try:
+            if os.fstat(fd).st_size != FILE_SIZE:
+                os.ftruncate(fd, FILE_SIZE)
+            self.map = mmap.mmap(fd, FILE_SIZE)
+        finally:
+            os.close(fd)
+        self.seq = 0
+
+    def read_slot(self, slot):
+        offset = slot * SLOT_SIZE
+        payload = self.map[offset:offset + RECORD.size]
+        (crc,) = CRC.unpack_from(self.map, offset + RECORD.size)
+        if crc != zlib.crc32(payload):
+            return None
+        seq, state, mode, count, remaining, deadline, saved_at = RECORD.unpack(payload)
+        if seq == 0:
+            return None
+        return Checkpoint(seq, state, mode.rstrip(b"\0").decode("utf-8", "replace"),
+                          count, remaining, deadline, saved_at)
+
+    def load(self):
+        records = [r for r in (self.read_slot(0), self.read_slot(1)) if r is not None]
+        if not records:
+            return None
+        return max(records, key=lambda r: r.seq)
+
+    def save(self, state, mode, count, remaining, deadline, saved_at):
+        latest = self.load()
+        self.seq = max(self.seq, latest.seq if latest else 0) + 1
+        payload = RECORD.pack(self.seq, state, mode.encode("utf-8")[:16], count,
+                              remaining, deadline, saved_at)
+        offset = (self.seq % 2) * SLOT_SIZE
+        self.map[offset:offset + RECORD.size] = payload
+        CRC.pack_into(self.map, offset + RECORD.size, zlib.crc32(payload))
+        self.map.flush()
+
+    def close(self):
+        self.map.close()
@@ -0,0 +1,416 @@
+import math
+import sys
+import threading
+import time
+from datetime import datetime
+
+# Núcleo del temporizador sin dependencias de interfaz: la cuenta regresiva,
+# el ciclo de modos y conteo de pomodoros y el hilo que avisa las fechas
+# límite. PomodoroTimer es la única máquina de estados: la usan la aplicación
+# de Tk, el servicio asyncio de temporizadores múltiples y la simulación.
+# TimerSession junta el temporizador, el hilo vigilante y el historial tal
+# como los usan la aplicación y la simulación, así que ambas pasan por el
+# mismo código al terminar cada período.
+
+MODES = ("Pomodoro", "Descanso Corto", "Descanso Largo")
+DEFAULT_DURATIONS = {
+    "Pomodoro": 25 * 60,          # 25 minutos
+    "Descanso Corto": 5 * 60,     # 5 minutos
+    "Descanso Largo": 15 * 60,    # 15 minutos
+}
+
+# Reloj monotónico que sigue contando durante la suspensión: CLOCK_BOOTTIME en
+# Linux y CLOCK_MONOTONIC en macOS. Con él las fechas límite ya incluyen el
+# tiempo suspendido y no hace falta corregirlas con el reloj de pared (que
+# además salta con NTP o con un cambio manual de hora).
+if hasattr(time, "CLOCK_BOOTTIME"):
+    def monotonic():
+        return time.clock_gettime(time.CLOCK_BOOTTIME)
+    COUNTS_SUSPEND = True
+elif sys.platform == "darwin" and hasattr(time, "CLOCK_MONOTONIC"):
+    def monotonic():
+        return time.clock_gettime(time.CLOCK_MONOTONIC)
+    COUNTS_SUSPEND = True
+else:
+    monotonic = time.monotonic
+    COUNTS_SUSPEND = False
+
+class SystemClock:
+    # Fuente de tiempo real. Todo lo que mide o espera tiempo la recibe
+    # inyectada, así que una simulación puede sustituirla por un VirtualClock.
+    counts_suspend = COUNTS_SUSPEND
+
+    def monotonic(self):
+        return monotonic()
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.now()
+
+    def wait(self, condition, timeout):
+        # Se llama con la condición adquirida, como Condition.wait
+        return condition.wait(timeout)
+
+class VirtualClock:
+    # Reloj que solo avanza cuando se le pide. Los hilos que esperan en él no
+    # usan un plazo real: despiertan en cada advance() y vuelven a calcular
+    # cuánto les falta. El reloj anota hasta cuándo pidió dormir cada uno, así
+    # que quien lo conduce puede saltar al siguiente despertar (next_wakeup) y
+    # esperar a que el hilo vuelva a dormirse (settle) antes de seguir. Una
+    # suspensión se simula moviendo solo el reloj de pared (wall).
+    counts_suspend = False
+
+    def __init__(self, start=None):
+        self.wall = time.time() if start is None else start
+        self.offset = 0.0
+        self.waiting = {}
+        self.waits = 0
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+
+    def monotonic(self):
+        return self.offset
+
+    def time(self):
+        return self.wall + self.offset
+
+    def now(self):
+        return datetime.fromtimestamp(self.time())
+
+    def advance(self, seconds):
+        self.offset += seconds
+        with self.lock:
+            waiting = list(self.waiting)
+        for condition in waiting:
+            with condition:
+                condition.notify_all()
+
+    def set(self, wall):
+        self.advance(wall - self.time())
+
+    def next_wakeup(self):
+        # Instante monotónico más próximo en que algún hilo pidió despertar
+        with self.lock:
+            return min((wake for wake in self.waiting.values() if wake is not None), default=None)
+
+    def settle(self, mark, timeout=None):
+        # Espera a que algún hilo vuelva a dormir después de la marca (self.waits)
+        with self.changed:
+            return self.changed.wait_for(lambda: self.waits > mark, timeout)
+
+    def wait(self, condition, timeout):
+        if timeout is not None and timeout <= 0:
+            return False
+        with self.lock:
+            self.waiting[condition] = None if timeout is None else self.offset + timeout
+            self.waits += 1
+            self.changed.notify_all()
+        try:
+            return condition.wait()
+        finally:
+            with self.lock:
+                self.waiting.pop(condition, None)
+
+SYSTEM_CLOCK = SystemClock()
+
+class DeadlineTimer:
+    # Cuenta regresiva basada en una fecha límite del reloj monotónico. El tiempo
+    # restante se calcula en cada consulta, así que los retrasos del planificador
+    # no se acumulan y pausar/reanudar solo desplaza la fecha límite. Donde el
+    # reloj monotónico se detiene durante una suspensión, también se guarda la
+    # fecha límite en reloj de pared para corregir la cuenta. La corrección
+    # cubre solo lo que el reloj de pared avanzó sin el monotónico desde la
+    # comprobación anterior (cada tick o aviso), y nunca más que lo que falta.
+    RESYNC_THRESHOLD = 2.0
+
+    def __init__(self, duration, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.duration = duration
+        self.deadline = None
+        self.wall_deadline = None
+        self.paused_remaining = float(duration)
+
+    def is_running(self):
+        return self.deadline is not None
+
+    def start(self):
+        if self.deadline is None:
+            self.wall_deadline = self.clock.time() + self.paused_remaining
+            self.deadline = self.clock.monotonic() + self.paused_remaining
+
+    def pause(self):
+        if self.deadline is not None:
+            self.paused_remaining = max(0.0, self.deadline - self.clock.monotonic())
+            self.deadline = None
+
+    def reset(self, duration=None, remaining=None):
+        if duration is not None:
+            self.duration = duration
+        self.deadline = None
+        self.paused_remaining = float(self.duration if remaining is None else remaining)
+
+    def lag(self):
+        # Segundos que el reloj monotónico quedó atrás del reloj de pared desde
+        # la última comprobación
+        if self.deadline is None or self.clock.counts_suspend:
+            return 0.0
+        return (self.deadline - self.clock.monotonic()) - (self.wall_deadline - self.clock.time())
+
+    def resync(self):
+        if self.deadline is None or self.clock.counts_suspend:
+            return False
+        lag = self.lag()
+        corrected = lag > self.RESYNC_THRESHOLD
+        if corrected:
+            self.deadline -= min(lag, self.remaining_exact())
+        # Saltos menores (o hacia atrás) no se acumulan entre comprobaciones
+        self.wall_deadline = self.clock.time() + self.remaining_exact()
+        return corrected
+
+    def remaining_exact(self):
+        if self.deadline is None:
+            return self.paused_remaining
+        return max(0.0, self.deadline - self.clock.monotonic())
+
+    def remaining(self):
+        # Se redondea hacia arriba: "00:00" aparece justo al llegar a la fecha límite
+        return math.ceil(self.remaining_exact())
+
+    def time_to_next_tick(self):
+        # Tiempo hasta que el tiempo restante cruce el siguiente segundo entero
+        remaining = self.remaining_exact()
+        if remaining <= 0:
+            return 0.0
+        return remaining - (math.ceil(remaining) - 1)
+
+class DeadlineWatcher:
+    # Hilo único y persistente que solo avisa cuando vence una fecha límite. El
+    # estado del temporizador no vive aquí: quien lo usa le pasa la fecha con
+    # watch() y, al recibir on_due(), consulta su propio temporizador. Un aviso
+    # de una cuenta ya cambiada es inofensivo, porque la consulta lo descarta.
+    # Mientras no hay fecha queda bloqueado sin despertar; con fecha despierta
+    # como mucho cada MAX_WAIT segundos, por si el equipo se suspendió.
+    MAX_WAIT = 30.0
+
+    def __init__(self, clock, on_due):
+        self.clock = clock
+        self.on_due = on_due
+        self.condition = threading.Condition()
+        self.deadline = None
+        self.wall_deadline = None
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, name="pomodoro-timer", daemon=True)
+        self.thread.start()
+
+    def watch(self, timer):
+        # timer: DeadlineTimer en marcha, o None para no vigilar nada
+        with self.condition:
+            if timer is not None and timer.is_running():
+                self.deadline = timer.deadline
+                self.wall_deadline = timer.wall_deadline
+            else:
+                self.deadline = None
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+
+    def time_to_deadline(self):
+        remaining = self.deadline - self.clock.monotonic()
+        if self.clock.counts_suspend:
+            return remaining
+        # También vence si el reloj de pared pasó la fecha por más del margen de
+        # resincronización: el monotónico pudo detenerse en una suspensión
+        return min(remaining, self.wall_deadline + DeadlineTimer.RESYNC_THRESHOLD - self.clock.time())
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.stopped:
+                    if self.deadline is None:
+                        self.clock.wait(self.condition, None)
+                        continue
+                    remaining = self.time_to_deadline()
+                    if remaining <= 0:
+                        self.deadline = None
+                        break
+                    self.clock.wait(self.condition, min(remaining, self.MAX_WAIT))
+                if self.stopped:
+                    return
+            self.on_due()
+
+class PomodoroCycle:
+    # Modo actual, duraciones y conteo de pomodoros. Tras cada pomodoro toca un
+    # descanso corto, salvo al completar el ciclo, que toca uno largo.
+    def __init__(self, durations=None, pomodoros_per_cycle=4, mode="Pomodoro", count=0):
+        self.durations = dict(DEFAULT_DURATIONS)
+        if durations:
+            self.durations.update(durations)
+        self.pomodoros_per_cycle = pomodoros_per_cycle
+        self.mode = mode
+        self.count = count
+
+    def duration(self, mode=None):
+        return self.durations.get(mode or self.mode, self.durations["Pomodoro"])
+
+    def complete(self):
+        if self.mode == "Pomodoro":
+            self.count += 1
+
+    def next_mode(self):
+        if self.mode != "Pomodoro":
+            return "Pomodoro"
+        if self.count and self.count % self.pomodoros_per_cycle == 0:
+            return "Descanso Largo"
+        return "Descanso Corto"
+
+class PomodoroTimer:
+    # Temporizador pomodoro sin interfaz ni hilos. Quien lo usa decide cuándo
+    # consultarlo: poll() detecta el final, cuenta el período y pasa al modo
+    # siguiente (y lo inicia si auto_start está activo).
+    def __init__(self, cycle=None, auto_start=False, clock=None):
+        self.cycle = cycle or PomodoroCycle()
+        self.timer = DeadlineTimer(self.cycle.duration(), clock)
+        self.auto_start = auto_start
+        self.running = False
+        self.paused = False
+
+    def start(self):
+        if self.running and self.paused:
+            self.resume()
+        elif not self.running:
+            self.running = True
+            self.timer.start()
+
+    def pause(self):
+        if self.running and not self.paused:
+            self.paused = True
+            self.timer.pause()
+
+    def resume(self):
+        if self.running and self.paused:
+            self.paused = False
+            self.timer.start()
+
+    def reset(self):
+        self.running = False
+        self.paused = False
+        self.timer.reset(self.cycle.duration())
+
+    def change_mode(self, mode):
+        if mode not in self.cycle.durations:
+            raise ValueError(f"Modo desconocido: {mode}")
+        self.cycle.mode = mode
+        self.reset()
+
+    def restore(self, mode, remaining, running=False, paused=False):
+        # Estado guardado (punto de control, otra instancia): modo, segundos
+        # restantes y si estaba en marcha o en pausa
+        if mode not in self.cycle.durations:
+            raise ValueError(f"Modo desconocido: {mode}")
+        self.cycle.mode = mode
+        self.timer.reset(self.cycle.duration(), max(0.0, remaining))
+        self.running = running
+        self.paused = running and paused
+        if self.running and not self.paused:
+            self.timer.start()
+
+    def deadline(self):
+        # Fecha límite monotónica mientras corre; None si está detenido o en pausa
+        return self.timer.deadline if self.running and not self.paused else None
+
+    def remaining(self):
+        return self.timer.remaining()
+
+    def check(self):
+        # Al aviso del hilo vigilante: corrige la cuenta si el equipo estuvo
+        # suspendido y detecta el final
+        self.timer.resync()
+        return self.poll()
+
+    def poll(self):
+        if self.running and not self.paused and self.timer.remaining_exact() <= 0:
+            return self.finish()
+        return None
+
+    def finish(self):
+        finished = self.cycle.mode
+        self.cycle.complete()
+        self.change_mode(self.cycle.next_mode())
+        if self.auto_start:
+            self.start()
+        return finished
+
+    def status(self):
+        return {
+            "mode": self.cycle.mode,
+            "remaining": self.timer.remaining(),
+            "running": self.running,
+            "paused": self.paused,
+            "count": self.cycle.count,
+        }
+
+class TimerSession:
+    # Temporizador con su hilo vigilante y su historial. Cada cambio de estado
+    # vuelve a armar la vigilancia; on_due llega en el hilo vigilante y quien
+    # lo recibe llama a due() desde su propio hilo (el de Tk en la aplicación).
+    # history es cualquier objeto con record(event, mode, duration, elapsed,
+    # ts, task), como HistoryStore.
+    def __init__(self, timer, history, on_due):
+        self.timer = timer
+        self.clock = timer.timer.clock
+        self.history = history
+        self.watcher = DeadlineWatcher(self.clock, on_due)
+
+    def watch(self):
+        self.watcher.watch(self.timer.timer if self.timer.deadline() is not None else None)
+
+    def start(self):
+        self.timer.start()
+        self.watch()
+
+    def pause(self):
+        self.timer.pause()
+        self.watch()
+
+    def resume(self):
+        self.timer.resume()
+        self.watch()
+
+    def reset(self):
+        self.timer.reset()
+        self.watch()
+
+    def change_mode(self, mode):
+        self.timer.change_mode(mode)
+        self.watch()
+
+    def restore(self, mode, remaining, running=False, paused=False):
+        self.timer.restore(mode, remaining, running, paused)
+        self.watch()
+
+    def record(self, event, mode=None, elapsed=None, task=None, ts=None):
+        # Sin elapsed, lo transcurrido del período en curso
+        mode = mode or self.timer.cycle.mode
+        duration = self.timer.cycle.duration(mode)
+        if elapsed is None:
+            elapsed = duration - self.timer.timer.remaining_exact()
+        self.history.record(event, mode, duration, elapsed,
+                            self.clock.time() if ts is None else ts, task)
+
+    def due(self, task=None):
+        # Atiende un aviso (o un tick en cero): si el período terminó, lo anota
+        # y devuelve su modo. Un aviso de una cuenta ya pausada o reiniciada no
+        # encuentra nada que terminar y solo vuelve a armar la vigilancia.
+        finished = self.timer.check()
+        self.watch()
+        if finished is not None:
+            self.record("finish", finished, self.timer.cycle.duration(finished), task)
+        return finished
+
+    def stop(self):
+        self.watcher.stop()
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Bus de eventos para integraciones. La interfaz publica en el hilo de Tk y
+# publish() solo encola: cada suscriptor tiene su propia cola acotada y, si
+# tiene eventos pendientes, una única tarea en un grupo fijo de hilos que la
+# vacía en orden. Un complemento lento solo atrasa su propia cola; nunca la
+# cuenta ni el redibujado. Cuando una cola se llena se descarta el evento más
+# viejo, y los ticks se agrupan: en la cola queda a lo sumo el último.
+START = "start"
+PAUSE = "pause"
+RESUME = "resume"
+RESET = "reset"
+TICK = "tick"
+MODE_CHANGE = "mode_change"
+FINISH = "finish"
+STATE = "state"
+KINDS = (START, PAUSE, RESUME, RESET, TICK, MODE_CHANGE, FINISH, STATE)
+
+# Qué se descarta cuando la cola de un suscriptor está llena
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+
+MAX_WORKERS = 4
+QUEUE_SIZE = 64
+
+class Event:
+    __slots__ = ("kind", "data", "time", "seq")
+
+    def __init__(self, kind, data, timestamp, seq):
+        self.kind = kind
+        self.data = data
+        self.time = timestamp
+        self.seq = seq
+
+    def __repr__(self):
+        return f"Event({self.kind!r}, {self.data!r})"
+
+class Subscription:
+    def __init__(self, handler, kinds, queue_size, overflow, coalesce):
+        self.handler = handler
+        self.kinds = kinds
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.coalesce = coalesce
+        self.queue = deque()
+        self.lock = threading.Lock()
+        self.scheduled = False
+        self.active = True
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def offer(self, event):
+        # En el hilo que publica: O(1) salvo al agrupar, que mira la cola pendiente
+        with self.lock:
+            if not self.active:
+                return False
+            if event.kind in self.coalesce:
+                for i, pending in enumerate(self.queue):
+                    if pending.kind == event.kind:
+                        del self.queue[i]
+                        self.coalesced += 1
+                        break
+            if len(self.queue) >= self.queue_size:
+                self.dropped += 1
+                if self.overflow == DROP_NEWEST:
+                    return False
+                self.queue.popleft()
+            self.queue.append(event)
+            if self.scheduled:
+                return False
+            self.scheduled = True
+            return True
+
+    def drain(self):
+        # En el grupo de hilos; entrega hasta vaciar la cola y libera el turno
+        while True:
+            with self.lock:
+                if not self.queue or not self.active:
+                    self.scheduled = False
+                    return
+                event = self.queue.popleft()
+            try:
+                self.handler(event)
+                self.delivered += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Error en el suscriptor {getattr(self.handler, '__name__', self.handler)} "
+                      f"({event.kind}): {e}")
+
+    def stats(self):
+        return {"pending": len(self.queue), "delivered": self.delivered, "dropped": self.dropped,
+                "coalesced": self.coalesced, "errors": self.errors}
+
+class EventBus:
+    def __init__(self, max_workers=MAX_WORKERS, clock=time.time):
+        self.clock = clock
+        self.subscriptions = []
+        self.seq = 0
+        self.closed = False
+        self.max_workers = max_workers
+        self.executor = None
+
+    def subscribe(self, handler, kinds=None, queue_size=QUEUE_SIZE, overflow=DROP_OLDEST,
+                  coalesce=(TICK,)):
+        # handler(event) corre fuera del hilo de Tk: no debe tocar widgets
+        kinds = frozenset(KINDS if kinds is None else kinds)
+        unknown = kinds.difference(KINDS)
+        if unknown:
+            raise ValueError(f"Eventos desconocidos: {', '.join(sorted(unknown))}")
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Política de desborde desconocida: {overflow}")
+        subscription = Subscription(handler, kinds, max(1, queue_size), overflow,
+                                    frozenset(coalesce))
+        # Copia al escribir: publish() recorre la lista sin bloqueo
+        self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with subscription.lock:
+            subscription.active = False
+            subscription.queue.clear()
+        self.subscriptions = [s for s in self.subscriptions if s is not subscription]
+
+    def publish(self, kind, data=None):
+        if self.closed or not self.subscriptions:
+            return
+        self.seq += 1
+        event = Event(kind, data or {}, self.clock(), self.seq)
+        for subscription in self.subscriptions:
+            if kind in subscription.kinds and subscription.offer(event):
+                if self.executor is None:
+                    # Los hilos se crean con el primer evento que haya que entregar
+                    self.executor = ThreadPoolExecutor(self.max_workers,
+                                                       thread_name_prefix="pomodoro-events")
+                self.executor.submit(subscription.drain)
+
+    def stats(self):
+        return [dict(s.stats(), handler=getattr(s.handler, "__name__", repr(s.handler)))
+                for s in self.subscriptions]
+
+    def close(self):
+        # Los eventos pendientes se descartan; no se espera a los que ya corren
+        self.closed = True
+        for subscription in self.subscriptions:
+            self.unsubscribe(subscription)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,236 @@
+import argparse
+import csv
+import json
+import os
+import struct
+import sys
+from array import array
+from datetime import date, datetime
+
+from history import EVENTS, MODES, connect
+
+# Exportación del historial para otras herramientas. Los eventos salen de
+# SQLite por lotes (fetchmany) y pasan por una cadena de generadores hasta el
+# escritor, así que la memoria no depende del tamaño del historial. El rango
+# de fechas se resuelve en la consulta con el índice por día. Formatos:
+#   csv    una fila por evento, con encabezado
+#   jsonl  un objeto JSON por línea
+#   pomc   columnar binario: bloques de hasta BLOCK_ROWS filas, cada columna
+#          contigua (ver write_columnar y read_columnar)
+FORMATS = ("csv", "jsonl", "pomc")
+FIELDS = ("time", "event", "mode", "duration", "elapsed", "task_id", "task")
+FETCH_ROWS = 1000
+BLOCK_ROWS = 4096
+PROGRESS_ROWS = 10000
+
+COLUMNAR_MAGIC = b"POMC\x01"
+# Tipos de array por columna (little endian); task_id -1 es "sin tarea"
+COLUMNAR_TYPES = (("time", "d"), ("event", "B"), ("mode", "B"), ("duration", "I"),
+                  ("elapsed", "d"), ("task_id", "q"), ("task", "str"))
+
+class ExportCancelled(Exception):
+    pass
+
+def format_for(path):
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in FORMATS else "csv"
+
+def records(conn, since=None, until=None):
+    # (ts, evento, modo, duración, transcurrido, id de tarea, título) en orden de día
+    where = []
+    params = []
+    if since is not None:
+        where.append("e.day >= ?")
+        params.append(since.toordinal())
+    if until is not None:
+        where.append("e.day <= ?")
+        params.append(until.toordinal())
+    # Las tareas pueden no existir si nunca se abrió la lista
+    has_tasks = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks'").fetchone()
+    title = "t.title" if has_tasks else "NULL"
+    join = "LEFT JOIN tasks t ON t.id = e.task" if has_tasks else ""
+    # ORDER BY day, id sigue el índice events_day: no hay ordenamiento aparte
+    sql = (f"SELECT e.ts, e.event, e.mode, e.duration, e.elapsed, e.task, {title} "
+           f"FROM events e {join} {'WHERE ' + ' AND '.join(where) if where else ''} "
+           f"ORDER BY e.day, e.id")
+    cursor = conn.execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(FETCH_ROWS)
+            if not rows:
+                return
+            yield from rows
+    finally:
+        cursor.close()
+
+def watch(rows, progress=None, cancel=None):
+    # Avisa el avance y permite cortar la exportación desde otro hilo
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if count % PROGRESS_ROWS == 0:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            if progress is not None:
+                progress(count)
+
+def as_text(rows):
+    for ts, event, mode, duration, elapsed, task_id, task in rows:
+        yield (datetime.fromtimestamp(ts).isoformat(timespec="seconds"), EVENTS[event],
+               MODES[mode], duration, round(elapsed, 3), task_id, task)
+
+def write_csv(rows, f):
+    writer = csv.writer(f)
+    writer.writerow(FIELDS)
+    count = 0
+    for row in as_text(rows):
+        writer.writerow(row)
+        count += 1
+    return count
+
+def write_jsonl(rows, f):
+    count = 0
+    for row in as_text(rows):
+        f.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False))
+        f.write("\n")
+        count += 1
+    return count
+
+def write_columnar(rows, f):
+    # Encabezado: magia, largo y JSON con columnas y códigos de eventos y modos.
+    # Luego bloques: cantidad de filas (uint32) y cada columna contigua; los
+    # textos son desplazamientos uint32 (n + 1) seguidos de los bytes UTF-8.
+    # Un bloque de 0 filas marca el final.
+    header = json.dumps({"columns": COLUMNAR_TYPES, "events": EVENTS, "modes": MODES}).encode()
+    f.write(COLUMNAR_MAGIC + struct.pack("<I", len(header)) + header)
+    count = 0
+    block = []
+    for row in rows:
+        block.append(row)
+        if len(block) == BLOCK_ROWS:
+            count += write_block(f, block)
+            block = []
+    if block:
+        count += write_block(f, block)
+    f.write(struct.pack("<I", 0))
+    return count
+
+def write_block(f, block):
+    f.write(struct.pack("<I", len(block)))
+    for index, (name, typecode) in enumerate(COLUMNAR_TYPES):
+        values = [row[index] for row in block]
+        if typecode == "str":
+            encoded = [(value or "").encode() for value in values]
+            offsets = array("I", [0])
+            for data in encoded:
+                offsets.append(offsets[-1] + len(data))
+            write_array(f, offsets)
+            f.write(b"".join(encoded))
+        else:
+            if name == "task_id":
+                values = [-1 if value is None else value for value in values]
+            write_array(f, array(typecode, values))
+    return len(block)
+
+def write_array(f, values):
+    if sys.byteorder == "big":
+        values.byteswap()
+    values.tofile(f)
+
+def read_array(f, typecode, count):
+    values = array(typecode)
+    values.fromfile(f, count)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def read_columnar(f):
+    # Lector de referencia: devuelve un bloque a la vez como dict de columnas
+    if f.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("No es un archivo columnar del Pomodoro")
+    size, = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(size))
+    while True:
+        count, = struct.unpack("<I", f.read(4))
+        if count == 0:
+            return
+        block = {}
+        for name, typecode in header["columns"]:
+            if typecode == "str":
+                offsets = read_array(f, "I", count + 1)
+                data = f.read(offsets[-1])
+                block[name] = [data[offsets[i]:offsets[i + 1]].decode() or None
+                               for i in range(count)]
+            else:
+                block[name] = read_array(f, typecode, count)
+        yield block
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "pomc": write_columnar}
+
+def export(db_path, output, fmt=None, since=None, until=None, progress=None, cancel=None):
+    # Usa una conexión propia, así que puede correr en cualquier hilo. El
+    # archivo se escribe aparte y se reemplaza al final: un corte no deja
+    # exportaciones a medias. output "-" escribe en la salida estándar.
+    fmt = fmt or format_for(output)
+    writer = WRITERS[fmt]
+    conn = connect(db_path)
+    source = records(conn, since, until)
+    rows = watch(source, progress, cancel)
+    try:
+        if output == "-":
+            if fmt == "pomc":
+                return writer(rows, sys.stdout.buffer)
+            return writer(rows, sys.stdout)
+        temp = output + ".tmp"
+        try:
+            if fmt == "pomc":
+                with open(temp, "wb") as f:
+                    count = writer(rows, f)
+            else:
+                with open(temp, "w", encoding="utf-8", newline="") as f:
+                    count = writer(rows, f)
+            os.replace(temp, output)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        return count
+    finally:
+        rows.close()
+        source.close()
+        conn.close()
+
+def parse_date(text):
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida (AAAA-MM-DD): {text}") from None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportar el historial de pomodoros")
+    parser.add_argument("output", help="archivo de salida (- para la salida estándar)")
+    parser.add_argument("--db", required=True, help="historial (history.db)")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="formato de salida (por defecto, según la extensión; si no, csv)")
+    parser.add_argument("--since", type=parse_date, metavar="AAAA-MM-DD",
+                        help="primer día incluido")
+    parser.add_argument("--until", type=parse_date, metavar="AAAA-MM-DD",
+                        help="último día incluido")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.db):
+        print(f"No existe el historial: {args.db}", file=sys.stderr)
+        return 1
+    try:
+        count = export(args.db, args.output, args.format, args.since, args.until)
+    except BrokenPipeError:
+        # Quien lee la salida estándar cerró antes (p. ej. "| head")
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    if args.output != "-":
+        print(f"{count} eventos exportados a {args.output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+# Códigos compactos: cada evento se guarda como enteros y reales, sin texto
+EVENTS = ("start", "pause", "resume", "finish", "reset", "mode_change")
+MODES = ("Pomodoro", "Descanso Corto", "Descanso Largo")
+EVENT_CODES = {name: code for code, name in enumerate(EVENTS)}
+MODE_CODES = {name: code for code, name in enumerate(MODES)}
+
+# Un período abandonado es uno que se reinicia o se cambia de modo ya empezado
+ABANDON_EVENTS = (EVENT_CODES["reset"], EVENT_CODES["mode_change"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    day INTEGER NOT NULL,
+    event INTEGER NOT NULL,
+    mode INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    task INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_day ON events (day);
+CREATE TABLE IF NOT EXISTS daily (
+    day INTEGER NOT NULL,
+    mode INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    abandoned INTEGER NOT NULL DEFAULT 0,
+    pauses INTEGER NOT NULL DEFAULT 0,
+    seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, mode)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hourly (
+    day INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    mode INTEGER NOT NULL,
+    seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, hour, mode)
+) WITHOUT ROWID;
+"""
+
+UPSERT_DAILY = """
+INSERT INTO daily (day, mode, completed, abandoned, pauses, seconds)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, mode) DO UPDATE SET
+    completed = completed + excluded.completed,
+    abandoned = abandoned + excluded.abandoned,
+    pauses = pauses + excluded.pauses,
+    seconds = seconds + excluded.seconds
+"""
+
+UPSERT_HOURLY = """
+INSERT INTO hourly (day, hour, mode, seconds) VALUES (?, ?, ?, ?)
+ON CONFLICT (day, hour, mode) DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+class Statement:
+    # Escritura ajena al historial (p. ej. de las tareas) que se aplica en el
+    # mismo hilo escritor, en orden, para que la interfaz nunca espere el bloqueo
+    __slots__ = ("sql", "params")
+
+    def __init__(self, sql, params):
+        self.sql = sql
+        self.params = params
+
+def day_number(ts):
+    # Día local como ordinal: las consultas por día usan el índice, no fechas en texto
+    return datetime.fromtimestamp(ts).date().toordinal()
+
+def hour_slices(ts, elapsed):
+    # Reparte los segundos de un período entre las horas locales que abarca
+    start = ts - elapsed
+    while elapsed > 0:
+        moment = datetime.fromtimestamp(start)
+        hour_end = moment.replace(minute=0, second=0, microsecond=0).timestamp() + 3600
+        chunk = min(elapsed, hour_end - start)
+        yield moment.date().toordinal(), moment.hour, chunk
+        start += chunk
+        elapsed -= chunk
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # Historiales anteriores a las tareas no tienen la columna "task"
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(events)")]
+    if "task" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE events ADD COLUMN task INTEGER")
+    return conn
+
+def connect_readonly(path):
+    # Sin PRAGMA ni esquema: solo lee lo que el escritor ya preparó
+    uri = pathlib.Path(os.path.abspath(path)).as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+class HistoryStore:
+    # Historial de sesiones en SQLite (modo WAL). record() solo encola: un hilo
+    # escritor agrupa los eventos y los guarda en una transacción por lote, junto
+    # con los resúmenes por día y por hora que usan los recuentos y las
+    # estadísticas, así que estos nunca necesitan recorrer todos los eventos.
+    FLUSH_INTERVAL = 0.5
+    BATCH_SIZE = 256
+    READY_TIMEOUT = 5.0
+
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.Queue()
+        self.reader = None
+        # El hilo escritor crea el esquema y fija los PRAGMA al arrancar
+        self.ready = threading.Event()
+        self.writer = threading.Thread(target=self.run, name="pomodoro-history", daemon=True)
+        self.writer.start()
+
+    def execute(self, sql, params=()):
+        self.queue.put(Statement(sql, params))
+
+    def record(self, event, mode, duration, elapsed, ts=None, task=None):
+        if ts is None:
+            ts = time.time()
+        self.queue.put((ts, day_number(ts), EVENT_CODES[event], MODE_CODES[mode],
+                        int(duration), float(elapsed), task))
+
+    def run(self):
+        try:
+            conn = connect(self.path)
+        finally:
+            self.ready.set()
+        try:
+            self.backfill_hourly(conn)
+            while True:
+                batch = [self.queue.get()]
+                deadline = time.monotonic() + self.FLUSH_INTERVAL
+                while batch[-1] is not None and len(batch) < self.BATCH_SIZE:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self.queue.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+                done = batch[-1] is None
+                if done:
+                    batch.pop()
+                if batch:
+                    self.write(conn, batch)
+                if done:
+                    return
+        finally:
+            conn.close()
+
+    def write(self, conn, batch):
+        statements = [item for item in batch if isinstance(item, Statement)]
+        if statements:
+            batch = [item for item in batch if not isinstance(item, Statement)]
+        if batch:
+            self.write_events(conn, batch)
+        for statement in statements:
+            try:
+                with conn:
+                    conn.execute(statement.sql, statement.params)
+            except sqlite3.Error as e:
+                print(f"Error al guardar: {e}")
+
+    def write_events(self, conn, batch):
+        rollup = {}
+        hours = {}
+        for ts, day, event, mode, duration, elapsed, task in batch:
+            totals = rollup.setdefault((day, mode), [0, 0, 0, 0.0])
+            if event == EVENT_CODES["finish"]:
+                totals[0] += 1
+                totals[3] += elapsed
+            elif event in ABANDON_EVENTS:
+                totals[1] += 1
+                totals[3] += elapsed
+            elif event == EVENT_CODES["pause"]:
+                totals[2] += 1
+            if event == EVENT_CODES["finish"] or event in ABANDON_EVENTS:
+                self.add_hours(hours, ts, mode, elapsed)
+        try:
+            with conn:
+                conn.executemany("INSERT INTO events (ts, day, event, mode, duration, elapsed, task) "
+                                 "VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                conn.executemany(UPSERT_DAILY, [key + tuple(totals) for key, totals in rollup.items()])
+                conn.executemany(UPSERT_HOURLY, [key + (seconds,) for key, seconds in hours.items()])
+        except sqlite3.Error as e:
+            print(f"Error al guardar el historial: {e}")
+
+    def add_hours(self, hours, ts, mode, elapsed):
+        for day, hour, seconds in hour_slices(ts, elapsed):
+            key = (day, hour, mode)
+            hours[key] = hours.get(key, 0.0) + seconds
+
+    def backfill_hourly(self, conn):
+        # Historiales creados antes del resumen por hora: se reconstruye una vez
+        if conn.execute("SELECT 1 FROM hourly LIMIT 1").fetchone() is not None:
+            return
+        hours = {}
+        cursor = conn.execute("SELECT ts, mode, elapsed FROM events WHERE event IN (?, ?, ?)",
+                              (EVENT_CODES["finish"],) + ABANDON_EVENTS)
+        for ts, mode, elapsed in cursor:
+            self.add_hours(hours, ts, mode, elapsed)
+        if hours:
+            with conn:
+                conn.executemany(UPSERT_HOURLY, [key + (seconds,) for key, seconds in hours.items()])
+
+    def connection(self):
+        # Conexión de solo lectura para el hilo que consulta (WAL permite leer
+        # mientras el escritor guarda). El esquema lo crea el escritor: aquí
+        # solo se espera a que termine, lo que casi siempre ya ocurrió.
+        if self.reader is None:
+            self.ready.wait(self.READY_TIMEOUT)
+            self.reader = connect_readonly(self.path)
+        return self.reader
+
+    def day_count(self, day, mode="Pomodoro"):
+        row = self.connection().execute(
+            "SELECT completed FROM daily WHERE day = ? AND mode = ?",
+            (day.toordinal(), MODE_CODES[mode])).fetchone()
+        return row[0] if row else 0
+
+    def today_count(self, mode="Pomodoro"):
+        return self.day_count(date.today(), mode)
+
+    def close(self):
+        # Vacía la cola pendiente antes de cerrar
+        self.queue.put(None)
+        self.writer.join(timeout=5)
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
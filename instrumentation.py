@@ -0,0 +1,175 @@
+import bisect
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Instrumentación opcional de la interfaz. Solo existe si se pide con
+# --metrics: sin ella la aplicación no envuelve ningún callback ni programa
+# sondeos, y lo único que queda en el camino caliente es una comprobación de
+# None. Las mediciones van a histogramas de cubetas fijas (sin guardar
+# muestras) y se vuelcan cada cierto tiempo a un archivo de texto o en el
+# formato de Prometheus (si el archivo termina en .prom).
+
+# Límites superiores de las cubetas, en segundos
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5)
+PROBE_INTERVAL_MS = 250
+PREFIX = "pomodoro"
+
+HELP = {
+    "tick_dispatch_seconds": "Retraso entre la hora prevista del tick y su ejecución en Tk",
+    "finish_dispatch_seconds": "Retraso entre el aviso de fin del hilo del temporizador y Tk",
+    "event_loop_lag_seconds": "Retraso de un sondeo periódico del bucle de eventos de Tk",
+    "callback_seconds": "Duración de los callbacks de la interfaz",
+}
+
+def rss_bytes():
+    # Memoria residente actual en Linux; en otros sistemas, el pico
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+class Histogram:
+    __slots__ = ("counts", "total", "count", "peak")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.peak = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.peak:
+            self.peak = value
+
+    def quantile(self, q):
+        # Estimación por cubetas: el límite superior de la que contiene el cuantil
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.peak)
+        return self.peak
+
+class Instrumentation:
+    def __init__(self, root, path, interval=10.0):
+        self.root = root
+        self.path = path
+        self.interval_ms = max(1, int(interval * 1000))
+        self.prometheus = path.endswith(".prom")
+        self.histograms = {}
+        self.callbacks = {}
+        self.started = time.time()
+        self.probe_due = None
+
+    def start(self):
+        self.probe_due = time.perf_counter() + PROBE_INTERVAL_MS / 1000
+        self.root.after(PROBE_INTERVAL_MS, self.probe)
+        self.root.after(self.interval_ms, self.export_periodically)
+        return self
+
+    def observe(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+    def wrap(self, name, callback):
+        # Devuelve el callback medido; solo se usa con la instrumentación activa
+        histogram = self.callbacks.setdefault(name, Histogram())
+        clock = time.perf_counter
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                histogram.observe(clock() - started)
+        return timed
+
+    def probe(self):
+        now = time.perf_counter()
+        self.observe("event_loop_lag_seconds", max(0.0, now - self.probe_due))
+        self.probe_due = now + PROBE_INTERVAL_MS / 1000
+        self.root.after(PROBE_INTERVAL_MS, self.probe)
+
+    def export_periodically(self):
+        self.export()
+        self.root.after(self.interval_ms, self.export_periodically)
+
+    def export(self):
+        text = self.render_prometheus() if self.prometheus else self.render_text()
+        # Escritura atómica: quien lee el archivo nunca ve un volcado a medias
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Error al exportar las métricas: {e}")
+
+    def gauges(self):
+        values = {"threads": threading.active_count(),
+                  "uptime_seconds": time.time() - self.started}
+        rss = rss_bytes()
+        if rss is not None:
+            values["rss_bytes"] = rss
+        return values
+
+    def render_text(self):
+        lines = [f"Métricas {time.strftime('%Y-%m-%d %H:%M:%S')}"]
+        for name, value in self.gauges().items():
+            lines.append(f"  {name:<28}{value:,.0f}")
+        lines.append("")
+        lines.append(f"  {'':<28}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'máx ms':>10}")
+        rows = sorted(self.histograms.items()) + [(f"callback {name}", h)
+                                                  for name, h in sorted(self.callbacks.items())]
+        for name, h in rows:
+            lines.append(f"  {name:<28}{h.count:>8}{h.quantile(0.5) * 1000:>10.2f}"
+                         f"{h.quantile(0.95) * 1000:>10.2f}{h.quantile(0.99) * 1000:>10.2f}"
+                         f"{h.peak * 1000:>10.2f}")
+        return "\n".join(lines) + "\n"
+
+    def render_prometheus(self):
+        lines = []
+        for name, value in self.gauges().items():
+            lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            lines.append(f"{PREFIX}_{name} {value}")
+        for name, h in sorted(self.histograms.items()):
+            self.prometheus_histogram(lines, name, h, "")
+        for label, h in sorted(self.callbacks.items()):
+            self.prometheus_histogram(lines, "callback_seconds", h, f'callback="{label}"',
+                                      header=label == min(self.callbacks))
+        return "\n".join(lines) + "\n"
+
+    def prometheus_histogram(self, lines, name, h, labels, header=True):
+        metric = f"{PREFIX}_{name}"
+        if header:
+            lines.append(f"# HELP {metric} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {metric} histogram")
+        prefix = labels + "," if labels else ""
+        cumulative = 0
+        for bound, count in zip(BUCKETS, h.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{prefix}le="+Inf"}} {h.count}')
+        suffix = "{" + labels + "}" if labels else ""
+        lines.append(f"{metric}_sum{suffix} {h.total}")
+        lines.append(f"{metric}_count{suffix} {h.count}")
@@ -1,102 +1,573 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
 import time
+STARTUP_T0 = time.perf_counter()
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import math
 import threading
+import queue
 import os
 import sys
-from pygame import mixer
-import webbrowser
-from datetime import datetime
-import urllib.request
-import io
-import base64
+import argparse
+import importlib
+
+from audio import AudioManager
+from events import EventBus
+from core import SYSTEM_CLOCK, PomodoroTimer, TimerSession, MODES
+from checkpoint import SessionCheckpoint, STATE_IDLE, STATE_RUNNING, STATE_PAUSED
+from history import HistoryStore
+from notifications import Notifier
+from instrumentation import Instrumentation
+from tasks import TaskStore, PRIORITIES
+from theme import ThemeEngine, PALETTES, DEFAULT_THEME
+
+ICON_URL = "https://cdn-icons-png.flaticon.com/512/6195/6195699.png"
+ICON_MAX_AGE = 30 * 24 * 3600     # refrescar el ícono en caché una vez al mes
+
+# Ícono de tomate embebido (PNG 32x32, base64) para cuando no hay caché
+EMBEDDED_ICON = (
+    "iVBORw0KGgoAAAANSUhEUgAAACAAAAAgCAYAAABzenr0AAAAfklEQVR42mNgGMog4Ff1fxAeeQ6A"
+    "WYyOB8ximjuEWIsHjUOobvH/0ND/yBiXxejqqG4xuXhALSfLEdS2nCRHYNU87QQmppUjBtQBODVS"
+    "0QF4HTHqAFql/lEHjDpg1AHUKQ3pVSENuAMGvDoeFA2SQdEko4ZDaN46ppvFwxoAAM/14YgD0O4Q"
+    "AAAAAElFTkSuQmCC"
+)
+
+def app_data_dir():
+    # Carpeta de datos por usuario; POMODORO_HOME permite cambiarla
+    base = os.environ.get("POMODORO_HOME")
+    if not base:
+        if sys.platform == "win32":
+            base = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "Pomodoro")
+        elif sys.platform == "darwin":
+            base = os.path.expanduser("~/Library/Application Support/Pomodoro")
+        else:
+            base = os.path.join(os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")),
+                                "pomodoro")
+    os.makedirs(base, exist_ok=True)
+    return base
+
+def blend(start, end, amount):
+    # Mezcla lineal entre dos colores "#RRGGBB"
+    a = [int(start[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(end[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(x + (y - x) * amount):02x}" for x, y in zip(a, b))
+
+class StartupProfiler:
+    # Registra la duración de cada fase del arranque hasta el primer cuadro.
+    # on_finish se llama justo después de medir el primer cuadro (informe o
+    # comprobación del presupuesto en la línea de comandos).
+    def __init__(self, origin=STARTUP_T0, on_finish=None):
+        self.origin = origin
+        self.last = origin
+        self.phases = []
+        self.first_frame = None
+        self.on_finish = on_finish
+    
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self.last) * 1000))
+        self.last = now
+    
+    def finish(self):
+        if self.first_frame is None:
+            self.mark("first_frame")
+            self.first_frame = (self.last - self.origin) * 1000
+            if self.on_finish is not None:
+                self.on_finish()
+    
+    def report(self):
+        lines = ["Arranque (ms):"]
+        for phase, elapsed in self.phases:
+            lines.append(f"  {phase:<14}{elapsed:8.1f}")
+        if self.first_frame is not None:
+            lines.append(f"  {'total':<14}{self.first_frame:8.1f}")
+        return "\n".join(lines)
 
 class ModernTooltip:
-    def __init__(self, widget, text):
+    # Todas las ayudas comparten una única ventana que se crea la primera vez y
+    # luego solo se mueve, cambia de texto y se muestra u oculta. Aparece tras
+    # un breve retraso; si el puntero sale antes, la muestra se cancela.
+    DELAY_MS = 500
+    theme = None    # ThemeEngine de la aplicación: la ventana sigue el tema actual
+    window = None
+    label = None
+    owner = None
+    
+    def __init__(self, widget, text, delay=None):
         self.widget = widget
         self.text = text
-        self.tooltip = None
-        self.widget.bind("<Enter>", self.show_tooltip)
-        self.widget.bind("<Leave>", self.hide_tooltip)
+        self.delay = self.DELAY_MS if delay is None else delay
+        self.show_id = None
+        self.widget.bind("<Enter>", self.schedule_show, add="+")
+        self.widget.bind("<Leave>", self.hide_tooltip, add="+")
+        self.widget.bind("<ButtonPress>", self.hide_tooltip, add="+")
+        self.widget.bind("<Destroy>", self.hide_tooltip, add="+")
+    
+    @classmethod
+    def shared_window(cls, widget):
+        if cls.window is None or not cls.window.winfo_exists():
+            cls.window = tk.Toplevel(widget._root())
+            cls.window.withdraw()
+            cls.window.wm_overrideredirect(True)
+            cls.window.attributes('-topmost', True)
+            
+            frame = tk.Frame(cls.window, borderwidth=1, relief="solid")
+            frame.pack(fill="both", expand=True)
+            
+            cls.label = tk.Label(frame, justify="left", wraplength=250, padx=10, pady=5,
+                                 font=("Segoe UI", 9))
+            cls.label.pack()
+            if cls.theme is not None:
+                cls.theme.register(frame, bg="surface")
+                cls.theme.register(cls.label, bg="surface", fg="text")
+        return cls.window
+    
+    def schedule_show(self, event=None):
+        self.cancel()
+        self.show_id = self.widget.after(self.delay, self.show_tooltip)
+    
+    def cancel(self):
+        if self.show_id is not None:
+            self.widget.after_cancel(self.show_id)
+            self.show_id = None
     
     def show_tooltip(self, event=None):
-        x, y, _, _ = self.widget.bbox("insert")
-        x += self.widget.winfo_rootx() + 25
-        y += self.widget.winfo_rooty() + 25
-        
-        self.tooltip = tk.Toplevel(self.widget)
-        self.tooltip.wm_overrideredirect(True)
-        self.tooltip.wm_geometry(f"+{x}+{y}")
-        self.tooltip.attributes('-topmost', True)
-        
-        frame = tk.Frame(self.tooltip, background="#282a36", borderwidth=1, relief="solid")
-        frame.pack(fill="both", expand=True)
-        
-        label = tk.Label(frame, text=self.text, justify="left", background="#282a36", 
-                        foreground="#f8f8f2", wraplength=250, padx=10, pady=5,
-                        font=("Segoe UI", 9))
-        label.pack()
+        self.show_id = None
+        window = self.shared_window(self.widget)
+        x = self.widget.winfo_rootx() + 25
+        y = self.widget.winfo_rooty() + self.widget.winfo_height() + 5
+        ModernTooltip.label.config(text=self.text)
+        window.wm_geometry(f"+{x}+{y}")
+        window.deiconify()
+        window.lift()
+        ModernTooltip.owner = self
     
     def hide_tooltip(self, event=None):
-        if self.tooltip:
-            self.tooltip.destroy()
-            self.tooltip = None
+        self.cancel()
+        if ModernTooltip.owner is self:
+            ModernTooltip.owner = None
+            if ModernTooltip.window.winfo_exists():
+                ModernTooltip.window.withdraw()
 
-class PomodoroApp:
+class TickScheduler:
+    # Único callback periódico de la interfaz: todas las tareas por segundo se
+    # ejecutan juntas en una sola llamada alineada al siguiente cambio de
+    # segundo. Con la ventana oculta no se programa nada y al volver a
+    # mostrarse se ejecuta una vez para ponerse al día. keep_alive permite
+    # seguir oculta: True mantiene los ticks por segundo (p. ej. con
+    # suscriptores de la API local) y un número de segundos, un tick lento.
+    MARGIN_MS = 1     # despertar justo después del límite, no justo antes
+    
+    def __init__(self, root, time_to_next_tick):
+        self.root = root
+        self.time_to_next_tick = time_to_next_tick
+        self.jobs = []
+        self.after_id = None
+        self.visible = True
+        self.keep_alive = None
+        # Con la instrumentación activa recibe el retraso de cada tick
+        self.on_dispatch = None
+        self.due = None
+    
+    def add(self, job):
+        self.jobs.append(job)
+    
+    def reschedule(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+            self.due = None
+        alive = self.visible or (self.keep_alive is not None and self.keep_alive())
+        if alive:
+            if alive is True:
+                delay = math.ceil(self.time_to_next_tick() * 1000) + self.MARGIN_MS
+            else:
+                delay = math.ceil(alive * 1000)
+            self.after_id = self.root.after(delay, self.tick)
+            if self.on_dispatch is not None:
+                self.due = time.perf_counter() + delay / 1000
+    
+    def tick(self):
+        self.after_id = None
+        due, self.due = self.due, None
+        if due is not None:
+            self.on_dispatch(time.perf_counter() - due)
+        for job in self.jobs:
+            job()
+        self.reschedule()
+    
+    def on_map(self, event=None):
+        if not self.visible:
+            self.visible = True
+            self.tick()
+    
+    def on_unmap(self, event=None):
+        self.visible = False
+        self.reschedule()
+
+class TimerViewModel:
+    # Estado mostrado en pantalla. Cada propiedad se compara con lo último que se
+    # dibujó y solo los cambios llegan a Tk, agrupados en un único callback
+    # "idle" por cuadro. Los enlaces de vistas ocultas (grupos inactivos) se
+    # omiten y se ponen al día al volver a activarse.
+    MISSING = object()
+    
     def __init__(self, root):
         self.root = root
+        self.bindings = {}
+        self.values = {}
+        self.pending = {}
+        self.inactive_groups = set()
+        self.flush_id = None
+    
+    def bind(self, name, apply, group=None):
+        # Cada enlace recuerda el último valor que aplicó: [función, grupo, valor]
+        self.bindings.setdefault(name, []).append([apply, group, self.MISSING])
+    
+    def set(self, name, value):
+        if name not in self.pending and self.values.get(name, self.MISSING) == value:
+            return
+        self.pending[name] = value
+        if self.flush_id is None:
+            self.flush_id = self.root.after_idle(self.flush)
+    
+    def flush(self):
+        self.flush_id = None
+        pending, self.pending = self.pending, {}
+        for name, value in pending.items():
+            self.values[name] = value
+            for binding in self.bindings.get(name, ()):
+                self.apply(binding, value)
+    
+    def apply(self, binding, value):
+        apply, group, last = binding
+        if group in self.inactive_groups or last == value:
+            return
+        binding[2] = value
+        apply(value)
+    
+    def set_group_active(self, group, active):
+        if not active:
+            self.inactive_groups.add(group)
+            return
+        self.inactive_groups.discard(group)
+        for name, bindings in self.bindings.items():
+            if name not in self.values:
+                continue
+            for binding in bindings:
+                if binding[1] == group:
+                    self.apply(binding, self.values[name])
+
+class VirtualTaskList:
+    # Lista virtualizada sobre un Canvas: solo existen ítems para las filas
+    # visibles y se reutilizan al desplazarse, así que el costo no depende de
+    # cuántas tareas haya.
+    ROW_HEIGHT = 24
+    
+    def __init__(self, parent, theme, rows=12, width=340, on_select=None, on_activate=None):
+        self.colors = colors = theme.colors
+        self.visible_rows = rows
+        self.width = width
+        self.on_select = on_select
+        self.on_activate = on_activate
+        self.items = []
+        self.first = 0
+        self.selected = None
+        self.frame = theme.register(tk.Frame(parent), bg="background")
+        self.canvas = theme.register(tk.Canvas(self.frame, width=width, height=rows * self.ROW_HEIGHT,
+                                               highlightthickness=0), bg="surface")
+        self.canvas.pack(side=tk.LEFT)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.rows = []
+        for i in range(rows):
+            top = i * self.ROW_HEIGHT
+            background = self.canvas.create_rectangle(0, top, width, top + self.ROW_HEIGHT,
+                                                      fill=colors["surface"], outline="")
+            title = self.canvas.create_text(8, top + self.ROW_HEIGHT / 2, anchor=tk.W, text="",
+                                            fill=colors["text"], font=("Segoe UI", 9))
+            meta = theme.register_item(
+                self.canvas, self.canvas.create_text(width - 8, top + self.ROW_HEIGHT / 2,
+                                                     anchor=tk.E, text="", font=("Segoe UI", 8)),
+                fill="text_secondary")
+            self.rows.append((background, title, meta))
+        self.canvas.bind("<Button-1>", self.click)
+        self.canvas.bind("<Double-Button-1>", self.double_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self.yview("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+    
+    def set_items(self, items):
+        self.items = items
+        self.first = max(0, min(self.first, len(items) - self.visible_rows))
+        self.redraw()
+    
+    def yview(self, *args):
+        if args[0] == "moveto":
+            first = int(float(args[1]) * len(self.items))
+        else:
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.visible_rows
+            first = self.first + step
+        self.first = max(0, min(first, len(self.items) - self.visible_rows))
+        self.redraw()
+    
+    def redraw(self):
+        colors = self.colors
+        for i, (background, title, meta) in enumerate(self.rows):
+            index = self.first + i
+            if index >= len(self.items):
+                self.canvas.itemconfig(background, fill=colors["surface"])
+                self.canvas.itemconfig(title, text="")
+                self.canvas.itemconfig(meta, text="")
+                continue
+            task = self.items[index]
+            if task.id == self.selected:
+                fill = colors["text_secondary"]
+            else:
+                fill = colors["surface"]
+            if task.done:
+                color = colors["text_secondary"]
+            elif task.active:
+                color = colors["accent"]
+            else:
+                color = colors["text"]
+            text = ("✓ " if task.done else "") + task.title
+            if len(text) > 42:
+                text = text[:41] + "…"
+            self.canvas.itemconfig(background, fill=fill)
+            self.canvas.itemconfig(title, text=text, fill=color)
+            self.canvas.itemconfig(meta, text=f"{task.actual}/{task.estimated} · {PRIORITIES[task.priority]}")
+        total = len(self.items) or 1
+        self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible_rows) / total))
+    
+    def task_at(self, y):
+        index = self.first + int(y // self.ROW_HEIGHT)
+        return self.items[index] if 0 <= index < len(self.items) else None
+    
+    def click(self, event):
+        task = self.task_at(event.y)
+        self.selected = task.id if task else None
+        self.redraw()
+        if task and self.on_select:
+            self.on_select(task)
+    
+    def double_click(self, event):
+        task = self.task_at(event.y)
+        if task and self.on_activate:
+            self.on_activate(task)
+
+class ProgressRing:
+    # Anillo de progreso animado sobre un único Canvas. Los ítems se crean una
+    # vez y cada cuadro solo ajusta el arco y el texto con itemconfig. Los cuadros
+    # siguen una rejilla del reloj monotónico; si uno excede su presupuesto la
+    # animación baja a 1 fps hasta que se reinicie.
+    FALLBACK_FPS = 1
+    
+    def __init__(self, parent, theme, source, fps=30, size=200, width=12):
+        self.root = parent.winfo_toplevel()
+        self.source = source
+        self.fps = fps
+        self.interval = 1 / fps
+        self.after_id = None
+        self.next_frame = None
+        self.extent = None
+        self.text = None
+        self.canvas = theme.register(tk.Canvas(parent, width=size, height=size,
+                                               highlightthickness=0), bg="background")
+        pad = width // 2 + 2
+        self.track_item = theme.register_item(
+            self.canvas, self.canvas.create_oval(pad, pad, size - pad, size - pad, width=width),
+            outline="surface")
+        self.arc_item = theme.register_item(
+            self.canvas, self.canvas.create_arc(pad, pad, size - pad, size - pad, start=90,
+                                                extent=0, style=tk.ARC, width=width),
+            outline="primary")
+        self.text_item = theme.register_item(
+            self.canvas, self.canvas.create_text(size / 2, size / 2, text="",
+                                                 font=("Segoe UI", 36, "bold")),
+            fill="primary")
+    
+    def set_progress(self, fraction):
+        # Sentido horario desde las 12; se redondea a décimas de grado
+        extent = round(-359.9 * min(1.0, max(0.0, fraction)), 1)
+        if extent != self.extent:
+            self.extent = extent
+            self.canvas.itemconfig(self.arc_item, extent=extent)
+    
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.canvas.itemconfig(self.text_item, text=text)
+    
+    def is_animating(self):
+        return self.after_id is not None
+    
+    def set_animating(self, animating):
+        if animating and self.after_id is None:
+            self.interval = 1 / self.fps
+            self.next_frame = time.monotonic()
+            self.frame()
+        elif not animating and self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+    
+    def frame(self):
+        fraction, text = self.source()
+        self.set_progress(fraction)
+        self.set_text(text)
+        now = time.monotonic()
+        if now - self.next_frame > self.interval:
+            # Cuadro fuera de presupuesto (trabajo + retraso del bucle de Tk)
+            self.interval = 1 / self.FALLBACK_FPS
+        self.next_frame += self.interval
+        if self.next_frame < now:
+            self.next_frame = now + self.interval
+        delay = max(1, int((self.next_frame - now) * 1000))
+        self.after_id = self.root.after(delay, self.frame)
+
+class PomodoroIndicator:
+    # Círculos de pomodoros del ciclo actual: un único Canvas con óvalos fijos que
+    # solo se recolorean con itemconfig cuando cambia el conteo.
+    def __init__(self, parent, theme, goal=4, size=20, pad=3):
+        self.colors = theme.colors
+        self.size = size
+        self.pad = pad
+        self.count = 0
+        self.filled = None
+        self.items = []
+        self.canvas = theme.register(tk.Canvas(parent, width=0, height=size, highlightthickness=0),
+                                     bg="background")
+        theme.add_listener(self.repaint)
+        self.set_goal(goal)
+    
+    def set_goal(self, goal):
+        # Los óvalos solo se recrean si cambia la meta del ciclo
+        if goal == len(self.items):
+            return
+        self.canvas.delete("all")
+        step = self.size + 2 * self.pad
+        inset = max(1, self.size // 10)
+        self.canvas.config(width=goal * step)
+        self.items = []
+        for i in range(goal):
+            x = i * step + self.pad
+            self.items.append(self.canvas.create_oval(x + inset, inset,
+                                                      x + self.size - inset, self.size - inset))
+        self.filled = None
+        self.set_count(self.count)
+    
+    def set_count(self, count):
+        self.count = count
+        filled = count % len(self.items) if self.items else 0
+        if filled == self.filled:
+            return
+        for i, item in enumerate(self.items):
+            was_filled = self.filled is not None and i < self.filled
+            if self.filled is not None and (i < filled) == was_filled:
+                continue
+            if i < filled:
+                self.canvas.itemconfig(item, fill=self.colors["primary"], outline="")
+            else:
+                self.canvas.itemconfig(item, fill="", outline=self.colors["text_secondary"])
+        self.filled = filled
+    
+    def repaint(self):
+        # Cambio de tema: todos los óvalos se recolorean
+        self.filled = None
+        self.set_count(self.count)
+
+class PomodoroApp:
+    EXPORT_POLL_MS = 200
+    FOLLOW_HIDDEN_SECONDS = 5.0   # lectura del estado compartido con la seguidora oculta
+    
+    def __init__(self, root, startup=None, ring_fps=None, api_port=None, sync=False,
+                 metrics_path=None, metrics_interval=10.0, clock=None, theme=DEFAULT_THEME,
+                 mode_accents=False):
+        self.root = root
+        self.startup = startup or StartupProfiler()
+        # Fuente de tiempo de la cuenta, la fecha mostrada y el historial
+        self.clock = clock or SYSTEM_CLOCK
+        self.ring_fps = ring_fps
         self.root.title("Pomodoro Elegante")
         self.root.geometry("400x600")
         self.root.resizable(False, False)
-        self.root.configure(bg="#191A21")
         
-        # Intentar cargar icono desde URL o usar respaldo
+        # Paletas y estilos precompilados; self.colors se actualiza en sitio al
+        # cambiar de tema, así que quien lo guarda siempre ve el tema actual
+        self.theme = ThemeEngine(self.root, theme, mode_accents)
+        self.colors = self.theme.colors
+        ModernTooltip.theme = self.theme
+        self.theme.register(self.root, bg="background")
+        
+        # Cargar ícono desde la caché local o usar el respaldo embebido
         self.load_icon()
+        self.startup.mark("icon")
         
         # Configurar ventana para que siempre esté por encima
         self.root.attributes("-topmost", True)
         
-        # Variables de tiempo en segundos
-        self.pomodoro_time = 25 * 60      # 25 minutos
-        self.short_break_time = 5 * 60    # 5 minutos
-        self.long_break_time = 15 * 60    # 15 minutos
-        self.current_time = self.pomodoro_time
-        self.timer_running = False
-        self.timer_paused = False
-        self.timer_thread = None
-        self.pomodoro_count = 0
-        self.current_mode = "Pomodoro"
-        self.tasks = []
+        # Modo, duraciones, conteo y la cuenta viven en el núcleo sin interfaz;
+        # current_time es solo el último valor mostrado
+        self.timer = PomodoroTimer(clock=self.clock)
+        self.cycle = self.timer.cycle
+        self.current_time = self.timer.remaining()
+        self.tasks = None          # TaskStore, se abre tras el primer cuadro
+        self.active_task = None
+        self.task_window = None
         self.show_info_panel = True
         self.compact_mode = False
         self.last_position = (0, 0)
-        
-        # Inicializar mixer para los sonidos
-        mixer.init()
-        
-        # Definir colores (Esquema Dracula)
-        self.colors = {
-            "background": "#191A21",
-            "surface": "#282A36",
-            "primary": "#FF79C6",
-            "secondary": "#8BE9FD",
-            "accent": "#50FA7B",
-            "text": "#F8F8F2",
-            "text_secondary": "#6272A4",
-            "error": "#FF5555",
-            "warning": "#FFB86C",
-            "success": "#50FA7B",
-            "info": "#BD93F9"
-        }
+        self.exit_code = 0
+        self.closed = False
+        self.api = None
+        # Eventos para complementos; se entregan en otros hilos, nunca en el de Tk
+        self.events = EventBus(clock=self.clock.time)
+        
+        # Los sonidos se decodifican en segundo plano al iniciar el primer período
+        self.audio = AudioManager(os.path.dirname(os.path.abspath(__file__)))
+        
+        self.scheduler = TickScheduler(self.root, self.time_to_next_tick)
+        
+        # Historial de períodos; se escribe en lotes desde un hilo propio
+        self.history = HistoryStore(os.path.join(app_data_dir(), "history.db"))
+        
+        # La sesión del núcleo (la misma que usa la simulación) arma un único
+        # hilo para toda la vida de la aplicación que solo avisa la fecha
+        # límite y anota los eventos; la cuenta en pantalla la lleva el planificador
+        self.session = TimerSession(self.timer, self.history, self.on_timer_due)
+        
+        # Con --sync una sola instancia lleva el temporizador y las demás lo
+        # reflejan desde memoria compartida
+        self.shared = None
+        self.shared_record = None
+        if sync:
+            # Solo con --sync: la memoria compartida no se carga en el arranque normal
+            from shared_state import SharedTimerState
+            self.shared = SharedTimerState(os.path.join(app_data_dir(), "leader.lock"))
+        
+        # Restaurar la sesión anterior desde el punto de control en disco
+        self.checkpoint = self.open_checkpoint()
+        restore_status = None
+        if not self.following():
+            restore_status = self.restore_checkpoint()
+            # Reescribir ya el punto de control: un período vencido que se acaba de
+            # contar no debe volver a contarse si la aplicación se corta ahora
+            self.save_checkpoint()
+            self.share_state()
+        
+        # Avisos no modales (toast y escritorio); la ventana se crea al primer aviso
+        self.notifier = Notifier(self.root, self.colors)
         
         # Configurar estilo
         self.setup_styles()
+        self.startup.mark("styles")
         
-        # Crear la interfaz
+        # Crear la interfaz (el modo compacto se construye al usarlo por primera vez)
         self.setup_ui()
-        
-        # Iniciar con panel de información visible
-        self.update_info_panel_visibility()
+        self.render(restore_status)
+        self.startup.mark("ui")
         
         # Manejar el cierre de la ventana
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -105,113 +576,157 @@ class PomodoroApp:
         self.root.bind("<Button-1>", self.start_move)
         self.root.bind("<ButtonRelease-1>", self.stop_move)
         self.root.bind("<B1-Motion>", self.do_move)
+        
+        # Instrumentación opcional: sin --metrics no se envuelve nada
+        self.metrics = None
+        if metrics_path:
+            self.metrics = Instrumentation(self.root, metrics_path, metrics_interval)
+            self.instrument()
+        
+        # Un solo tick por segundo para toda la interfaz, detenido si está oculta
+        self.scheduler.add(self.update_timer_ui)
+        self.scheduler.add(self.update_datetime)
+        self.root.bind("<Map>", self.on_map)
+        self.root.bind("<Unmap>", self.on_unmap)
+        self.scheduler.tick()
+        
+        # API local opcional para scripts y barras de estado
+        if api_port is not None:
+            self.start_api(api_port)
+        self.scheduler.keep_alive = self.needs_ticks
+        
+        self.root.after_idle(self.on_first_frame)
+    
+    def instrument(self):
+        # Los callbacks medidos reemplazan a los métodos en la instancia, así que
+        # quien los programa después (after, planificador) ya usa la versión medida
+        metrics = self.metrics
+        self.update_timer_ui = metrics.wrap("update_timer_ui", self.update_timer_ui)
+        self.update_datetime = metrics.wrap("update_datetime", self.update_datetime)
+        self.timer_finished = metrics.wrap("timer_finished", self.timer_finished)
+        self.view.flush = metrics.wrap("view_flush", self.view.flush)
+        if self.ring is not None:
+            self.ring.frame = metrics.wrap("ring_frame", self.ring.frame)
+        self.scheduler.on_dispatch = lambda delay: metrics.observe("tick_dispatch_seconds", delay)
+        metrics.start()
+    
+    def on_first_frame(self):
+        # Los redibujados pendientes son tareas "idle": al vaciarlas la ventana ya
+        # está pintada y se puede cerrar la medición del arranque.
+        self.root.update_idletasks()
+        self.startup.finish()
+        if self.closed:
+            return    # --startup-check ya cerró la ventana
+        # El panel de información (visible al iniciar) se arma después del
+        # primer cuadro, antes que el resto del trabajo diferido
+        self.root.after_idle(self.update_info_panel_visibility)
+        # Compilar los demás temas ahora, para que el primer cambio no pague nada
+        self.theme.precompile()
+        # Actualizar el ícono en segundo plano ahora que la ventana está visible
+        self.refresh_icon_cache()
+        self.load_tasks()
+    
+    # Estado, modo, conteo y meta por ciclo se delegan en el núcleo. Las
+    # asignaciones solo las usa una seguidora de --sync, que refleja a la líder
+    # sin poner en marcha su propio temporizador.
+    @property
+    def timer_running(self):
+        return self.timer.running
+    
+    @timer_running.setter
+    def timer_running(self, running):
+        self.timer.running = running
+    
+    @property
+    def timer_paused(self):
+        return self.timer.paused
+    
+    @timer_paused.setter
+    def timer_paused(self, paused):
+        self.timer.paused = paused
+    
+    @property
+    def current_mode(self):
+        return self.cycle.mode
+    
+    @current_mode.setter
+    def current_mode(self, mode):
+        self.cycle.mode = mode
+    
+    @property
+    def pomodoro_count(self):
+        return self.cycle.count
+    
+    @pomodoro_count.setter
+    def pomodoro_count(self, count):
+        self.cycle.count = count
+    
+    @property
+    def pomodoros_per_cycle(self):
+        return self.cycle.pomodoros_per_cycle
+    
+    @pomodoros_per_cycle.setter
+    def pomodoros_per_cycle(self, goal):
+        self.cycle.pomodoros_per_cycle = goal
     
     def load_icon(self):
+        # El ícono sale de la caché en disco o del respaldo embebido, nunca de la
+        # red: el arranque no depende de la conexión.
+        self.icon_path = os.path.join(app_data_dir(), "icon.png")
         try:
-            # URL de un ícono de tomate como respaldo
-            icon_url = "https://cdn-icons-png.flaticon.com/512/6195/6195699.png"
-            image_bytes = urllib.request.urlopen(icon_url).read()
-            icon_data = io.BytesIO(image_bytes)
-            
-            if sys.platform == 'win32':
-                import tempfile
-                from PIL import Image, ImageTk
-                
-                temp_icon = tempfile.NamedTemporaryFile(suffix='.ico', delete=False)
-                temp_icon.close()
-                
-                img = Image.open(icon_data)
-                img.save(temp_icon.name)
-                
-                self.root.iconbitmap(temp_icon.name)
-                
-                def cleanup_icon():
-                    try:
-                        os.unlink(temp_icon.name)
-                    except:
-                        pass
-                
-                self.root.after(1000, cleanup_icon)
-            else:
-                from PIL import Image, ImageTk
-                img = Image.open(icon_data)
-                photo = ImageTk.PhotoImage(img)
-                self.root.iconphoto(True, photo)
+            self.icon_photo = tk.PhotoImage(file=self.icon_path)
+        except (tk.TclError, OSError):
+            self.icon_photo = tk.PhotoImage(data=EMBEDDED_ICON)
+        self.root.iconphoto(True, self.icon_photo)
+    
+    def refresh_icon_cache(self):
+        # POMODORO_OFFLINE evita la red (mediciones reproducibles, equipos sin conexión)
+        if os.environ.get("POMODORO_OFFLINE"):
+            return
+        try:
+            age = time.time() - os.path.getmtime(self.icon_path)
+        except OSError:
+            age = None
+        if age is not None and age < ICON_MAX_AGE:
+            return
+        threading.Thread(target=self.download_icon, name="pomodoro-icon", daemon=True).start()
+    
+    def download_icon(self):
+        # Corre en segundo plano; se escribe a un temporal y se renombra de forma
+        # atómica para no dejar nunca un ícono a medias en la caché.
+        # urllib.request trae http.client y ssl: solo se carga si hay que descargar
+        import urllib.request
+        try:
+            with urllib.request.urlopen(ICON_URL, timeout=10) as response:
+                image_bytes = response.read()
+            temp_path = self.icon_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(image_bytes)
+            os.replace(temp_path, self.icon_path)
+            self.root.after(0, self.apply_cached_icon)
         except Exception as e:
+            print(f"Error al actualizar ícono: {e}")
+    
+    def apply_cached_icon(self):
+        try:
+            self.icon_photo = tk.PhotoImage(file=self.icon_path)
+            self.root.iconphoto(True, self.icon_photo)
+        except tk.TclError as e:
             print(f"Error al cargar ícono: {e}")
     
     def setup_styles(self):
-        self.style = ttk.Style()
-        self.style.theme_use("clam")
-        
-        self.style.configure("Title.TLabel", 
-                             font=("Segoe UI", 24, "bold"),
-                             background=self.colors["background"], 
-                             foreground=self.colors["accent"])
-        
-        self.style.configure("Subtitle.TLabel", 
-                             font=("Segoe UI", 18, "bold"),
-                             background=self.colors["background"], 
-                             foreground=self.colors["primary"])
-        
-        self.style.configure("Timer.TLabel", 
-                             font=("Segoe UI", 64, "bold"),
-                             background=self.colors["background"], 
-                             foreground=self.colors["primary"])
-        
-        self.style.configure("CompactTimer.TLabel", 
-                             font=("Segoe UI", 28, "bold"),
-                             background=self.colors["background"], 
-                             foreground=self.colors["primary"])
-        
-        self.style.configure("Text.TLabel", 
-                             font=("Segoe UI", 10),
-                             background=self.colors["background"], 
-                             foreground=self.colors["text"])
-        
-        self.style.configure("Info.TLabel", 
-                             font=("Segoe UI", 10),
-                             background=self.colors["surface"], 
-                             foreground=self.colors["text"])
-        
-        self.style.configure("InfoTitle.TLabel", 
-                             font=("Segoe UI", 12, "bold"),
-                             background=self.colors["surface"], 
-                             foreground=self.colors["info"])
-        
-        self.style.configure("Primary.TButton", 
-                             font=("Segoe UI", 10, "bold"),
-                             background=self.colors["primary"])
-        self.style.map("Primary.TButton",
-                       background=[("active", self.colors["secondary"])],
-                       foreground=[("active", self.colors["background"])])
-        
-        self.style.configure("Mode.TButton", 
-                             font=("Segoe UI", 10),
-                             background=self.colors["surface"])
-        self.style.map("Mode.TButton",
-                       background=[("active", self.colors["primary"])],
-                       foreground=[("active", self.colors["background"])])
-        
-        self.style.configure("Action.TButton", 
-                             font=("Segoe UI", 10),
-                             background=self.colors["surface"])
-        self.style.map("Action.TButton",
-                       background=[("active", self.colors["accent"])],
-                       foreground=[("active", self.colors["background"])])
-        
-        self.style.configure("Horizontal.TProgressbar", 
-                             background=self.colors["primary"],
-                             troughcolor=self.colors["surface"],
-                             borderwidth=0,
-                             thickness=10)
+        # Los estilos ttk se describen por rol en theme.py; aplicar el tema los
+        # configura todos en una pasada con las opciones ya compiladas
+        self.theme.apply()
+        self.style = self.theme.style
     
     def setup_ui(self):
-        self.main_container = tk.Frame(self.root, bg=self.colors["background"], padx=20, pady=20)
+        self.main_container = self.theme.register(tk.Frame(self.root, padx=20, pady=20),
+                                                  bg="background")
         self.main_container.pack(fill=tk.BOTH, expand=True)
         
         # Panel superior: Título y botones de configuración
-        self.top_panel = tk.Frame(self.main_container, bg=self.colors["background"])
+        self.top_panel = self.theme.register(tk.Frame(self.main_container), bg="background")
         self.top_panel.pack(fill=tk.X, pady=(0, 10))
         
         ttk.Label(self.top_panel, text="POMODORO TIMER", style="Title.TLabel").pack(side=tk.LEFT)
@@ -226,44 +741,58 @@ class PomodoroApp:
         self.compact_button.pack(side=tk.RIGHT, padx=(0, 5))
         ModernTooltip(self.compact_button, "Cambiar a modo compacto/normal")
         
-        # Panel de información
-        self.info_panel = tk.Frame(self.main_container, bg=self.colors["surface"], 
-                                   padx=15, pady=15, borderwidth=1, relief="solid")
-        ttk.Label(self.info_panel, text="¿Qué es la técnica Pomodoro?", 
-                  style="InfoTitle.TLabel").pack(anchor=tk.W, pady=(0, 5))
-        
-        info_text = """La técnica Pomodoro es un método de gestión del tiempo desarrollado por Francesco Cirillo que usa intervalos de tiempo para mejorar la productividad y reducir el agotamiento mental.
-
-Cómo funciona:
-1. Elige una tarea para trabajar
-2. Configura el temporizador (25 minutos por defecto)
-3. Trabaja en la tarea hasta que suene la alarma
-4. Toma un descanso corto (5 minutos)
-5. Después de completar 4 pomodoros, toma un descanso largo (15 minutos)
-
-Beneficios:
-• Mejora la concentración y atención
-• Reduce la fatiga mental
-• Aumenta la consciencia sobre el tiempo
-• Ayuda a evitar distracciones
-• Mejora la planificación de tareas"""
-        
-        info_label = ttk.Label(self.info_panel, text=info_text, style="Info.TLabel", 
-                               wraplength=360, justify="left")
-        info_label.pack(fill=tk.X, pady=5)
+        self.menu_button = ttk.Button(self.top_panel, text="☰", style="Primary.TButton",
+                                      command=self.show_menu, width=3)
+        self.menu_button.pack(side=tk.RIGHT, padx=(0, 5))
+        ModernTooltip(self.menu_button, "Más opciones")
+        self.menu = self.register_menu(tk.Menu(self.root, tearoff=0))
+        self.menu.add_command(label="Tareas", command=self.show_tasks)
+        self.menu.add_command(label="Estadísticas", command=self.show_stats)
+        self.menu.add_command(label="Exportar historial…", command=self.export_history)
+        self.export_thread = None
+        self.export_cancel = threading.Event()
+        # Avisos del hilo de exportación; solo el hilo de Tk los lee y los muestra
+        self.export_messages = queue.SimpleQueue()
+        self.theme_menu = self.register_menu(tk.Menu(self.menu, tearoff=0))
+        self.theme_var = tk.StringVar(value=self.theme.name)
+        for name in PALETTES:
+            self.theme_menu.add_radiobutton(label=name, value=name, variable=self.theme_var,
+                                            command=lambda: self.theme.set_theme(self.theme_var.get()))
+        self.theme_menu.add_separator()
+        self.mode_accents_var = tk.BooleanVar(value=self.theme.mode_accents)
+        self.theme_menu.add_checkbutton(label="Color según el modo", variable=self.mode_accents_var,
+                                        command=lambda: self.theme.set_mode_accents(
+                                            self.mode_accents_var.get()))
+        self.menu.add_cascade(label="Tema", menu=self.theme_menu)
+        self.stats_window = None
+        self.heatmap_matrix = None
+        self.theme.add_listener(self.repaint_windows)
+        
+        # El panel de información se construye al mostrarse por primera vez
+        self.info_panel = None
         
         # Panel del temporizador
-        self.timer_panel = tk.Frame(self.main_container, bg=self.colors["background"])
+        self.timer_panel = self.theme.register(tk.Frame(self.main_container), bg="background")
         self.timer_panel.pack(fill=tk.BOTH, expand=True, pady=10)
         
         self.mode_label = ttk.Label(self.timer_panel, text=self.current_mode, style="Subtitle.TLabel")
-        self.mode_label.pack(pady=(10, 5))
+        self.mode_label.pack(pady=(10, 0))
+        
+        self.task_label = ttk.Label(self.timer_panel, text="", style="Text.TLabel")
+        self.task_label.pack(pady=(0, 5))
         
-        self.timer_label = ttk.Label(self.timer_panel, text=self.format_time(self.current_time), 
-                                     style="Timer.TLabel")
-        self.timer_label.pack(pady=(0, 20))
+        if self.ring_fps:
+            # Anillo animado en lugar de la etiqueta y la barra de progreso
+            self.ring = ProgressRing(self.timer_panel, self.theme, self.ring_progress,
+                                     fps=self.ring_fps)
+            self.ring.canvas.pack(pady=(0, 10))
+        else:
+            self.ring = None
+            self.timer_label = ttk.Label(self.timer_panel, text=self.format_time(self.current_time), 
+                                         style="Timer.TLabel")
+            self.timer_label.pack(pady=(0, 20))
         
-        self.stats_frame = tk.Frame(self.timer_panel, bg=self.colors["background"])
+        self.stats_frame = self.theme.register(tk.Frame(self.timer_panel), bg="background")
         self.stats_frame.pack(fill=tk.X, pady=(0, 10))
         
         self.count_label = ttk.Label(self.stats_frame, 
@@ -271,18 +800,19 @@ Beneficios:
                                      style="Text.TLabel")
         self.count_label.pack(anchor=tk.W)
         
-        self.circles_frame = tk.Frame(self.stats_frame, bg=self.colors["background"])
-        self.circles_frame.pack(anchor=tk.W, pady=(5, 0))
-        self.update_pomodoro_circles()
+        self.circles = PomodoroIndicator(self.stats_frame, self.theme, self.pomodoros_per_cycle)
+        self.circles.canvas.pack(anchor=tk.W, pady=(5, 0))
+        self.circles.set_count(self.pomodoro_count)
         
-        self.progress_var = tk.DoubleVar(value=0)
-        self.progress_bar = ttk.Progressbar(self.timer_panel, orient="horizontal", 
-                                            length=360, mode="determinate", 
-                                            variable=self.progress_var,
-                                            style="Horizontal.TProgressbar")
-        self.progress_bar.pack(fill=tk.X, pady=(0, 20))
+        if self.ring is None:
+            self.progress_var = tk.DoubleVar(value=0)
+            self.progress_bar = ttk.Progressbar(self.timer_panel, orient="horizontal", 
+                                                length=360, mode="determinate", 
+                                                variable=self.progress_var,
+                                                style="Horizontal.TProgressbar")
+            self.progress_bar.pack(fill=tk.X, pady=(0, 20))
         
-        self.modes_frame = tk.Frame(self.timer_panel, bg=self.colors["background"])
+        self.modes_frame = self.theme.register(tk.Frame(self.timer_panel), bg="background")
         self.modes_frame.pack(fill=tk.X, pady=(0, 20))
         
         button_width = 12
@@ -308,7 +838,7 @@ Beneficios:
         self.modes_frame.grid_columnconfigure(1, weight=1)
         self.modes_frame.grid_columnconfigure(2, weight=1)
         
-        self.controls_frame = tk.Frame(self.timer_panel, bg=self.colors["background"])
+        self.controls_frame = self.theme.register(tk.Frame(self.timer_panel), bg="background")
         self.controls_frame.pack(fill=tk.X)
         
         control_width = 10
@@ -335,7 +865,8 @@ Beneficios:
         self.controls_frame.grid_columnconfigure(1, weight=1)
         self.controls_frame.grid_columnconfigure(2, weight=1)
         
-        self.bottom_panel = tk.Frame(self.main_container, bg=self.colors["background"], pady=10)
+        self.bottom_panel = self.theme.register(tk.Frame(self.main_container, pady=10),
+                                                bg="background")
         self.bottom_panel.pack(fill=tk.X, side=tk.BOTTOM)
         
         self.status_label = ttk.Label(self.bottom_panel, 
@@ -345,14 +876,85 @@ Beneficios:
         
         self.datetime_label = ttk.Label(self.bottom_panel, text="", style="Text.TLabel")
         self.datetime_label.pack(fill=tk.X, pady=(5, 0))
-        self.update_datetime()
         
-        self.setup_compact_ui()
+        # El modo compacto se construye la primera vez que se activa
+        self.compact_frame = None
+        
+        self.view = TimerViewModel(self.root)
+        self.bind_main_view()
+    
+    def bind_main_view(self):
+        view = self.view
+        if self.ring is not None:
+            view.bind("time_text", self.set_ring_text, "main")
+            view.bind("progress", self.set_ring_progress, "main")
+        else:
+            view.bind("time_text", lambda text: self.timer_label.config(text=text), "main")
+            view.bind("progress", self.progress_var.set, "main")
+        view.bind("mode", lambda mode: self.mode_label.config(text=mode), "main")
+        view.bind("task", lambda text: self.task_label.config(text=text), "main")
+        view.bind("count", lambda count: self.count_label.config(
+            text=f"Pomodoros completados: {count}"), "main")
+        view.bind("count", self.circles.set_count, "main")
+        view.bind("start_state", lambda state: self.start_button.config(state=state))
+        view.bind("pause_state", lambda state: self.pause_button.config(state=state))
+        view.bind("pause_text", lambda text: self.pause_button.config(text=text))
+        view.bind("status", lambda text: self.status_label.config(text=text))
+        view.bind("datetime", lambda text: self.datetime_label.config(text=text), "main")
+    
+    def set_ring_text(self, text):
+        # Mientras anima, el anillo toma el tiempo exacto en cada cuadro
+        if not self.ring.is_animating():
+            self.ring.set_text(text)
+    
+    def set_ring_progress(self, progress):
+        if not self.ring.is_animating():
+            self.ring.set_progress(progress / 100)
+    
+    def ring_progress(self):
+        # Una seguidora no corre su cuenta: muestra lo último leído de la líder
+        remaining = float(self.current_time) if self.following() else self.timer.timer.remaining_exact()
+        return 1 - remaining / self.get_mode_duration(), self.format_time(math.ceil(remaining))
+    
+    def bind_compact_view(self):
+        view = self.view
+        view.bind("time_text", lambda text: self.compact_timer.config(text=text), "compact")
+        view.bind("mode", lambda mode: self.compact_mode_label.config(text=mode[:3]), "compact")
+        view.bind("count", self.compact_circles.set_count, "compact")
+        view.bind("play_text", lambda text: self.compact_play.config(text=text), "compact")
+    
+    def setup_info_panel(self):
+        self.info_panel = self.theme.register(tk.Frame(self.main_container, padx=15, pady=15,
+                                                       borderwidth=1, relief="solid"),
+                                              bg="surface")
+        ttk.Label(self.info_panel, text="¿Qué es la técnica Pomodoro?", 
+                  style="InfoTitle.TLabel").pack(anchor=tk.W, pady=(0, 5))
+        
+        info_text = """La técnica Pomodoro es un método de gestión del tiempo desarrollado por Francesco Cirillo que usa intervalos de tiempo para mejorar la productividad y reducir el agotamiento mental.
+
+Cómo funciona:
+1. Elige una tarea para trabajar
+2. Configura el temporizador (25 minutos por defecto)
+3. Trabaja en la tarea hasta que suene la alarma
+4. Toma un descanso corto (5 minutos)
+5. Después de completar 4 pomodoros, toma un descanso largo (15 minutos)
+
+Beneficios:
+• Mejora la concentración y atención
+• Reduce la fatiga mental
+• Aumenta la consciencia sobre el tiempo
+• Ayuda a evitar distracciones
+• Mejora la planificación de tareas"""
+        
+        info_label = ttk.Label(self.info_panel, text=info_text, style="Info.TLabel", 
+                               wraplength=360, justify="left")
+        info_label.pack(fill=tk.X, pady=5)
     
     def setup_compact_ui(self):
-        self.compact_frame = tk.Frame(self.root, bg=self.colors["background"], padx=5, pady=5)
+        self.compact_frame = self.theme.register(tk.Frame(self.root, padx=5, pady=5),
+                                                 bg="background")
         
-        self.compact_top = tk.Frame(self.compact_frame, bg=self.colors["background"])
+        self.compact_top = self.theme.register(tk.Frame(self.compact_frame), bg="background")
         self.compact_top.pack(fill=tk.X, expand=True)
         
         self.expand_button = ttk.Button(self.compact_top, text="🗖", style="Primary.TButton",
@@ -368,7 +970,7 @@ Beneficios:
                                        style="CompactTimer.TLabel")
         self.compact_timer.pack(pady=(0, 5))
         
-        self.compact_buttons = tk.Frame(self.compact_frame, bg=self.colors["background"])
+        self.compact_buttons = self.theme.register(tk.Frame(self.compact_frame), bg="background")
         self.compact_buttons.pack(fill=tk.X)
         
         self.compact_play = ttk.Button(self.compact_buttons, text="▶", style="Action.TButton",
@@ -379,8 +981,10 @@ Beneficios:
                                         command=self.reset_timer, width=3)
         self.compact_reset.pack(side=tk.LEFT)
         
-        self.compact_circles = tk.Frame(self.compact_buttons, bg=self.colors["background"])
-        self.compact_circles.pack(side=tk.RIGHT)
+        self.compact_circles = PomodoroIndicator(self.compact_buttons, self.theme,
+                                                 self.pomodoros_per_cycle, size=10, pad=2)
+        self.compact_circles.canvas.pack(side=tk.RIGHT)
+        self.bind_compact_view()
         # Inicialmente el modo compacto está oculto.
         # self.compact_frame.pack_forget()
     
@@ -390,37 +994,16 @@ Beneficios:
         else:
             self.pause_timer()
     
-    def update_compact_ui(self):
-        self.compact_timer.config(text=self.format_time(self.current_time))
-        self.compact_mode_label.config(text=self.current_mode[:3])
-        
-        if not self.timer_running or self.timer_paused:
-            self.compact_play.config(text="▶")
-        else:
-            self.compact_play.config(text="⏸")
-        
-        for widget in self.compact_circles.winfo_children():
-            widget.destroy()
-        
-        for i in range(4):
-            canvas_size = 10
-            circle = tk.Canvas(self.compact_circles, width=canvas_size, height=canvas_size, 
-                                 bg=self.colors["background"], highlightthickness=0)
-            if i < (self.pomodoro_count % 4):
-                circle.create_oval(1, 1, canvas_size-1, canvas_size-1, 
-                                   fill=self.colors["primary"], outline="")
-            else:
-                circle.create_oval(1, 1, canvas_size-1, canvas_size-1, 
-                                   fill="", outline=self.colors["text_secondary"])
-            circle.pack(side=tk.LEFT, padx=2)
-    
     def toggle_compact_mode(self):
         self.compact_mode = not self.compact_mode
         
         if self.compact_mode:
+            if self.compact_frame is None:
+                self.setup_compact_ui()
             self.last_position = (self.root.winfo_x(), self.root.winfo_y())
             self.main_container.pack_forget()
-            self.update_compact_ui()
+            self.view.set_group_active("main", False)
+            self.view.set_group_active("compact", True)
             self.compact_frame.pack(fill=tk.BOTH, expand=True)
             
             screen_width = self.root.winfo_screenwidth()
@@ -432,8 +1015,11 @@ Beneficios:
             self.root.geometry(f"{compact_width}x{compact_height}+{x_position}+{y_position}")
         else:
             self.compact_frame.pack_forget()
+            self.view.set_group_active("compact", False)
+            self.view.set_group_active("main", True)
             self.main_container.pack(fill=tk.BOTH, expand=True)
             self.root.geometry("400x600+{}+{}".format(*self.last_position))
+        self.render()
     
     def start_move(self, event):
         if self.compact_mode:
@@ -452,10 +1038,261 @@ Beneficios:
             self.root.geometry(f"+{new_x}+{new_y}")
     
     def update_datetime(self):
-        now = datetime.now()
+        now = self.clock.now()
         date_text = now.strftime("%d/%m/%Y %H:%M:%S")
-        self.datetime_label.config(text=f"Última actualización: {date_text}")
-        self.root.after(1000, self.update_datetime)
+        self.view.set("datetime", f"Última actualización: {date_text}")
+    
+    def time_to_next_tick(self):
+        # Con la cuenta en marcha se sigue su fase; si no, el segundo del reloj
+        if self.timer_running and not self.timer_paused:
+            if self.following():
+                return (self.shared_record.deadline - self.clock.time()) % 1 or 1.0
+            return self.timer.timer.time_to_next_tick()
+        return 1 - self.clock.time() % 1
+    
+    def on_map(self, event):
+        if event.widget is self.root:
+            self.scheduler.on_map()
+    
+    def on_unmap(self, event):
+        if event.widget is self.root:
+            self.scheduler.on_unmap()
+            if self.ring is not None:
+                self.ring.set_animating(False)
+    
+    def register_menu(self, menu):
+        return self.theme.register(menu, bg="surface", fg="text", activebackground="primary",
+                                   activeforeground="background", selectcolor="primary")
+    
+    def repaint_windows(self):
+        # Lo que se pinta con colores calculados al dibujar se redibuja con el tema nuevo
+        if self.task_window is not None and self.task_window.winfo_exists():
+            self.task_list.redraw()
+        if self.heatmap_matrix is not None and self.stats_window.winfo_exists():
+            self.draw_heatmap(self.heatmap_matrix)
+    
+    def show_menu(self):
+        x = self.menu_button.winfo_rootx()
+        y = self.menu_button.winfo_rooty() + self.menu_button.winfo_height()
+        self.menu.tk_popup(x, y)
+    
+    def load_tasks(self):
+        try:
+            # Las escrituras van por la cola del historial: mismo archivo, un solo escritor
+            self.tasks = TaskStore(self.history.path, self.history.execute)
+        except Exception as e:
+            print(f"Error al cargar tareas: {e}")
+            return
+        self.active_task = self.tasks.active()
+        self.render()
+    
+    def show_tasks(self):
+        if self.tasks is None:
+            self.render("Las tareas no están disponibles.")
+            return
+        if self.task_window is None or not self.task_window.winfo_exists():
+            self.setup_task_window()
+        self.refresh_task_list()
+        self.task_window.deiconify()
+        self.task_window.lift()
+        self.task_entry.focus_set()
+    
+    def setup_task_window(self):
+        self.task_window = self.theme.register(tk.Toplevel(self.root, padx=15, pady=15),
+                                               bg="background")
+        self.task_window.title("Tareas")
+        self.task_window.resizable(False, False)
+        self.task_window.attributes("-topmost", True)
+        
+        ttk.Label(self.task_window, text="Tareas", style="Subtitle.TLabel").pack(anchor=tk.W)
+        ttk.Label(self.task_window, text="Escribe para filtrar; Enter agrega la tarea.",
+                  style="Text.TLabel").pack(anchor=tk.W, pady=(0, 5))
+        
+        entry_row = self.theme.register(tk.Frame(self.task_window), bg="background")
+        entry_row.pack(fill=tk.X, pady=(0, 5))
+        self.task_query = tk.StringVar()
+        self.task_query.trace_add("write", lambda *args: self.refresh_task_list())
+        self.task_entry = ttk.Entry(entry_row, textvariable=self.task_query, width=26)
+        self.task_entry.pack(side=tk.LEFT)
+        self.task_entry.bind("<Return>", self.add_task)
+        self.task_priority = ttk.Combobox(entry_row, values=list(PRIORITIES.values()),
+                                          state="readonly", width=6)
+        self.task_priority.set(PRIORITIES[2])
+        self.task_priority.pack(side=tk.LEFT, padx=5)
+        ModernTooltip(self.task_priority, "Prioridad de la nueva tarea")
+        self.task_estimate = ttk.Spinbox(entry_row, from_=1, to=20, width=3)
+        self.task_estimate.set(1)
+        self.task_estimate.pack(side=tk.LEFT)
+        ModernTooltip(self.task_estimate, "Pomodoros estimados")
+        
+        self.task_list = VirtualTaskList(self.task_window, self.theme,
+                                         on_activate=lambda task: self.activate_task(task.id))
+        self.task_list.frame.pack(fill=tk.X)
+        
+        buttons = self.theme.register(tk.Frame(self.task_window), bg="background")
+        buttons.pack(fill=tk.X, pady=(10, 0))
+        for column, (text, command) in enumerate((("Activar", self.activate_selected_task),
+                                                  ("Siguiente", self.activate_next_task),
+                                                  ("Completar", self.complete_selected_task),
+                                                  ("Eliminar", self.delete_selected_task))):
+            ttk.Button(buttons, text=text, style="Action.TButton", width=9,
+                       command=command).grid(row=0, column=column, padx=2)
+    
+    def refresh_task_list(self):
+        self.task_list.set_items(self.tasks.filter(self.task_query.get()))
+    
+    def add_task(self, event=None):
+        title = self.task_query.get().strip()
+        if not title:
+            return
+        priority = next(p for p, name in PRIORITIES.items() if name == self.task_priority.get())
+        try:
+            estimated = max(1, int(self.task_estimate.get()))
+        except ValueError:
+            estimated = 1
+        self.tasks.add(title, priority, estimated)
+        self.task_query.set("")
+    
+    def activate_task(self, task_id):
+        self.tasks.set_active(task_id)
+        self.active_task = self.tasks.tasks.get(task_id)
+        self.render()
+        if self.task_window is not None and self.task_window.winfo_exists():
+            self.task_list.redraw()
+    
+    def activate_selected_task(self):
+        if self.task_list.selected is not None:
+            self.activate_task(self.task_list.selected)
+    
+    def activate_next_task(self):
+        task = self.tasks.next_task()
+        if task is not None:
+            self.activate_task(task.id)
+    
+    def complete_selected_task(self):
+        task = self.tasks.tasks.get(self.task_list.selected)
+        if task is None:
+            return
+        self.tasks.set_done(task.id, not task.done)
+        if task is self.active_task and task.done:
+            self.active_task = None
+            self.render()
+        self.refresh_task_list()
+    
+    def delete_selected_task(self):
+        task = self.tasks.tasks.get(self.task_list.selected)
+        if task is None:
+            return
+        self.tasks.delete(task.id)
+        if task is self.active_task:
+            self.active_task = None
+            self.render()
+        self.task_list.selected = None
+        self.refresh_task_list()
+    
+    def export_history(self):
+        if self.export_thread is not None and self.export_thread.is_alive():
+            self.notifier.notify("Exportación", "Ya hay una exportación en curso.", key="export")
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self.root, title="Exportar historial", defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Columnar", "*.pomc")])
+        if not path:
+            return
+        # La consulta y la escritura van en un hilo con su propia conexión; la
+        # ventana solo recibe los avisos de avance y el resultado
+        self.export_cancel.clear()
+        self.export_thread = threading.Thread(target=self.run_export, args=(path,),
+                                              name="pomodoro-export", daemon=True)
+        self.export_thread.start()
+        self.notifier.notify("Exportación", f"Exportando a {os.path.basename(path)}…", key="export")
+        self.root.after(self.EXPORT_POLL_MS, self.poll_export)
+    
+    def run_export(self, path):
+        # En el hilo de exportación: nunca toca Tk, solo encola los avisos
+        import export
+        def progress(count):
+            self.export_messages.put((f"{count} eventos exportados…", True))
+        try:
+            count = export.export(self.history.path, path, progress=progress,
+                                  cancel=self.export_cancel)
+            message = f"{count} eventos exportados a {os.path.basename(path)}."
+        except export.ExportCancelled:
+            return
+        except Exception as e:
+            message = f"Error al exportar: {e}"
+        self.export_messages.put((message, False))
+    
+    def poll_export(self):
+        # El estado del hilo se lee antes de vaciar la cola: el último aviso
+        # se encola antes de que el hilo termine
+        running = self.export_thread is not None and self.export_thread.is_alive()
+        while True:
+            try:
+                message, progress = self.export_messages.get_nowait()
+            except queue.Empty:
+                break
+            self.notifier.notify("Exportación", message, "export", progress)
+        if running and not self.closed:
+            self.root.after(self.EXPORT_POLL_MS, self.poll_export)
+    
+    def show_stats(self):
+        # NumPy solo se importa al abrir el panel
+        try:
+            import stats
+        except ImportError:
+            self.render("Las estadísticas necesitan NumPy (pip install numpy).")
+            return
+        try:
+            report = stats.build_report(self.history.connection())
+        except Exception as e:
+            self.render(f"Error al calcular estadísticas: {e}")
+            return
+        if self.stats_window is None or not self.stats_window.winfo_exists():
+            self.setup_stats_window()
+        self.stats_label.config(text=stats.format_report(report))
+        self.draw_heatmap(report["heatmap"])
+        self.stats_window.deiconify()
+        self.stats_window.lift()
+    
+    def setup_stats_window(self):
+        self.stats_window = self.theme.register(tk.Toplevel(self.root, padx=15, pady=15),
+                                                bg="background")
+        self.stats_window.title("Estadísticas")
+        self.stats_window.resizable(False, False)
+        self.stats_window.attributes("-topmost", True)
+        
+        ttk.Label(self.stats_window, text="Estadísticas", style="Subtitle.TLabel").pack(anchor=tk.W)
+        self.stats_label = ttk.Label(self.stats_window, text="", style="Text.TLabel", justify="left")
+        self.stats_label.pack(anchor=tk.W, pady=(5, 10))
+        
+        ttk.Label(self.stats_window, text="Foco por hora del día", style="Text.TLabel").pack(anchor=tk.W)
+        cell = 14
+        self.heatmap = self.theme.register(tk.Canvas(self.stats_window, width=30 + 24 * cell,
+                                                     height=7 * cell, highlightthickness=0),
+                                           bg="background")
+        self.heatmap.pack(anchor=tk.W, pady=(5, 0))
+        # Las celdas se crean una vez; al actualizar solo cambia su color
+        self.heatmap_cells = []
+        for weekday, name in enumerate(("L", "M", "X", "J", "V", "S", "D")):
+            self.theme.register_item(
+                self.heatmap, self.heatmap.create_text(10, weekday * cell + cell / 2, text=name,
+                                                       font=("Segoe UI", 8)),
+                fill="text_secondary")
+            row = []
+            for hour in range(24):
+                x = 30 + hour * cell
+                row.append(self.heatmap.create_rectangle(x, weekday * cell, x + cell - 2,
+                                                         weekday * cell + cell - 2, outline=""))
+            self.heatmap_cells.append(row)
+    
+    def draw_heatmap(self, matrix):
+        self.heatmap_matrix = matrix
+        peak = matrix.max() or 1
+        for weekday, row in enumerate(self.heatmap_cells):
+            for hour, item in enumerate(row):
+                color = blend(self.colors["surface"], self.colors["primary"], matrix[weekday, hour] / peak)
+                self.heatmap.itemconfig(item, fill=color)
     
     def toggle_info_panel(self):
         self.show_info_panel = not self.show_info_panel
@@ -463,149 +1300,451 @@ Beneficios:
     
     def update_info_panel_visibility(self):
         if self.show_info_panel:
+            if self.info_panel is None:
+                self.setup_info_panel()
             self.info_panel.pack(fill=tk.X, pady=(0, 15), before=self.timer_panel)
             self.info_button.config(text="✕")
         else:
-            self.info_panel.pack_forget()
+            if self.info_panel is not None:
+                self.info_panel.pack_forget()
             self.info_button.config(text="ℹ️")
     
-    def update_pomodoro_circles(self):
-        for widget in self.circles_frame.winfo_children():
-            widget.destroy()
-        
-        for i in range(4):
-            circle = tk.Canvas(self.circles_frame, width=20, height=20, 
-                               bg=self.colors["background"], highlightthickness=0)
-            if i < (self.pomodoro_count % 4):
-                circle.create_oval(2, 2, 18, 18, fill=self.colors["primary"], outline="")
-            else:
-                circle.create_oval(2, 2, 18, 18, fill="", outline=self.colors["text_secondary"])
-            circle.pack(side=tk.LEFT, padx=3)
-        
-        if self.compact_mode:
-            self.update_compact_ui()
+    def set_pomodoros_per_cycle(self, goal):
+        self.pomodoros_per_cycle = goal
+        self.circles.set_goal(goal)
+        if self.compact_frame is not None:
+            self.compact_circles.set_goal(goal)
     
     def format_time(self, seconds):
         minutes, seconds = divmod(seconds, 60)
         return f"{minutes:02d}:{seconds:02d}"
     
+    def render(self, status=None):
+        # Vuelca el estado del modelo en la vista; solo lo que cambió llega a Tk
+        view = self.view
+        running = self.timer_running and not self.timer_paused
+        view.set("time_text", self.format_time(self.current_time))
+        view.set("progress", round((1 - self.current_time / self.get_mode_duration()) * 100, 1))
+        view.set("mode", self.current_mode)
+        self.theme.set_mode(self.current_mode)
+        view.set("count", self.pomodoro_count)
+        view.set("task", f"Tarea: {self.active_task.title}" if self.active_task else "")
+        following = self.following()
+        view.set("start_state", tk.DISABLED if running or following else tk.NORMAL)
+        view.set("pause_state", tk.NORMAL if self.timer_running and not following else tk.DISABLED)
+        view.set("pause_text", "▶ Reanudar" if self.timer_paused else "⏸ Pausar")
+        view.set("play_text", "⏸" if running else "▶")
+        if status is not None:
+            view.set("status", status)
+        if self.ring is not None:
+            self.ring.set_animating(running and self.scheduler.visible and not self.compact_mode)
+    
     def start_timer(self):
+        if self.read_only():
+            return
         if self.timer_running and self.timer_paused:
-            self.timer_paused = False
-            self.start_button.config(state=tk.DISABLED)
-            self.pause_button.config(state=tk.NORMAL, text="⏸ Pausar")
-            self.status_label.config(text=f"Reanudando {self.current_mode.lower()}...")
-            if self.compact_mode:
-                self.compact_play.config(text="⏸")
+            self.session.resume()
+            self.record_event("resume")
+            self.publish_timer("resume")
+            self.render(f"Reanudando {self.current_mode.lower()}...")
+            self.timer_state_changed()
             return
         
         if not self.timer_running:
-            self.timer_running = True
-            self.start_button.config(state=tk.DISABLED)
-            self.pause_button.config(state=tk.NORMAL)
-            if self.compact_mode:
-                self.compact_play.config(text="⏸")
-            
+            self.session.start()
+            self.audio.preload()
+            self.record_event("start")
+            self.publish_timer("start")
             if self.current_mode == "Pomodoro":
-                self.status_label.config(text="¡Concentración! Trabajando en el pomodoro actual...")
+                self.render("¡Concentración! Trabajando en el pomodoro actual...")
             else:
-                self.status_label.config(text=f"Tomando un {self.current_mode.lower()}. ¡Relájate!")
-            
-            self.timer_thread = threading.Thread(target=self.run_timer)
-            self.timer_thread.daemon = True
-            self.timer_thread.start()
+                self.render(f"Tomando un {self.current_mode.lower()}. ¡Relájate!")
+            self.timer_state_changed()
     
     def pause_timer(self):
+        if self.read_only():
+            return
         if self.timer_running and not self.timer_paused:
-            self.timer_paused = True
-            self.pause_button.config(text="▶ Reanudar")
-            self.start_button.config(state=tk.NORMAL)
-            self.status_label.config(text=f"{self.current_mode} en pausa. Continúa cuando estés listo.")
-            if self.compact_mode:
-                self.compact_play.config(text="▶")
+            self.session.pause()
+            self.record_event("pause")
+            self.publish_timer("pause")
+            self.render(f"{self.current_mode} en pausa. Continúa cuando estés listo.")
+            self.timer_state_changed()
         else:
-            self.timer_paused = False
-            self.pause_button.config(text="⏸ Pausar")
-            self.start_button.config(state=tk.DISABLED)
-            self.status_label.config(text=f"Reanudando {self.current_mode.lower()}...")
-            if self.compact_mode:
-                self.compact_play.config(text="⏸")
-    
-    def run_timer(self):
-        total_duration = self.get_mode_duration()
-        while self.current_time > 0 and self.timer_running:
-            if not self.timer_paused:
-                time.sleep(1)
-                self.current_time -= 1
-                self.root.after(0, self.update_timer_ui)
-            else:
-                time.sleep(0.1)
-        if self.current_time <= 0 and self.timer_running:
-            self.root.after(0, self.timer_finished)
+            self.session.resume()
+            self.record_event("resume")
+            self.publish_timer("resume")
+            self.render(f"Reanudando {self.current_mode.lower()}...")
+            self.timer_state_changed()
     
-    def update_timer_ui(self):
-        self.timer_label.config(text=self.format_time(self.current_time))
-        progress = (1 - self.current_time / self.get_mode_duration()) * 100
-        self.progress_var.set(progress)
-        if self.compact_mode:
-            self.update_compact_ui()
+    def timer_state_changed(self):
+        self.scheduler.reschedule()
+        self.save_checkpoint()
+        self.share_state()
+        self.publish("state", self.snapshot())
+    
+    def snapshot(self):
+        return {
+            "mode": self.current_mode,
+            "remaining": self.current_time,
+            "duration": self.get_mode_duration(),
+            "running": self.timer_running,
+            "paused": self.timer_paused,
+            "count": self.pomodoro_count,
+            "goal": self.pomodoros_per_cycle,
+            "task": self.active_task.title if self.active_task else None,
+        }
+    
+    def publish(self, kind, data):
+        # Ninguno de los dos bloquea: solo encolan para sus propios hilos
+        self.events.publish(kind, data)
+        if self.api is not None:
+            self.api.publish(kind, data)
     
-    def timer_finished(self):
-        self.timer_running = False
-        self.start_button.config(state=tk.NORMAL)
-        self.pause_button.config(state=tk.DISABLED, text="⏸ Pausar")
-        self.status_label.config(text=f"{self.current_mode} completado.")
+    def publish_timer(self, kind, **extra):
+        self.publish(kind, dict(mode=self.current_mode, remaining=self.current_time, **extra))
+    
+    def start_api(self, port):
+        # Solo con --api-port: asyncio y el servidor no se cargan en el arranque normal
+        from api import ControlServer
         try:
-            mixer.music.load("alarm_sound.mp3")
-            mixer.music.play()
-        except Exception as e:
-            print("Error al reproducir sonido:", e)
-        if self.current_mode == "Pomodoro":
-            self.pomodoro_count += 1
-            self.count_label.config(text=f"Pomodoros completados: {self.pomodoro_count}")
-            self.update_pomodoro_circles()
-        messagebox.showinfo("Tiempo completado", f"¡El {self.current_mode.lower()} ha finalizado!")
-    
-    def reset_timer(self):
-        self.timer_running = False
-        self.timer_paused = False
-        self.current_time = self.get_mode_duration()
-        self.timer_label.config(text=self.format_time(self.current_time))
-        self.progress_var.set(0)
-        self.start_button.config(state=tk.NORMAL)
-        self.pause_button.config(state=tk.DISABLED, text="⏸ Pausar")
-        self.status_label.config(text="Temporizador reiniciado.")
-        if self.compact_mode:
-            self.update_compact_ui()
+            self.api = ControlServer(self.handle_command, lambda fn: self.root.after(0, fn), port).start()
+        except OSError as e:
+            print(f"No se pudo iniciar la API local en el puerto {port}: {e}")
+    
+    def handle_command(self, command, params):
+        # Comandos de la API local; corre en el hilo de Tk
+        if command == "start":
+            self.start_timer()
+        elif command == "pause":
+            if self.timer_running and not self.timer_paused:
+                self.pause_timer()
+        elif command == "resume":
+            if self.timer_running and self.timer_paused:
+                self.start_timer()
+        elif command == "reset":
+            self.reset_timer()
+        elif command == "mode":
+            mode = params.get("mode")
+            if mode not in MODES:
+                raise ValueError(f"Modo desconocido: {mode}")
+            self.change_mode(mode, confirm=False)
+        elif command == "subscribe":
+            # Un suscriptor nuevo mantiene los ticks aunque la ventana esté oculta
+            self.scheduler.reschedule()
+        elif command != "status":
+            raise ValueError(f"Comando desconocido: {command}")
+        return self.snapshot()
+    
+    def open_checkpoint(self):
+        try:
+            return SessionCheckpoint(os.path.join(app_data_dir(), "session.ckpt"))
+        except (OSError, ValueError) as e:
+            print(f"Error al abrir el punto de control: {e}")
+            return None
+    
+    def timer_state(self):
+        remaining = self.timer.timer.remaining_exact()
+        if not self.timer_running:
+            state = STATE_IDLE
+        elif self.timer_paused:
+            state = STATE_PAUSED
+        else:
+            state = STATE_RUNNING
+        return state, remaining
+    
+    def save_checkpoint(self):
+        # Se guarda la fecha límite absoluta, no los segundos transcurridos: al
+        # restaurar, el tiempo restante se obtiene con una resta.
+        if self.checkpoint is None or self.following():
+            return
+        state, remaining = self.timer_state()
+        now = self.clock.time()
+        try:
+            self.checkpoint.save(state, self.current_mode, self.pomodoro_count,
+                                 remaining, now + remaining, now)
+        except (OSError, ValueError) as e:
+            print(f"Error al guardar el punto de control: {e}")
+    
+    def restore_checkpoint(self):
+        record = self.checkpoint.load() if self.checkpoint else None
+        if record is None or record.mode not in MODES:
+            return None
+        self.pomodoro_count = record.count
+        if record.state == STATE_RUNNING:
+            self.timer.restore(record.mode, record.deadline - self.clock.time(), running=True)
+            duration = self.get_mode_duration()
+            # Si el período terminó mientras la aplicación estaba cerrada, el
+            # núcleo lo cuenta y pasa al modo siguiente como en un final normal
+            finished = self.timer.poll()
+            if finished is not None:
+                self.session.record("finish", finished, duration, ts=record.deadline)
+                self.current_time = self.timer.remaining()
+                return (f"{finished} completado mientras la aplicación estaba cerrada. "
+                        f"Siguiente: {self.current_mode}.")
+            self.session.watch()
+            self.audio.preload()
+            self.current_time = self.timer.remaining()
+            return f"Sesión restaurada: {self.current_mode.lower()} en curso."
+        self.timer.restore(record.mode, record.remaining, running=record.state == STATE_PAUSED,
+                           paused=True)
+        self.current_time = self.timer.remaining()
+        if record.state == STATE_PAUSED:
+            return f"Sesión restaurada: {self.current_mode} en pausa."
+        return None
+    
+    def following(self):
+        return self.shared is not None and not self.shared.leader
+    
+    def read_only(self):
+        # Las seguidoras solo reflejan el temporizador de la instancia líder
+        if self.following():
+            self.render("El temporizador se controla desde otra ventana.")
+            return True
+        return False
+    
+    def needs_ticks(self):
+        # Oculta, la ventana sigue con los ticks si otros dependen de ellos: los
+        # suscriptores de la API o las seguidoras, que leen el latido de la líder.
+        # Una seguidora oculta sigue leyendo, más despacio, para notar si la
+        # líder cayó y tomar el relevo.
+        if bool(self.api and self.api.clients) or (self.shared is not None and self.shared.leader):
+            return True
+        if self.following():
+            return self.FOLLOW_HIDDEN_SECONDS
+        return False
+    
+    def share_state(self):
+        if self.shared is None or not self.shared.leader:
+            return
+        state, remaining = self.timer_state()
+        self.shared.publish(state, self.current_mode, self.pomodoro_count, remaining,
+                            self.clock.time() + remaining)
+    
+    def follow_shared(self):
+        # Sin hilo de temporizador propio: el estado se lee del bloque compartido
+        record = self.shared.follow()
+        if self.shared.leader:
+            self.take_over()
+            return
+        if record is None or record.mode not in MODES:
+            self.render("Esperando a la ventana que controla el temporizador...")
+            return
+        self.shared_record = record
+        self.current_mode = record.mode
+        self.pomodoro_count = record.count
+        self.timer_running = record.state != STATE_IDLE
+        self.timer_paused = record.state == STATE_PAUSED
+        from shared_state import remaining_of
+        self.current_time = math.ceil(remaining_of(record, self.clock.time()))
+        self.render()
+    
+    def take_over(self):
+        # La líder se cerró o dejó de responder: se continúa desde el último
+        # estado reflejado
+        from shared_state import remaining_of
+        record = self.shared_record
+        if record is not None:
+            self.session.restore(record.mode, remaining_of(record, self.clock.time()),
+                                 running=record.state != STATE_IDLE,
+                                 paused=record.state == STATE_PAUSED)
+            self.current_time = self.timer.remaining()
+            if record.state == STATE_RUNNING:
+                self.audio.preload()
+        self.render("Esta ventana controla ahora el temporizador.")
+        self.timer_state_changed()
+    
+    def active_task_id(self):
+        return self.active_task.id if self.active_task else None
+    
+    def record_event(self, event):
+        # Solo encola: la escritura a disco ocurre en el hilo del historial
+        self.session.record(event, task=self.active_task_id())
+    
+    def on_timer_due(self):
+        # Llamado desde el hilo vigilante: se delega al hilo de Tk
+        self.root.after(0, self.handle_timer_due, time.perf_counter())
+    
+    def handle_timer_due(self, sent=None):
+        if self.metrics is not None and sent is not None:
+            self.metrics.observe("finish_dispatch_seconds", time.perf_counter() - sent)
+        if self.following():
+            return
+        # La sesión anota el final en el historial; el resto es de la interfaz
+        finished = self.session.due(self.active_task_id())
+        if finished is not None:
+            self.timer_finished(finished)
+    
+    def update_timer_ui(self):
+        # El tiempo restante se lee de la fecha límite del núcleo
+        if self.following():
+            self.follow_shared()
+            return
+        if self.timer_running and not self.timer_paused:
+            timer = self.timer.timer
+            # Al llegar a cero o tras una suspensión no se espera al hilo vigilante
+            if timer.resync() or timer.remaining_exact() <= 0:
+                self.handle_timer_due()
+                return
+            remaining = timer.remaining()
+            if remaining != self.current_time:
+                self.current_time = remaining
+                self.publish("tick", {"mode": self.current_mode, "remaining": remaining})
+        self.share_state()
+        self.render()
+    
+    def timer_finished(self, finished):
+        # El núcleo ya contó el período y pasó al modo siguiente (detenido, salvo
+        # con auto_start) y la sesión ya lo anotó; aquí queda lo de la interfaz
+        self.current_time = self.timer.remaining()
+        # Sin E/S ni decodificación: el sonido ya está en memoria
+        if not self.audio.play(finished):
+            self.root.bell()
+        if finished == "Pomodoro":
+            if self.active_task is not None:
+                self.tasks.add_pomodoro(self.active_task.id)
+                if self.task_window is not None and self.task_window.winfo_exists():
+                    self.task_list.redraw()
+        self.publish("finish", {"mode": finished, "count": self.pomodoro_count,
+                                "next": self.current_mode})
+        self.render(f"{finished} completado. Siguiente: {self.current_mode}.")
+        self.timer_state_changed()
+        self.notifier.notify("Tiempo completado", f"¡El {finished.lower()} ha finalizado!",
+                             key="finish")
+    
+    def reset_timer(self, reason="reset"):
+        if self.read_only():
+            return
+        # Reiniciar un período ya empezado cuenta como abandonado en el historial
+        if self.timer_running:
+            self.record_event(reason)
+        self.publish_timer("reset", reason=reason, running=self.timer_running)
+        self.session.reset()
+        self.current_time = self.timer.remaining()
+        self.render("Temporizador reiniciado.")
+        self.timer_state_changed()
     
     def get_mode_duration(self):
-        if self.current_mode == "Pomodoro":
-            return self.pomodoro_time
-        elif self.current_mode == "Descanso Corto":
-            return self.short_break_time
-        elif self.current_mode == "Descanso Largo":
-            return self.long_break_time
-        return self.pomodoro_time
-    
-    def change_mode(self, mode):
+        return self.cycle.duration(self.current_mode)
+    
+    def change_mode(self, mode, confirm=True):
+        if self.read_only():
+            return
         if self.timer_running:
-            if not messagebox.askyesno("Confirmar", "El temporizador está corriendo. ¿Deseas cambiar de modo y reiniciar el temporizador?"):
+            if confirm and not messagebox.askyesno("Confirmar", "El temporizador está corriendo. ¿Deseas cambiar de modo y reiniciar el temporizador?"):
                 return
-            self.reset_timer()
-        self.current_mode = mode
-        self.mode_label.config(text=mode)
-        if self.compact_mode:
-            self.compact_mode_label.config(text=mode[:3])
-        self.current_time = self.get_mode_duration()
-        self.timer_label.config(text=self.format_time(self.current_time))
-        self.progress_var.set(0)
-        self.status_label.config(text=f"Modo cambiado a {mode}. Listo para iniciar.")
+            self.reset_timer("mode_change")
+        self.session.change_mode(mode)
+        self.current_time = self.timer.remaining()
+        self.publish("mode_change", {"mode": mode, "duration": self.current_time})
+        self.render(f"Modo cambiado a {mode}. Listo para iniciar.")
+        self.timer_state_changed()
     
     def on_close(self):
-        self.timer_running = False
+        self.closed = True
+        self.export_cancel.set()
+        # El punto de control conserva el estado real (también si está en marcha)
+        self.save_checkpoint()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        self.session.stop()
+        if self.api is not None:
+            self.api.stop()
+        if self.shared is not None:
+            self.shared.close()
+        if self.metrics is not None:
+            self.metrics.export()
+        self.audio.stop()
+        self.events.close()
+        self.history.close()
+        if self.tasks is not None:
+            self.tasks.close()
         self.root.destroy()
 
-if __name__ == "__main__":
+def load_plugin(events, name):
+    # Un complemento es un módulo importable con register(bus); sus manejadores
+    # reciben los eventos en los hilos del bus, así que no deben tocar widgets
+    try:
+        importlib.import_module(name).register(events)
+    except Exception as e:
+        print(f"No se pudo cargar el complemento {name}: {e}")
+
+def check_startup(app, budget_ms):
+    # Modo de medición: informa el arranque, cierra la ventana y devuelve el
+    # código de salida según el presupuesto de tiempo hasta el primer cuadro.
+    print(app.startup.report(), file=sys.stderr)
+    if budget_ms is not None and app.startup.first_frame > budget_ms:
+        print(f"Arranque por encima del presupuesto: {app.startup.first_frame:.1f} ms > {budget_ms:.1f} ms",
+              file=sys.stderr)
+        app.exit_code = 1
+    app.on_close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pomodoro Elegante")
+    parser.add_argument("--ring-fps", type=int, metavar="FPS",
+                        help="mostrar un anillo de progreso animado a FPS cuadros por segundo")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="mostrar en stderr el tiempo de cada fase del arranque")
+    parser.add_argument("--startup-check", type=float, metavar="MS",
+                        help="medir el arranque, cerrar y salir con código 1 si el primer "
+                             "cuadro tarda más de MS milisegundos")
+    parser.add_argument("--api-port", type=int, metavar="PORT",
+                        help="abrir la API local de control (HTTP y WebSocket) en 127.0.0.1:PORT")
+    parser.add_argument("--sync", action="store_true",
+                        help="sincronizar el temporizador entre varias ventanas abiertas")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="medir latencias de la interfaz y volcarlas en PATH "
+                             "(formato de Prometheus si termina en .prom)")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, metavar="S",
+                        help="segundos entre volcados de métricas (por defecto 10)")
+    parser.add_argument("--theme", choices=list(PALETTES), default=DEFAULT_THEME,
+                        help="tema de colores inicial")
+    parser.add_argument("--mode-accents", action="store_true",
+                        help="cambiar el color principal según el modo (foco o descanso)")
+    parser.add_argument("--export", metavar="PATH",
+                        help="exportar el historial a PATH (- para la salida estándar) y salir")
+    parser.add_argument("--export-format", choices=("csv", "jsonl", "pomc"),
+                        help="formato de --export (por defecto, según la extensión)")
+    parser.add_argument("--since", metavar="AAAA-MM-DD", help="primer día que exporta --export")
+    parser.add_argument("--until", metavar="AAAA-MM-DD", help="último día que exporta --export")
+    parser.add_argument("--plugin", action="append", default=[], metavar="MODULE",
+                        help="cargar un complemento (módulo con register(bus)); se puede repetir")
+    parser.add_argument("--simulate", type=int, metavar="DAYS",
+                        help="simular DAYS jornadas con un reloj virtual, sin ventana, y "
+                             "verificar deriva, historial y memoria")
+    args = parser.parse_args(argv)
+    
+    if args.simulate is not None:
+        import simulation
+        return simulation.main(["--days", str(args.simulate)])
+    
+    if args.export is not None:
+        import export
+        options = ["--db", os.path.join(app_data_dir(), "history.db")]
+        for flag, value in (("--format", args.export_format), ("--since", args.since),
+                            ("--until", args.until)):
+            if value is not None:
+                options += [flag, value]
+        return export.main(options + ["--", args.export])
+    
+    # El informe y la comprobación corren al medir el primer cuadro, desde
+    # on_first_frame; app y startup ya existen cuando se llaman
+    on_finish = None
+    if args.startup_check is not None:
+        on_finish = lambda: check_startup(app, args.startup_check)
+    elif args.startup_report:
+        on_finish = lambda: print(startup.report(), file=sys.stderr)
+    startup = StartupProfiler(on_finish=on_finish)
     root = tk.Tk()
-    app = PomodoroApp(root)
+    startup.mark("tk")
+    app = PomodoroApp(root, startup, ring_fps=args.ring_fps, api_port=args.api_port,
+                      sync=args.sync, metrics_path=args.metrics,
+                      metrics_interval=args.metrics_interval, theme=args.theme,
+                      mode_accents=args.mode_accents)
+    for name in args.plugin:
+        load_plugin(app.events, name)
     root.mainloop()
+    return app.exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import shutil
+import subprocess
+import sys
+import threading
+import tkinter as tk
+from collections import OrderedDict, deque
+
+# Avisos sin ventanas modales. Cada aviso se muestra en un "toast": una única
+# ventana sin bordes que se reutiliza, se oculta sola y nunca toma el foco. Si
+# la ventana principal no tiene el foco, además se pasa al sistema de
+# notificaciones del escritorio (notify-send u osascript) desde un hilo aparte.
+# Los avisos con la misma clave se agrupan: si ya hay uno en pantalla o en
+# espera, se actualiza su texto en lugar de encolar otro. Un aviso de avance
+# (progress=True) solo reemplaza el texto, no cuenta como repetición y no se
+# pasa al escritorio: allí solo llega el resultado.
+TOAST_MS = 5000
+TOAST_MARGIN = 20
+MAX_PENDING = 8
+DESKTOP_TIMEOUT = 5
+
+def desktop_command(title, message):
+    if sys.platform == "darwin":
+        if shutil.which("osascript"):
+            script = f"display notification {applescript(message)} with title {applescript(title)}"
+            return ["osascript", "-e", script]
+    elif sys.platform != "win32" and shutil.which("notify-send"):
+        return ["notify-send", "--app-name=Pomodoro", title, message]
+    return None
+
+def applescript(text):
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+class DesktopNotifier:
+    # Hilo que entrega los avisos al escritorio; solo guarda el último por clave
+    def __init__(self):
+        self.pending = OrderedDict()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.available = None
+
+    def send(self, key, title, message):
+        if self.available is None:
+            self.available = desktop_command(title, message) is not None
+        if not self.available:
+            return
+        with self.condition:
+            self.pending.pop(key, None)
+            self.pending[key] = (title, message)
+            while len(self.pending) > MAX_PENDING:
+                self.pending.popitem(last=False)
+            self.condition.notify()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="pomodoro-notify", daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                _, (title, message) = self.pending.popitem(last=False)
+            command = desktop_command(title, message)
+            try:
+                subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               timeout=DESKTOP_TIMEOUT, check=False)
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f"Error al enviar la notificación: {e}")
+
+class Notifier:
+    def __init__(self, root, colors, desktop=True):
+        self.root = root
+        self.colors = colors
+        self.desktop = DesktopNotifier() if desktop else None
+        self.queue = deque()
+        self.current = None
+        self.window = None
+        self.hide_id = None
+
+    def notify(self, title, message, key=None, progress=False):
+        # Nunca bloquea: encola, agrupa por clave y vuelve enseguida
+        key = key or title
+        repeat = 0 if progress else 1
+        if self.desktop is not None and not progress and not self.has_focus():
+            self.desktop.send(key, title, message)
+        if self.current is not None and self.current[0] == key:
+            self.current = (key, title, message, self.current[3] + repeat)
+            self.show_current()
+            return
+        for i, (pending_key, _, _, count) in enumerate(self.queue):
+            if pending_key == key:
+                self.queue[i] = (key, title, message, count + repeat)
+                return
+        if len(self.queue) >= MAX_PENDING:
+            self.queue.popleft()
+        self.queue.append((key, title, message, 1))
+        if self.current is None:
+            self.show_next()
+
+    def has_focus(self):
+        try:
+            return self.root.focus_displayof() is not None
+        except KeyError:
+            # El foco está en un widget interno de Tk (p. ej. un menú desplegado)
+            return True
+
+    def setup_window(self):
+        self.window = tk.Toplevel(self.root, padx=12, pady=10)
+        self.window.withdraw()
+        self.window.overrideredirect(True)
+        self.window.attributes("-topmost", True)
+        self.title_label = tk.Label(self.window, font=("Segoe UI", 11, "bold"), anchor=tk.W)
+        self.title_label.pack(fill=tk.X)
+        self.message_label = tk.Label(self.window, font=("Segoe UI", 10), anchor=tk.W,
+                                      justify=tk.LEFT, wraplength=280)
+        self.message_label.pack(fill=tk.X)
+        for widget in (self.window, self.title_label, self.message_label):
+            widget.bind("<Button-1>", self.dismiss)
+    
+    def paint(self):
+        # Los colores se leen al mostrar cada aviso: siguen al tema activo
+        colors = self.colors
+        self.window.config(bg=colors["surface"])
+        self.title_label.config(bg=colors["surface"], fg=colors["accent"])
+        self.message_label.config(bg=colors["surface"], fg=colors["text"])
+
+    def show_next(self):
+        if not self.queue:
+            self.current = None
+            if self.window is not None:
+                self.window.withdraw()
+            return
+        self.current = self.queue.popleft()
+        self.show_current()
+
+    def show_current(self):
+        if self.window is None:
+            self.setup_window()
+        self.paint()
+        _, title, message, count = self.current
+        self.title_label.config(text=title if count == 1 else f"{title} (×{count})")
+        self.message_label.config(text=message)
+        self.window.update_idletasks()
+        width = self.window.winfo_reqwidth()
+        height = self.window.winfo_reqheight()
+        x = self.root.winfo_screenwidth() - width - TOAST_MARGIN
+        y = self.root.winfo_screenheight() - height - TOAST_MARGIN * 3
+        self.window.geometry(f"+{x}+{y}")
+        self.window.deiconify()
+        self.window.lift()
+        if self.hide_id is not None:
+            self.root.after_cancel(self.hide_id)
+        self.hide_id = self.root.after(TOAST_MS, self.dismiss)
+
+    def dismiss(self, event=None):
+        if self.hide_id is not None:
+            self.root.after_cancel(self.hide_id)
+            self.hide_id = None
+        self.show_next()
@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+from core import SYSTEM_CLOCK, PomodoroCycle, PomodoroTimer
+
+class TimerService:
+    # Muchos temporizadores con nombre en un solo bucle asyncio. No hay una tarea
+    # por temporizador: un montículo ordena las fechas límite y una sola
+    # corrutina duerme hasta la más próxima. Cada cambio de estado da al
+    # temporizador una versión nueva, así que las entradas viejas del montículo
+    # se descartan al salir (borrado perezoso) sin tener que buscarlas. Las
+    # versiones salen de un único contador y nunca se repiten: un temporizador
+    # quitado y vuelto a crear con el mismo nombre no revive entradas viejas.
+    def __init__(self, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.timers = {}
+        self.versions = {}
+        self.heap = []
+        self.counter = itertools.count(1)
+        self.listeners = []
+        self.wakeup = asyncio.Event()
+        self.runner = None
+
+    def add_listener(self, callback):
+        # callback(name, finished_mode, timer) al terminar cada período
+        self.listeners.append(callback)
+
+    def create(self, name, durations=None, pomodoros_per_cycle=4, auto_start=False):
+        if name in self.timers:
+            raise KeyError(f"Ya existe el temporizador: {name}")
+        cycle = PomodoroCycle(durations, pomodoros_per_cycle)
+        self.timers[name] = PomodoroTimer(cycle, auto_start, self.clock)
+        self.versions[name] = next(self.counter)
+        return self.timers[name]
+
+    def remove(self, name):
+        del self.timers[name]
+        del self.versions[name]
+
+    def get(self, name):
+        try:
+            return self.timers[name]
+        except KeyError:
+            raise KeyError(f"Temporizador desconocido: {name}") from None
+
+    def schedule(self, name):
+        version = self.versions[name] = next(self.counter)
+        deadline = self.timers[name].deadline()
+        if deadline is None:
+            return
+        # Solo hace falta despertar al planificador si hay una nueva fecha más próxima
+        if not self.heap or deadline < self.heap[0][0]:
+            self.wakeup.set()
+        heapq.heappush(self.heap, (deadline, version, name))
+
+    def start(self, name):
+        self.get(name).start()
+        self.schedule(name)
+
+    def pause(self, name):
+        self.get(name).pause()
+        self.schedule(name)
+
+    def resume(self, name):
+        self.get(name).resume()
+        self.schedule(name)
+
+    def reset(self, name):
+        self.get(name).reset()
+        self.schedule(name)
+
+    def change_mode(self, name, mode):
+        self.get(name).change_mode(mode)
+        self.schedule(name)
+
+    def status(self, name=None):
+        if name is not None:
+            return self.get(name).status()
+        return {n: timer.status() for n, timer in self.timers.items()}
+
+    def pending(self):
+        return len(self.heap)
+
+    def dispatch(self):
+        # Atiende todas las fechas vencidas; devuelve la espera hasta la siguiente
+        now = self.clock.monotonic()
+        while self.heap:
+            deadline, version, name = self.heap[0]
+            if self.versions.get(name) != version:
+                heapq.heappop(self.heap)
+                continue
+            if deadline > now:
+                return deadline - now
+            heapq.heappop(self.heap)
+            timer = self.timers[name]
+            finished = timer.finish()
+            self.schedule(name)
+            for callback in self.listeners:
+                try:
+                    callback(name, finished, timer)
+                except Exception as e:
+                    print(f"Error en el aviso de {name}: {e}")
+        return None
+
+    async def run(self):
+        while True:
+            self.wakeup.clear()
+            delay = self.dispatch()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start_service(self):
+        if self.runner is None:
+            self.runner = asyncio.get_running_loop().create_task(self.run())
+        return self.runner
+
+    async def stop(self):
+        if self.runner is not None:
+            self.runner.cancel()
+            try:
+                await self.runner
+            except asyncio.CancelledError:
+                pass
+            self.runner = None
+
+async def load_test(count, seconds, duration):
+    # Prueba de carga: muchos temporizadores cortos que se reinician solos
+    service = TimerService()
+    finished = [0]
+    service.add_listener(lambda name, mode, timer: finished.__setitem__(0, finished[0] + 1))
+    service.start_service()
+    for i in range(count):
+        name = f"timer-{i}"
+        period = duration * random.uniform(0.5, 1.5)
+        service.create(name, {"Pomodoro": period, "Descanso Corto": period,
+                              "Descanso Largo": period}, auto_start=True)
+        service.start(name)
+    started = time.perf_counter()
+    cpu = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu
+    elapsed = time.perf_counter() - started
+    await service.stop()
+    print(f"{count} temporizadores, {finished[0]} períodos terminados en {elapsed:.1f} s, "
+          f"CPU {cpu:.2f} s ({cpu / elapsed:.0%}), montículo {service.pending()}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio de temporizadores pomodoro")
+    parser.add_argument("--timers", type=int, default=10000,
+                        help="número de temporizadores de la prueba de carga")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duración de la prueba")
+    parser.add_argument("--period", type=float, default=1.0,
+                        help="duración media de cada período en segundos")
+    args = parser.parse_args(argv)
+    asyncio.run(load_test(args.timers, args.seconds, args.period))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
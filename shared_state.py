@@ -0,0 +1,181 @@
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+from checkpoint import STATE_IDLE, STATE_RUNNING, STATE_PAUSED
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Estado del temporizador compartido entre instancias en un bloque de memoria
+# compartida. Una sola instancia (la que tiene el candado de archivo) es la
+# líder: escribe el estado; las demás y los widgets externos lo leen
+# directamente del bloque, sin IPC ni hilos. La escritura usa un seqlock: la
+# secuencia es impar mientras se escribe, así que quien lee reintenta si la ve
+# impar o si cambió entre el principio y el final de la lectura.
+SEQ = struct.Struct("<Q")
+RECORD = struct.Struct("<IBxxxIddd16s")   # pid, estado, pomodoros, restante, fecha límite, latido, modo
+BLOCK_SIZE = SEQ.size + RECORD.size
+READ_ATTEMPTS = 100
+STALE_AFTER = 5.0     # segundos sin latido para considerar caída a la líder
+
+SharedState = namedtuple("SharedState", "pid state count remaining deadline updated mode")
+
+def block_name():
+    uid = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return f"pomodoro-state-{uid}"
+
+def try_lock(path):
+    # Candado exclusivo no bloqueante; el sistema lo libera si el proceso muere
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+def attach(name):
+    # Las seguidoras no deben registrar el bloque en el resource_tracker: al
+    # salir lo borraría aunque la líder lo siga usando.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+def remaining_of(record, now=None):
+    if record.state == STATE_RUNNING:
+        return max(0.0, record.deadline - (time.time() if now is None else now))
+    return record.remaining
+
+class SharedTimerState:
+    # Sin lock_path solo se lee (widgets externos): nunca toma el relevo
+    def __init__(self, lock_path=None, name=None):
+        self.lock_path = lock_path
+        self.name = name or block_name()
+        self.lock = None
+        self.shm = None
+        self.try_promote()
+
+    @property
+    def leader(self):
+        return self.lock is not None
+
+    def try_promote(self):
+        # Devuelve True si esta instancia acaba de convertirse en la líder
+        if self.lock is not None or self.lock_path is None:
+            return False
+        self.lock = try_lock(self.lock_path)
+        if self.lock is None:
+            return False
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=BLOCK_SIZE)
+        except FileExistsError:
+            # Bloque de una líder anterior que terminó sin borrarlo
+            self.shm = shared_memory.SharedMemory(name=self.name)
+        return True
+
+    def publish(self, state, mode, count, remaining, deadline):
+        buf = self.shm.buf
+        (seq,) = SEQ.unpack_from(buf, 0)
+        seq += 1 if seq % 2 == 0 else 2
+        SEQ.pack_into(buf, 0, seq)
+        RECORD.pack_into(buf, SEQ.size, os.getpid(), state, count, remaining, deadline,
+                         time.time(), mode.encode("utf-8")[:16])
+        SEQ.pack_into(buf, 0, seq + 1)
+
+    def read(self):
+        if self.shm is None:
+            try:
+                self.shm = attach(self.name)
+            except FileNotFoundError:
+                return None
+        buf = self.shm.buf
+        for _ in range(READ_ATTEMPTS):
+            (before,) = SEQ.unpack_from(buf, 0)
+            if before % 2:
+                continue
+            fields = RECORD.unpack_from(buf, SEQ.size)
+            (after,) = SEQ.unpack_from(buf, 0)
+            if before == after:
+                if before == 0:
+                    return None
+                pid, state, count, remaining, deadline, updated, mode = fields
+                return SharedState(pid, state, count, remaining, deadline, updated,
+                                   mode.rstrip(b"\0").decode("utf-8", "replace"))
+        return None
+
+    def follow(self):
+        # Lectura de una seguidora. Si la líder cerró (modo vacío) o su latido
+        # se detuvo, o esta instancia toma el relevo o se vuelve a abrir el
+        # bloque, que la nueva líder pudo haber creado de cero.
+        record = self.read()
+        if record is None or not record.mode or time.time() - record.updated > STALE_AFTER:
+            if self.try_promote():
+                return record
+            if self.shm is not None:
+                self.shm.close()
+                self.shm = None
+            record = self.read()
+        return record
+
+    def close(self):
+        if self.shm is not None:
+            if self.leader:
+                self.publish(STATE_IDLE, "", 0, 0.0, 0.0)
+                self.shm.close()
+                try:
+                    self.shm.unlink()
+                except FileNotFoundError:
+                    pass
+            else:
+                self.shm.close()
+            self.shm = None
+        if self.lock is not None:
+            os.close(self.lock)
+            self.lock = None
+
+def format_state(record):
+    if record is None or not record.mode:
+        return "--:--"
+    minutes, seconds = divmod(math.ceil(remaining_of(record)), 60)
+    suffix = " (pausa)" if record.state == STATE_PAUSED else ""
+    return f"{record.mode} {minutes:02d}:{seconds:02d}{suffix}"
+
+def main(argv=None):
+    # Lector para barras de estado: imprime el estado de la instancia líder
+    parser = argparse.ArgumentParser(description="Estado del pomodoro compartido")
+    parser.add_argument("--watch", action="store_true", help="imprimir una línea por segundo")
+    args = parser.parse_args(argv)
+    reader = SharedTimerState()
+    try:
+        while True:
+            print(format_state(reader.follow()), flush=True)
+            if not args.watch:
+                return 0
+            time.sleep(1 - time.time() % 1)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        reader.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
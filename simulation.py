@@ -0,0 +1,246 @@
+import argparse
+import os
+import queue
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import history
+from core import PomodoroTimer, TimerSession, VirtualClock
+from history import EVENT_CODES, MODE_CODES, HistoryStore, connect, day_number
+
+# Simulación acelerada: un reloj virtual reemplaza al real y cada jornada de
+# pomodoros (con pausas, reinicios y cambios de modo al azar, pero
+# reproducibles con la semilla) corre por el mismo código que la aplicación:
+# una TimerSession del núcleo lleva la cuenta, anota el historial y, con su
+# hilo vigilante, avisa la fecha límite; la simulación solo hace de bucle de
+# eventos. El reloj salta de despertar en despertar de ese hilo, así
+# que el final se ve cuando el hilo lo detecta, no cuando la simulación lo
+# decide. La deriva es la distancia entre la fecha límite del temporizador y
+# el instante virtual en que se atiende su final. Al final se comprueba
+# también que el historial no cuente de más o de menos y que la memoria no
+# crezca por día.
+DAY_START_HOUR = 8
+PAUSE_CHANCE = 0.3
+RESET_CHANCE = 0.1
+MODE_CHANGE_CHANCE = 0.1
+TOLERANCE = 1e-6
+# Segundos reales para que el hilo vigilante vuelva a dormir tras cada paso
+SETTLE_TIMEOUT = 5.0
+
+class DaySimulation:
+    def __init__(self, clock, history, rng):
+        self.clock = clock
+        self.history = history
+        self.rng = rng
+        self.timer = PomodoroTimer(clock=clock)
+        self.expected = {}
+        self.max_drift = 0.0
+        # El aviso llega en el hilo vigilante; como en la aplicación, se atiende
+        # en el hilo principal (aquí, el que conduce la simulación)
+        self.due = queue.SimpleQueue()
+        mark = clock.waits
+        self.session = TimerSession(self.timer, history, lambda: self.due.put(None))
+        self.settle(mark)
+
+    def settle(self, mark):
+        if not self.clock.settle(mark, SETTLE_TIMEOUT):
+            raise AssertionError("El hilo vigilante no volvió a esperar")
+
+    def act(self, action, *args):
+        # Un cambio de estado de la sesión vuelve a armar el hilo vigilante:
+        # se espera a que duerma con la nueva fecha antes de seguir
+        mark = self.clock.waits
+        result = action(*args)
+        self.settle(mark)
+        return result
+
+    def advance(self, seconds=None):
+        # Deja pasar el tiempo saltando a cada despertar pedido por el hilo
+        # vigilante. Sin plazo, hasta que el período en curso termine.
+        end = None if seconds is None else self.clock.monotonic() + seconds
+        while True:
+            wake = self.clock.next_wakeup()
+            if wake is None and end is None:
+                raise AssertionError("El hilo vigilante no espera ninguna fecha límite")
+            target = min(t for t in (wake, end) if t is not None)
+            mark = self.clock.waits
+            self.clock.advance(max(0.0, target - self.clock.monotonic()))
+            self.settle(mark)
+            finished = self.handle_due()
+            if end is None and finished is not None:
+                return finished
+            if end is not None and self.clock.monotonic() >= end:
+                if finished is not None:
+                    raise AssertionError(f"{finished} terminó antes de lo previsto")
+                return None
+
+    def handle_due(self):
+        # Cada aviso va a TimerSession.due, como en PomodoroApp.handle_timer_due;
+        # la deriva se mide contra la fecha límite que tenía el temporizador
+        finished = None
+        while not self.due.empty():
+            self.due.get()
+            deadline = self.timer.deadline()
+            result = self.act(self.session.due)
+            if result is None:
+                continue
+            finished = result
+            drift = self.clock.monotonic() - deadline
+            if drift < -TOLERANCE:
+                raise AssertionError(f"{finished} terminó {-drift:.6f} s antes de su fecha límite")
+            self.max_drift = max(self.max_drift, abs(drift))
+            self.count("finish", finished)
+        return finished
+
+    def count(self, event, mode):
+        # Lo que el historial debería tener, contado aparte de lo que se anota
+        column = {"finish": "completed", "reset": "abandoned", "mode_change": "abandoned",
+                  "pause": "pauses"}.get(event)
+        if column is not None:
+            key = (day_number(self.clock.time()), MODE_CODES[mode], column)
+            self.expected[key] = self.expected.get(key, 0) + 1
+
+    def record(self, event):
+        # Como PomodoroApp.record_event
+        self.count(event, self.timer.cycle.mode)
+        self.session.record(event)
+
+    def start(self):
+        self.act(self.session.start)
+        self.record("start")
+
+    def run_period(self):
+        # Un período completo: puede pausarse o abandonarse antes de terminar
+        timer = self.timer
+        self.start()
+        if self.rng.random() < RESET_CHANCE:
+            self.advance(self.rng.uniform(1, timer.cycle.duration() - 1))
+            self.record("reset")
+            self.act(self.session.reset)
+            self.start()
+        if self.rng.random() < PAUSE_CHANCE:
+            self.advance(self.rng.uniform(1, timer.timer.remaining_exact() - 1))
+            self.act(self.session.pause)
+            self.record("pause")
+            self.advance(self.rng.uniform(30, 600))
+            self.act(self.session.resume)
+            self.record("resume")
+        mode = timer.cycle.mode
+        finished = self.advance()
+        if finished != mode:
+            raise AssertionError(f"Se esperaba el fin de {mode}, no {finished}")
+
+    def change_mode(self, mode):
+        self.act(self.session.change_mode, mode)
+
+    def run_day(self, pomodoros):
+        start = self.timer.cycle.count
+        while self.timer.cycle.count - start < pomodoros:
+            if self.timer.cycle.mode != "Pomodoro" and self.rng.random() < MODE_CHANGE_CHANCE:
+                # Saltarse el descanso a mitad de camino
+                self.start()
+                self.advance(self.rng.uniform(1, self.timer.timer.remaining_exact() - 1))
+                self.record("mode_change")
+                self.change_mode("Pomodoro")
+                continue
+            self.run_period()
+        # Fin de la jornada: el descanso pendiente se descarta
+        if self.timer.cycle.mode != "Pomodoro":
+            self.change_mode("Pomodoro")
+
+    def next_morning(self):
+        tomorrow = (self.clock.now() + timedelta(days=1)).replace(
+            hour=DAY_START_HOUR, minute=0, second=0, microsecond=0)
+        mark = self.clock.waits
+        self.clock.set(tomorrow.timestamp())
+        self.settle(mark)
+
+    def close(self):
+        self.session.stop()
+        self.session.watcher.thread.join(SETTLE_TIMEOUT)
+
+def verify_history(path, expected):
+    conn = connect(path)
+    try:
+        actual = {}
+        for day, mode, completed, abandoned, pauses in conn.execute(
+                "SELECT day, mode, completed, abandoned, pauses FROM daily"):
+            for column, value in (("completed", completed), ("abandoned", abandoned),
+                                  ("pauses", pauses)):
+                if value:
+                    actual[(day, mode, column)] = value
+        events = conn.execute("SELECT COUNT(*) FROM events WHERE event = ?",
+                              (EVENT_CODES["finish"],)).fetchone()[0]
+    finally:
+        conn.close()
+    mismatches = {key: (expected.get(key, 0), actual.get(key, 0))
+                  for key in expected.keys() | actual.keys()
+                  if expected.get(key, 0) != actual.get(key, 0)}
+    return mismatches, events
+
+def retained_memory():
+    # Memoria viva fuera de la cola del historial (que se vacía en otro hilo a su
+    # ritmo) y de los totales esperados de esta misma simulación
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, history.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+def simulate(days=1, pomodoros=16, seed=0):
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    first = datetime.now().replace(hour=DAY_START_HOUR, minute=0, second=0, microsecond=0)
+    clock = VirtualClock(first.timestamp())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "history.db")
+        store = HistoryStore(path)
+        simulation = DaySimulation(clock, store, rng)
+        tracemalloc.start()
+        memory = []
+        for day in range(days):
+            if day:
+                simulation.next_morning()
+            simulation.run_day(pomodoros)
+            memory.append(retained_memory())
+        tracemalloc.stop()
+        simulation.close()
+        store.close()
+        mismatches, finishes = verify_history(path, simulation.expected)
+    return {
+        "days": days,
+        "pomodoros": simulation.timer.cycle.count,
+        "finished_periods": finishes,
+        "virtual_hours": clock.monotonic() / 3600,
+        "max_drift": simulation.max_drift,
+        "history_mismatches": mismatches,
+        # Crecimiento entre el primer y el último día
+        "memory_growth": memory[-1] - memory[0] if len(memory) > 1 else 0,
+        "elapsed": time.perf_counter() - started,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación acelerada de jornadas de pomodoros")
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--pomodoros", type=int, default=16, help="pomodoros por jornada")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    report = simulate(args.days, args.pomodoros, args.seed)
+    print(f"{report['days']} días, {report['pomodoros']} pomodoros, "
+          f"{report['finished_periods']} períodos terminados, "
+          f"{report['virtual_hours']:.1f} h simuladas en {report['elapsed'] * 1000:.0f} ms")
+    print(f"Deriva máxima: {report['max_drift'] * 1e6:.3f} µs   "
+          f"Memoria al final vs. primer día: {report['memory_growth'] / 1024:+.1f} KiB")
+    ok = report["max_drift"] <= TOLERANCE and not report["history_mismatches"]
+    for (day, mode, column), (expected, actual) in sorted(report["history_mismatches"].items()):
+        print(f"Historial distinto: día {day}, modo {mode}, {column}: esperado {expected}, hay {actual}")
+    print("OK" if ok else "FALLÓ")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from history import MODES, MODE_CODES
+
+# Las estadísticas se calculan sobre los resúmenes por día y por hora que
+# mantiene el historial, cargados como columnas de NumPy: el costo depende de
+# los días con actividad, no del número de eventos.
+DAILY_DTYPE = np.dtype([("day", np.int32), ("mode", np.int8), ("completed", np.int32),
+                        ("abandoned", np.int32), ("pauses", np.int32), ("seconds", np.float64)])
+HOURLY_DTYPE = np.dtype([("day", np.int32), ("hour", np.int8), ("mode", np.int8),
+                         ("seconds", np.float64)])
+
+WEEKDAYS = ("Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom")
+FOCUS = MODE_CODES["Pomodoro"]
+
+def load_daily(conn, since=None):
+    query = "SELECT day, mode, completed, abandoned, pauses, seconds FROM daily"
+    params = ()
+    if since is not None:
+        query += " WHERE day >= ?"
+        params = (since.toordinal(),)
+    return np.fromiter(conn.execute(query + " ORDER BY day", params), dtype=DAILY_DTYPE)
+
+def load_hourly(conn, mode=FOCUS):
+    return np.fromiter(conn.execute("SELECT day, hour, mode, seconds FROM hourly WHERE mode = ?",
+                                    (mode,)), dtype=HOURLY_DTYPE)
+
+def daily_focus(daily, start, days):
+    # Segundos de foco por día en [start, start + days), con ceros en días vacíos
+    rows = daily[(daily["mode"] == FOCUS) & (daily["day"] >= start) & (daily["day"] < start + days)]
+    return np.bincount(rows["day"] - start, weights=rows["seconds"], minlength=days)
+
+def weekly_focus(daily, weeks, today):
+    # El ordinal 1 es lunes, así que (día - 1) // 7 numera semanas de lunes a domingo
+    rows = daily[daily["mode"] == FOCUS]
+    current = (today - 1) // 7
+    offsets = current - (rows["day"] - 1) // 7
+    keep = (offsets >= 0) & (offsets < weeks)
+    totals = np.bincount(offsets[keep], weights=rows["seconds"][keep], minlength=weeks)
+    return totals[::-1]
+
+def streaks(daily, today):
+    # Racha actual y más larga de días consecutivos con al menos un pomodoro
+    days = np.unique(daily["day"][(daily["mode"] == FOCUS) & (daily["completed"] > 0)])
+    if days.size == 0:
+        return 0, 0
+    breaks = np.flatnonzero(np.diff(days) != 1)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks + 1, [days.size]))
+    lengths = ends - starts
+    current = int(lengths[-1]) if days[-1] >= today - 1 else 0
+    return current, int(lengths.max())
+
+def mode_ratios(daily):
+    # Por modo: completados, abandonados, pausas, tasa de finalización e interrupción
+    modes = daily["mode"].astype(np.intp)
+    size = len(MODES)
+    completed = np.bincount(modes, weights=daily["completed"], minlength=size)
+    abandoned = np.bincount(modes, weights=daily["abandoned"], minlength=size)
+    pauses = np.bincount(modes, weights=daily["pauses"], minlength=size)
+    started = completed + abandoned
+    with np.errstate(divide="ignore", invalid="ignore"):
+        completion = np.where(started > 0, completed / started, 0.0)
+        interruptions = np.where(started > 0, (abandoned + pauses) / started, 0.0)
+    result = {}
+    for code, mode in enumerate(MODES):
+        result[mode] = {
+            "completed": int(completed[code]),
+            "abandoned": int(abandoned[code]),
+            "pauses": int(pauses[code]),
+            "completion_ratio": float(completion[code]),
+            "interruption_rate": float(interruptions[code]),
+        }
+    return result
+
+def heatmap(hourly):
+    # Matriz día de la semana x hora con los segundos de foco acumulados
+    rows = hourly[hourly["mode"] == FOCUS]
+    matrix = np.zeros((7, 24))
+    np.add.at(matrix, ((rows["day"] - 1) % 7, rows["hour"].astype(np.intp)), rows["seconds"])
+    return matrix
+
+def build_report(conn, today=None):
+    today = (today or date.today()).toordinal()
+    daily = load_daily(conn)
+    hourly = load_hourly(conn)
+    last_week = daily_focus(daily, today - 6, 7)
+    current_streak, longest_streak = streaks(daily, today)
+    return {
+        "today": today,
+        "last_7_days": last_week,
+        "last_30_days_total": float(daily_focus(daily, today - 29, 30).sum()),
+        "weeks": weekly_focus(daily, 8, today),
+        "current_streak": current_streak,
+        "longest_streak": longest_streak,
+        "modes": mode_ratios(daily),
+        "heatmap": heatmap(hourly),
+    }
+
+def format_hours(seconds):
+    hours, minutes = divmod(int(round(seconds / 60)), 60)
+    return f"{hours}h {minutes:02d}m"
+
+def format_report(report):
+    lines = ["Foco en los últimos 7 días:"]
+    first = date.fromordinal(report["today"] - 6)
+    for offset, seconds in enumerate(report["last_7_days"]):
+        day = first + timedelta(days=offset)
+        lines.append(f"  {WEEKDAYS[day.weekday()]} {day:%d/%m}  {format_hours(seconds)}")
+    lines.append(f"Últimos 30 días: {format_hours(report['last_30_days_total'])}")
+    lines.append("Semanas (más reciente al final): "
+                 + "  ".join(format_hours(s) for s in report["weeks"]))
+    lines.append(f"Racha actual: {report['current_streak']} días   "
+                 f"Racha más larga: {report['longest_streak']} días")
+    lines.append("")
+    for mode, values in report["modes"].items():
+        lines.append(f"{mode}: {values['completed']} completados, {values['abandoned']} abandonados, "
+                     f"{values['completion_ratio']:.0%} finalizados, "
+                     f"{values['interruption_rate']:.2f} interrupciones por período")
+    return "\n".join(lines)
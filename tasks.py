@@ -0,0 +1,225 @@
+import heapq
+import itertools
+import sqlite3
+import time
+import unicodedata
+
+PRIORITIES = {1: "Alta", 2: "Media", 3: "Baja"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 2,
+    estimated INTEGER NOT NULL DEFAULT 1,
+    actual INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    active INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL
+);
+"""
+
+# Prefijos indexados por palabra; las búsquedas más largas se filtran después
+MAX_PREFIX = 8
+
+def normalize(text):
+    # Minúsculas y sin acentos: "Revisión" se encuentra escribiendo "revis"
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def tokenize(text):
+    return normalize(text).split()
+
+class Task:
+    __slots__ = ("id", "title", "priority", "estimated", "actual", "done", "active", "created",
+                 "search_text")
+
+    def __init__(self, id, title, priority, estimated, actual, done, active, created):
+        self.id = id
+        self.title = title
+        self.priority = priority
+        self.estimated = estimated
+        self.actual = actual
+        self.done = bool(done)
+        self.active = bool(active)
+        self.created = created
+        self.search_text = normalize(title)
+
+    def sort_key(self):
+        return (self.done, self.priority, self.created, self.id)
+
+class TaskStore:
+    # Tareas persistidas en SQLite con dos índices en memoria: un montículo por
+    # prioridad para "siguiente tarea" (con borrado perezoso) y un índice de
+    # prefijos por palabra para filtrar mientras se escribe. La memoria es la
+    # fuente de verdad: con writer (p. ej. HistoryStore.execute) las escrituras
+    # se encolan para otro hilo y ninguna operación espera a SQLite.
+    def __init__(self, path, writer=None):
+        self.conn = sqlite3.connect(path)
+        self.writer = writer
+        if writer is None:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.execute(SCHEMA)
+        self.tasks = {}
+        self.prefixes = {}
+        self.heap = []
+        self.sequence = itertools.count()
+        self.ordered = None
+        # Con writer, la tabla puede no existir todavía (primer uso): lista vacía
+        tables = {name for (name,) in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "tasks" in tables:
+            for row in self.conn.execute("SELECT id, title, priority, estimated, actual, done, "
+                                         "active, created FROM tasks"):
+                self.index(Task(*row))
+        # Los ids se asignan aquí para no esperar el lastrowid de la inserción
+        self.next_id = self.last_id(tables) + 1
+
+    def last_id(self, tables):
+        # Mayor id usado alguna vez, no solo el de las tareas que quedan: un id
+        # borrado no se reutiliza, porque el historial puede seguir apuntándole.
+        # AUTOINCREMENT lo guarda en sqlite_sequence; las tablas creadas antes de
+        # usarlo se apoyan en los eventos del historial.
+        ids = [max(self.tasks, default=0)]
+        if "sqlite_sequence" in tables:
+            row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+            ids.append(row[0] if row else 0)
+        if "events" in tables:
+            ids.append(self.conn.execute("SELECT MAX(task) FROM events").fetchone()[0] or 0)
+        return max(ids)
+
+    def execute(self, sql, params=()):
+        if self.writer is not None:
+            self.writer(sql, params)
+        else:
+            with self.conn:
+                self.conn.execute(sql, params)
+
+    def index(self, task):
+        self.tasks[task.id] = task
+        for token in set(tokenize(task.title)):
+            for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                self.prefixes.setdefault(token[:length], set()).add(task.id)
+        if not task.done:
+            self.push(task)
+        self.ordered = None
+
+    def push(self, task):
+        heapq.heappush(self.heap, (task.priority, task.created, next(self.sequence), task.id))
+        # Si las entradas obsoletas dominan, se reconstruye el montículo
+        if len(self.heap) > 2 * len(self.tasks) + 64:
+            self.heap = [(t.priority, t.created, next(self.sequence), t.id)
+                         for t in self.tasks.values() if not t.done]
+            heapq.heapify(self.heap)
+
+    def unindex(self, task):
+        for token in set(tokenize(task.title)):
+            for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                ids = self.prefixes.get(token[:length])
+                if ids is not None:
+                    ids.discard(task.id)
+                    if not ids:
+                        del self.prefixes[token[:length]]
+        # Las entradas del montículo se descartan al salir (borrado perezoso)
+        del self.tasks[task.id]
+        self.ordered = None
+
+    def save(self, task):
+        self.execute("UPDATE tasks SET title = ?, priority = ?, estimated = ?, actual = ?, "
+                     "done = ?, active = ? WHERE id = ?",
+                     (task.title, task.priority, task.estimated, task.actual,
+                      int(task.done), int(task.active), task.id))
+
+    def add(self, title, priority=2, estimated=1):
+        created = time.time()
+        task_id = self.next_id
+        self.next_id += 1
+        self.execute("INSERT INTO tasks (id, title, priority, estimated, created) "
+                     "VALUES (?, ?, ?, ?, ?)", (task_id, title, priority, estimated, created))
+        task = Task(task_id, title, priority, estimated, 0, False, False, created)
+        self.index(task)
+        return task
+
+    def update(self, task_id, title=None, priority=None, estimated=None):
+        task = self.tasks[task_id]
+        self.unindex(task)
+        if title is not None:
+            task.title = title
+            task.search_text = normalize(title)
+        if priority is not None:
+            task.priority = priority
+        if estimated is not None:
+            task.estimated = estimated
+        self.index(task)
+        self.save(task)
+        return task
+
+    def set_done(self, task_id, done=True):
+        task = self.tasks[task_id]
+        task.done = done
+        if done:
+            task.active = False
+        else:
+            self.push(task)
+        self.ordered = None
+        self.save(task)
+
+    def delete(self, task_id):
+        task = self.tasks[task_id]
+        self.unindex(task)
+        self.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def add_pomodoro(self, task_id):
+        task = self.tasks.get(task_id)
+        if task is not None:
+            task.actual += 1
+            self.save(task)
+
+    def active(self):
+        for task in self.tasks.values():
+            if task.active:
+                return task
+        return None
+
+    def set_active(self, task_id):
+        for task in self.tasks.values():
+            task.active = task.id == task_id
+        self.execute("UPDATE tasks SET active = (id = ?)", (task_id,))
+
+    def next_task(self):
+        # Tarea pendiente de mayor prioridad; las entradas obsoletas se descartan
+        while self.heap:
+            priority, created, _, task_id = self.heap[0]
+            task = self.tasks.get(task_id)
+            if task is not None and not task.done and task.priority == priority:
+                return task
+            heapq.heappop(self.heap)
+        return None
+
+    def all(self):
+        if self.ordered is None:
+            self.ordered = sorted(self.tasks.values(), key=Task.sort_key)
+        return self.ordered
+
+    def filter(self, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return self.all()
+        ids = None
+        for token in tokens:
+            matches = self.prefixes.get(token[:MAX_PREFIX], set())
+            ids = set(matches) if ids is None else ids & matches
+            if not ids:
+                return []
+        # Palabras más largas que el prefijo indexado: se confirma sobre el título
+        long_tokens = [t for t in tokens if len(t) > MAX_PREFIX]
+        tasks = [self.tasks[i] for i in ids]
+        if long_tokens:
+            tasks = [t for t in tasks
+                     if all(any(w.startswith(token) for w in t.search_text.split())
+                            for token in long_tokens)]
+        return sorted(tasks, key=Task.sort_key)
+
+    def close(self):
+        self.conn.close()
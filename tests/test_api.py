@@ -0,0 +1,93 @@
+import base64
+import http.client
+import json
+import os
+import socket
+import struct
+
+import pytest
+
+from api import OP_CLOSE, OP_TEXT, ControlServer, accept_key
+
+class Handler:
+    def __init__(self):
+        self.commands = []
+        self.error = None
+
+    def __call__(self, command, params):
+        if self.error is not None:
+            raise self.error
+        if command == "mode" and params.get("mode") != "Pomodoro":
+            raise ValueError("Modo desconocido")
+        self.commands.append(command)
+        return {"mode": "Pomodoro", "running": command == "start"}
+
+@pytest.fixture
+def server():
+    handler = Handler()
+    server = ControlServer(handler, lambda fn: fn(), port=0).start()
+    server.handler_calls = handler
+    yield server
+    server.stop()
+
+def request(server, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+def test_status_and_commands(server):
+    assert request(server, "GET", "/status") == (200, {"mode": "Pomodoro", "running": False})
+    assert request(server, "POST", "/start")[1]["running"]
+    assert request(server, "POST", "/mode", json.dumps({"mode": "Pomodoro"}))[0] == 200
+    assert server.handler_calls.commands == ["status", "start", "mode"]
+
+def test_rejected_requests(server):
+    assert request(server, "POST", "/subscribe")[0] == 404
+    assert request(server, "POST", "/status")[0] == 405
+    assert request(server, "GET", "/start")[0] == 405
+    assert request(server, "POST", "/mode?mode=Siesta")[0] == 400
+    assert request(server, "POST", "/mode", "[1]")[0] == 400
+    assert "subscribe" not in server.handler_calls.commands
+
+def test_handler_errors_become_responses(server):
+    server.handler_calls.error = RuntimeError("main thread is not in main loop")
+    status, body = request(server, "POST", "/start")
+    assert status == 500 and "main thread" in body["error"]
+    server.closing = True
+    assert request(server, "POST", "/start")[0] == 503
+
+def masked(opcode, payload):
+    mask = os.urandom(4)
+    data = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return struct.pack("!BB", 0x80 | opcode, 0x80 | len(payload)) + mask + data
+
+def read_frame(sock):
+    first, second = sock.recv(2, socket.MSG_WAITALL)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", sock.recv(2, socket.MSG_WAITALL))
+    return first & 0x0F, sock.recv(length, socket.MSG_WAITALL)
+
+def test_websocket_events_and_close_handshake(server):
+    key = base64.b64encode(os.urandom(16)).decode()
+    sock = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+    try:
+        sock.sendall((f"GET /events HTTP/1.1\r\nHost: 127.0.0.1\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n\r\n").encode())
+        head = b""
+        while not head.endswith(b"\r\n\r\n"):
+            head += sock.recv(1)
+        assert b" 101 " in head and accept_key(key).encode() in head
+        opcode, payload = read_frame(sock)
+        assert opcode == OP_TEXT and json.loads(payload)["type"] == "state"
+        sock.sendall(masked(OP_TEXT, b'{"command": "subscribe"}'))
+        opcode, payload = read_frame(sock)
+        assert json.loads(payload)["type"] == "error"
+        sock.sendall(masked(OP_CLOSE, struct.pack("!H", 1000)))
+        assert read_frame(sock) == (OP_CLOSE, struct.pack("!H", 1000))
+    finally:
+        sock.close()
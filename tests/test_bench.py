@@ -0,0 +1,29 @@
+import math
+
+import bench
+
+def results(**soak):
+    return {"results": {
+        "startup": {"failed": 0, "first_frame_ms": {"n": 5, "median": 100.0},
+                    "phases_median_ms": {"history": 10.0}},
+        "tick": {"normal": {"cpu_us": {"n": 60, "median": 40.0}}},
+        "soak": dict({"simulated_hours": 8, "pomodoros": 16, "wall_seconds": 3.0,
+                      "rss_growth_bytes": 1000, "widget_growth": 0}, **soak),
+    }}
+
+def test_only_costs_are_compared():
+    previous = results()
+    current = results(simulated_hours=24, pomodoros=48, wall_seconds=9.0)
+    current["results"]["tick"]["normal"]["cpu_us"]["n"] = 600
+    assert bench.compare(current, previous) == []
+
+def test_cost_regressions_are_reported():
+    previous = results()
+    current = results(rss_growth_bytes=2000, widget_growth=3)
+    current["results"]["startup"]["phases_median_ms"]["history"] = 10.5
+    current["results"]["tick"]["normal"]["cpu_us"]["median"] = 50.0
+    current["results"]["startup"]["failed"] = 1
+    found = {name: change for name, _, _, change in bench.compare(current, previous)}
+    assert set(found) == {"startup.failed", "tick.normal.cpu_us.median",
+                          "soak.rss_growth_bytes", "soak.widget_growth"}
+    assert math.isinf(found["startup.failed"]) and found["soak.rss_growth_bytes"] == 1.0
@@ -0,0 +1,48 @@
+from checkpoint import FILE_SIZE, SLOT_SIZE, STATE_PAUSED, STATE_RUNNING, SessionCheckpoint
+
+def test_load_returns_latest_record(tmp_path):
+    checkpoint = SessionCheckpoint(str(tmp_path / "session.bin"))
+    try:
+        assert checkpoint.load() is None
+        checkpoint.save(STATE_RUNNING, "Pomodoro", 1, 600.0, 2000.0, 1400.0)
+        checkpoint.save(STATE_PAUSED, "Descanso Corto", 2, 120.5, 0.0, 1500.0)
+        record = checkpoint.load()
+        assert (record.state, record.mode, record.count, record.remaining) == \
+            (STATE_PAUSED, "Descanso Corto", 2, 120.5)
+    finally:
+        checkpoint.close()
+
+def test_torn_write_keeps_previous_record(tmp_path):
+    path = str(tmp_path / "session.bin")
+    checkpoint = SessionCheckpoint(path)
+    try:
+        checkpoint.save(STATE_RUNNING, "Pomodoro", 1, 600.0, 2000.0, 1400.0)
+        checkpoint.save(STATE_PAUSED, "Pomodoro", 1, 300.0, 0.0, 1700.0)
+        # Se corrompe la ranura recién escrita: queda la anterior
+        offset = (checkpoint.seq % 2) * SLOT_SIZE
+        checkpoint.map[offset:offset + 4] = b"\xff\xff\xff\xff"
+        record = checkpoint.load()
+        assert (record.seq, record.state, record.remaining) == (1, STATE_RUNNING, 600.0)
+    finally:
+        checkpoint.close()
+
+def test_new_writer_continues_after_other_instance(tmp_path):
+    # Una seguidora de --sync que toma el control escribe después de la líder
+    path = str(tmp_path / "session.bin")
+    follower = SessionCheckpoint(path)
+    leader = SessionCheckpoint(path)
+    try:
+        for count in range(10):
+            leader.save(STATE_RUNNING, "Pomodoro", count, 600.0, 2000.0, 1400.0)
+        follower.save(STATE_PAUSED, "Descanso Largo", 4, 60.0, 0.0, 1500.0)
+        record = follower.load()
+        assert (record.seq, record.mode) == (11, "Descanso Largo")
+        assert leader.load().mode == "Descanso Largo"
+    finally:
+        follower.close()
+        leader.close()
+
+def test_file_size(tmp_path):
+    path = tmp_path / "session.bin"
+    SessionCheckpoint(str(path)).close()
+    assert path.stat().st_size == FILE_SIZE
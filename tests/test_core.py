@@ -0,0 +1,189 @@
+import threading
+
+import pytest
+
+from core import (DeadlineTimer, DeadlineWatcher, PomodoroCycle, PomodoroTimer, TimerSession,
+                  VirtualClock)
+
+def test_deadline_timer_counts_from_deadline():
+    clock = VirtualClock(start=1000.0)
+    timer = DeadlineTimer(10, clock)
+    assert timer.remaining() == 10
+    timer.start()
+    clock.advance(3.25)
+    assert timer.remaining_exact() == pytest.approx(6.75)
+    assert timer.remaining() == 7
+    assert timer.time_to_next_tick() == pytest.approx(0.75)
+
+def test_deadline_timer_pause_shifts_deadline():
+    clock = VirtualClock(start=1000.0)
+    timer = DeadlineTimer(10, clock)
+    timer.start()
+    clock.advance(4)
+    timer.pause()
+    clock.advance(100)
+    assert timer.remaining_exact() == pytest.approx(6)
+    timer.start()
+    clock.advance(6)
+    assert timer.remaining_exact() == 0
+
+def test_deadline_timer_resync_after_suspend():
+    clock = VirtualClock(start=1000.0)
+    timer = DeadlineTimer(60, clock)
+    timer.start()
+    # Suspensión: el reloj de pared avanza y el monotónico no
+    clock.wall += 30
+    assert timer.lag() == pytest.approx(30)
+    assert timer.resync()
+    assert timer.remaining_exact() == pytest.approx(30)
+    assert not timer.resync()
+
+def test_resync_is_capped_and_does_not_accumulate():
+    clock = VirtualClock(start=1000.0)
+    timer = DeadlineTimer(60, clock)
+    timer.start()
+    # Pequeños saltos hacia adelante se descartan en cada comprobación
+    for _ in range(5):
+        clock.wall += 1.5
+        assert not timer.resync()
+    assert timer.remaining_exact() == pytest.approx(60)
+    # Una suspensión más larga que lo que falta solo consume lo que falta
+    clock.wall += 3600
+    assert timer.resync()
+    assert timer.remaining_exact() == 0
+    assert timer.lag() == pytest.approx(0)
+
+class SuspendAwareClock(VirtualClock):
+    counts_suspend = True
+
+def test_wall_jump_ignored_when_monotonic_counts_suspend():
+    clock = SuspendAwareClock(start=1000.0)
+    timer = DeadlineTimer(60, clock)
+    timer.start()
+    watcher = DeadlineWatcher(clock, lambda: None)
+    try:
+        watcher.watch(timer)
+        # Un ajuste de hora (NTP o manual) no termina el período
+        clock.wall += 3600
+        assert timer.lag() == 0
+        assert not timer.resync()
+        assert timer.remaining_exact() == pytest.approx(60)
+        with watcher.condition:
+            assert watcher.time_to_deadline() == pytest.approx(60)
+    finally:
+        watcher.stop()
+        watcher.thread.join(2)
+
+def test_cycle_long_break_every_n_pomodoros():
+    cycle = PomodoroCycle(pomodoros_per_cycle=2)
+    modes = []
+    for _ in range(4):
+        cycle.complete()
+        modes.append(cycle.next_mode())
+        cycle.mode = cycle.next_mode()
+    assert modes == ["Descanso Corto", "Pomodoro", "Descanso Largo", "Pomodoro"]
+    assert cycle.count == 2
+
+def test_timer_poll_finishes_and_advances():
+    clock = VirtualClock(start=1000.0)
+    timer = PomodoroTimer(PomodoroCycle({"Pomodoro": 5}), clock=clock)
+    timer.start()
+    clock.advance(4.5)
+    assert timer.poll() is None
+    clock.advance(0.5)
+    assert timer.poll() == "Pomodoro"
+    assert timer.cycle.count == 1
+    assert timer.cycle.mode == "Descanso Corto"
+    assert not timer.running
+    assert timer.remaining() == timer.cycle.duration()
+    assert timer.deadline() is None
+
+def test_timer_auto_start():
+    clock = VirtualClock(start=1000.0)
+    timer = PomodoroTimer(PomodoroCycle({"Pomodoro": 5}), auto_start=True, clock=clock)
+    timer.start()
+    clock.advance(5)
+    assert timer.poll() == "Pomodoro"
+    assert timer.running
+    assert timer.deadline() == pytest.approx(5 + timer.cycle.duration())
+
+def test_timer_paused_does_not_finish():
+    clock = VirtualClock(start=1000.0)
+    timer = PomodoroTimer(PomodoroCycle({"Pomodoro": 5}), clock=clock)
+    timer.start()
+    timer.pause()
+    clock.advance(60)
+    assert timer.poll() is None
+    assert timer.remaining() == 5
+
+def test_timer_restore():
+    clock = VirtualClock(start=1000.0)
+    timer = PomodoroTimer(clock=clock)
+    timer.restore("Descanso Largo", 42.5, running=True, paused=True)
+    assert timer.cycle.mode == "Descanso Largo"
+    assert timer.paused and timer.deadline() is None
+    assert timer.remaining() == 43
+    timer.restore("Pomodoro", -3, running=True)
+    assert timer.poll() == "Pomodoro"
+    with pytest.raises(ValueError):
+        timer.restore("Siesta", 10)
+
+def test_watcher_wakes_at_deadline():
+    clock = VirtualClock(start=1000.0)
+    due = threading.Event()
+    watcher = DeadlineWatcher(clock, due.set)
+    try:
+        timer = DeadlineTimer(10, clock)
+        timer.start()
+        watcher.watch(timer)
+        clock.advance(9)
+        assert not due.wait(0.05)
+        clock.advance(1)
+        assert due.wait(2)
+    finally:
+        watcher.stop()
+        watcher.thread.join(2)
+    assert not watcher.thread.is_alive()
+
+def test_watcher_ignores_cleared_deadline():
+    clock = VirtualClock(start=1000.0)
+    due = threading.Event()
+    watcher = DeadlineWatcher(clock, due.set)
+    try:
+        timer = DeadlineTimer(10, clock)
+        timer.start()
+        watcher.watch(timer)
+        timer.pause()
+        watcher.watch(timer)
+        clock.advance(20)
+        assert not due.wait(0.05)
+    finally:
+        watcher.stop()
+        watcher.thread.join(2)
+
+class MemoryHistory:
+    def __init__(self):
+        self.events = []
+
+    def record(self, event, mode, duration, elapsed, ts, task):
+        self.events.append((event, mode, duration, elapsed, ts, task))
+
+def test_session_records_and_finishes():
+    clock = VirtualClock(start=1000.0)
+    history = MemoryHistory()
+    session = TimerSession(PomodoroTimer(PomodoroCycle({"Pomodoro": 10}), clock=clock),
+                           history, lambda: None)
+    try:
+        session.start()
+        clock.advance(4)
+        session.record("pause", task=7)
+        assert session.due() is None
+        clock.advance(6)
+        assert session.due(task=7) == "Pomodoro"
+        assert history.events == [("pause", "Pomodoro", 10, 4.0, 1004.0, 7),
+                                  ("finish", "Pomodoro", 10, 10, 1010.0, 7)]
+        assert session.timer.cycle.mode == "Descanso Corto"
+        with session.watcher.condition:
+            assert session.watcher.deadline is None
+    finally:
+        session.stop()
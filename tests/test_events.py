@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from events import DROP_NEWEST, EventBus
+
+class Recorder:
+    def __init__(self, expected):
+        self.events = []
+        self.done = threading.Event()
+        self.expected = expected
+
+    def __call__(self, event):
+        self.events.append(event)
+        if len(self.events) >= self.expected:
+            self.done.set()
+
+def test_delivers_in_order_by_kind():
+    bus = EventBus()
+    try:
+        recorder = Recorder(3)
+        bus.subscribe(recorder, kinds=("start", "finish"))
+        bus.publish("start", {"mode": "Pomodoro"})
+        bus.publish("pause")
+        bus.publish("finish", {"mode": "Pomodoro"})
+        bus.publish("start", {"mode": "Descanso Corto"})
+        assert recorder.done.wait(2)
+        assert [e.kind for e in recorder.events] == ["start", "finish", "start"]
+        assert [e.seq for e in recorder.events] == sorted(e.seq for e in recorder.events)
+    finally:
+        bus.close()
+
+def test_unknown_kind_rejected():
+    bus = EventBus()
+    with pytest.raises(ValueError):
+        bus.subscribe(print, kinds=("lunch",))
+    with pytest.raises(ValueError):
+        bus.subscribe(print, overflow="drop_all")
+
+def blocked_bus(**options):
+    # El primer evento queda retenido en el manejador mientras se llena la cola
+    bus = EventBus()
+    release = threading.Event()
+    entered = threading.Event()
+    seen = []
+    def handler(event):
+        entered.set()
+        release.wait(2)
+        seen.append(event)
+    subscription = bus.subscribe(handler, **options)
+    bus.publish("start")
+    assert entered.wait(2)
+    return bus, subscription, release, seen
+
+def test_ticks_coalesce_and_queue_drops_oldest():
+    bus, subscription, release, seen = blocked_bus(queue_size=2)
+    try:
+        for remaining in (3, 2, 1):
+            bus.publish("tick", {"remaining": remaining})
+        bus.publish("pause")
+        bus.publish("resume")
+        stats = subscription.stats()
+        assert stats["coalesced"] == 2
+        assert stats["dropped"] == 1
+        release.set()
+        for _ in range(200):
+            if len(seen) == 3:
+                break
+            time.sleep(0.01)
+        assert [e.kind for e in seen] == ["start", "pause", "resume"]
+    finally:
+        release.set()
+        bus.close()
+
+def test_drop_newest_keeps_queue():
+    bus, subscription, release, seen = blocked_bus(queue_size=1, overflow=DROP_NEWEST)
+    try:
+        bus.publish("pause")
+        bus.publish("resume")
+        assert [e.kind for e in subscription.queue] == ["pause"]
+        assert subscription.stats()["dropped"] == 1
+    finally:
+        release.set()
+        bus.close()
+
+def test_failing_handler_is_isolated():
+    bus = EventBus()
+    try:
+        recorder = Recorder(1)
+        def broken(event):
+            raise RuntimeError("roto")
+        failing = bus.subscribe(broken)
+        bus.subscribe(recorder)
+        bus.publish("start")
+        assert recorder.done.wait(2)
+        for _ in range(200):
+            if failing.errors:
+                break
+            time.sleep(0.01)
+        assert failing.errors == 1
+    finally:
+        bus.close()
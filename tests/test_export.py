@@ -0,0 +1,97 @@
+import csv
+import json
+import os
+import threading
+from datetime import date, datetime
+
+import pytest
+
+import export
+from history import HistoryStore
+
+def at(day, hour):
+    return datetime(2026, 3, day, hour).timestamp()
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = HistoryStore(path)
+    store.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT)")
+    store.execute("INSERT INTO tasks VALUES (1, 'Informe')")
+    store.record("start", "Pomodoro", 1500, 0, at(1, 9), task=1)
+    store.record("finish", "Pomodoro", 1500, 1500, at(1, 10), task=1)
+    store.record("finish", "Descanso Corto", 300, 300, at(2, 10))
+    store.record("reset", "Pomodoro", 1500, 20.5, at(3, 11))
+    store.close()
+    return path
+
+def test_csv_with_task_titles_and_range(db, tmp_path):
+    output = str(tmp_path / "out.csv")
+    count = export.export(db, output, since=date(2026, 3, 1), until=date(2026, 3, 2))
+    with open(output, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert count == len(rows) == 3
+    assert [r["event"] for r in rows] == ["start", "finish", "finish"]
+    assert rows[0]["task"] == "Informe" and rows[2]["task_id"] == ""
+    assert not os.path.exists(output + ".tmp")
+
+def test_jsonl(db, tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    assert export.export(db, output, since=date(2026, 3, 3)) == 1
+    with open(output, encoding="utf-8") as f:
+        (row,) = [json.loads(line) for line in f]
+    assert (row["event"], row["mode"], row["elapsed"]) == ("reset", "Pomodoro", 20.5)
+
+def test_columnar_round_trip(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "BLOCK_ROWS", 3)
+    output = str(tmp_path / "out.pomc")
+    assert export.export(db, output) == 4
+    with open(output, "rb") as f:
+        blocks = list(export.read_columnar(f))
+    assert [len(b["time"]) for b in blocks] == [3, 1]
+    assert list(blocks[0]["task_id"]) == [1, 1, -1]
+    assert blocks[0]["task"] == ["Informe", "Informe", None]
+
+def test_progress_and_cancel(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "PROGRESS_ROWS", 2)
+    seen = []
+    export.export(db, str(tmp_path / "a.csv"), progress=seen.append)
+    assert seen == [2, 4]
+    cancel = threading.Event()
+    cancel.set()
+    output = str(tmp_path / "b.csv")
+    with pytest.raises(export.ExportCancelled):
+        export.export(db, output, cancel=cancel)
+    assert not os.path.exists(output) and not os.path.exists(output + ".tmp")
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+class FakeNotifier:
+    def __init__(self):
+        self.shown = []
+
+    def notify(self, title, message, key=None, progress=False):
+        self.shown.append((message, progress))
+
+def test_app_polls_export_messages_on_its_own_thread(db, tmp_path, monkeypatch):
+    # run_export solo encola; poll_export (hilo de Tk) muestra y se reprograma
+    from types import SimpleNamespace
+    import queue
+    from main import PomodoroApp
+    monkeypatch.setattr(export, "PROGRESS_ROWS", 2)
+    app = SimpleNamespace(history=SimpleNamespace(path=db), export_cancel=threading.Event(),
+                          export_messages=queue.SimpleQueue(), notifier=FakeNotifier(),
+                          root=FakeRoot(), closed=False, EXPORT_POLL_MS=200)
+    app.export_thread = threading.Thread(target=PomodoroApp.run_export,
+                                         args=(app, str(tmp_path / "out.csv")))
+    app.export_thread.start()
+    app.export_thread.join()
+    PomodoroApp.poll_export(app)
+    assert app.notifier.shown == [("2 eventos exportados…", True), ("4 eventos exportados…", True),
+                                  ("4 eventos exportados a out.csv.", False)]
+    assert app.root.scheduled == []
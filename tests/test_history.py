@@ -0,0 +1,56 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from history import HistoryStore, hour_slices
+
+def at(hour, minute=0):
+    return datetime(2026, 3, 2, hour, minute).timestamp()
+
+def test_hour_slices_split_across_hours():
+    slices = list(hour_slices(at(10, 10), 20 * 60))
+    day = datetime(2026, 3, 2).toordinal()
+    assert [(d, h) for d, h, _ in slices] == [(day, 9), (day, 10)]
+    assert [s for _, _, s in slices] == pytest.approx([600, 600])
+
+def test_rollups_and_statements(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = HistoryStore(path)
+    store.record("start", "Pomodoro", 1500, 0, at(9))
+    store.record("pause", "Pomodoro", 1500, 300, at(9, 5))
+    store.record("finish", "Pomodoro", 1500, 1500, at(9, 30))
+    store.record("reset", "Pomodoro", 1500, 600, at(11, 5))
+    store.record("finish", "Descanso Corto", 300, 300, at(11, 10))
+    store.execute("CREATE TABLE notes (text TEXT)")
+    store.execute("INSERT INTO notes VALUES (?)", ("hola",))
+    store.close()
+
+    day = datetime(2026, 3, 2).date()
+    conn = sqlite3.connect(path)
+    daily = conn.execute("SELECT mode, completed, abandoned, pauses, seconds FROM daily "
+                         "WHERE day = ? ORDER BY mode", (day.toordinal(),)).fetchall()
+    assert daily == [(0, 1, 1, 1, 2100.0), (1, 1, 0, 0, 300.0)]
+    hourly = conn.execute("SELECT hour, mode, seconds FROM hourly ORDER BY hour, mode").fetchall()
+    assert hourly == [(9, 0, 1500.0), (10, 0, 300.0), (11, 0, 300.0), (11, 1, 300.0)]
+    assert conn.execute("SELECT text FROM notes").fetchall() == [("hola",)]
+    conn.close()
+
+    reader = HistoryStore(path)
+    try:
+        assert reader.day_count(day) == 1
+        assert reader.day_count(day, "Descanso Corto") == 1
+    finally:
+        reader.close()
+
+def test_reader_is_read_only_and_waits_for_the_schema(tmp_path):
+    # El esquema lo crea el hilo escritor; la conexión de consulta solo lee
+    store = HistoryStore(str(tmp_path / "new.db"))
+    try:
+        conn = store.connection()
+        assert conn.execute("SELECT COUNT(*) FROM daily").fetchone() == (0,)
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("CREATE TABLE notes (text TEXT)")
+        store.record("finish", "Pomodoro", 1500, 1500, at(9))
+    finally:
+        store.close()
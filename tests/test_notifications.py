@@ -0,0 +1,48 @@
+from notifications import MAX_PENDING, Notifier
+
+class FakeDesktop:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, key, title, message):
+        self.sent.append((key, message))
+
+class HeadlessNotifier(Notifier):
+    # Sin ventana: se anota lo que se mostraría y la ventana nunca tiene el foco
+    def __init__(self):
+        super().__init__(root=None, colors={}, desktop=False)
+        self.desktop = FakeDesktop()
+        self.shown = []
+
+    def has_focus(self):
+        return False
+
+    def show_current(self):
+        _, title, message, count = self.current
+        self.shown.append((title, message, count))
+
+def test_same_key_coalesces_with_count():
+    notifier = HeadlessNotifier()
+    notifier.notify("Tiempo completado", "uno", key="finish")
+    notifier.notify("Tiempo completado", "dos", key="finish")
+    assert notifier.shown[-1] == ("Tiempo completado", "dos", 2)
+
+def test_progress_updates_in_place_and_skips_desktop():
+    notifier = HeadlessNotifier()
+    notifier.notify("Exportación", "Exportando…", key="export")
+    for count in (10000, 20000):
+        notifier.notify("Exportación", f"{count} eventos exportados…", "export", progress=True)
+    notifier.notify("Exportación", "20000 eventos exportados.", "export")
+    assert notifier.shown[1:3] == [("Exportación", "10000 eventos exportados…", 1),
+                                   ("Exportación", "20000 eventos exportados…", 1)]
+    assert [message for _, message in notifier.desktop.sent] == \
+        ["Exportando…", "20000 eventos exportados."]
+
+def test_pending_queue_is_bounded():
+    notifier = HeadlessNotifier()
+    for i in range(MAX_PENDING + 3):
+        notifier.notify(f"Aviso {i}", "texto")
+    assert len(notifier.queue) == MAX_PENDING
+    assert notifier.queue[0][1] == "Aviso 3"
+    notifier.dismiss()
+    assert notifier.shown[-1][0] == "Aviso 3"
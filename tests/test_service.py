@@ -0,0 +1,55 @@
+from core import VirtualClock
+from service import TimerService
+
+def make_service():
+    clock = VirtualClock(start=1000.0)
+    service = TimerService(clock)
+    finished = []
+    service.add_listener(lambda name, mode, timer: finished.append((name, mode)))
+    return clock, service, finished
+
+def test_dispatch_finishes_due_timers_in_order():
+    clock, service, finished = make_service()
+    service.create("a", {"Pomodoro": 10})
+    service.create("b", {"Pomodoro": 5})
+    service.start("a")
+    service.start("b")
+    assert service.dispatch() == 5
+    clock.advance(5)
+    assert service.dispatch() == 5
+    clock.advance(5)
+    assert service.dispatch() is None
+    assert finished == [("b", "Pomodoro"), ("a", "Pomodoro")]
+    assert service.status("a")["mode"] == "Descanso Corto"
+
+def test_paused_timer_is_not_dispatched():
+    clock, service, finished = make_service()
+    service.create("a", {"Pomodoro": 5})
+    service.start("a")
+    service.pause("a")
+    clock.advance(10)
+    assert service.dispatch() is None
+    assert finished == []
+
+def test_recreated_timer_ignores_old_entries():
+    clock, service, finished = make_service()
+    service.create("a", {"Pomodoro": 5})
+    service.start("a")
+    service.remove("a")
+    service.create("a", {"Pomodoro": 50})
+    service.start("a")
+    clock.advance(5)
+    # La entrada del temporizador quitado no debe terminar el nuevo
+    assert service.dispatch() == 45
+    assert finished == []
+    assert service.status("a")["running"]
+
+def test_earlier_deadline_wakes_scheduler():
+    clock, service, finished = make_service()
+    service.create("a", {"Pomodoro": 10})
+    service.create("b", {"Pomodoro": 20})
+    service.start("a")
+    assert service.wakeup.is_set()
+    service.wakeup.clear()
+    service.start("b")
+    assert not service.wakeup.is_set()
@@ -0,0 +1,74 @@
+import os
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import shared_state
+from checkpoint import STATE_RUNNING
+from shared_state import SharedTimerState
+
+@pytest.fixture
+def pair(tmp_path):
+    # Líder y seguidora en el mismo proceso: flock distingue los descriptores
+    lock_path = str(tmp_path / "sync.lock")
+    name = f"pomodoro-test-{uuid.uuid4().hex[:12]}"
+    leader = SharedTimerState(lock_path, name)
+    follower = SharedTimerState(lock_path, name)
+    yield leader, follower
+    follower.close()
+    leader.close()
+
+def test_follower_reads_what_the_leader_publishes(pair):
+    leader, follower = pair
+    assert leader.leader and not follower.leader
+    leader.publish(STATE_RUNNING, "Pomodoro", 3, 1200.0, time.time() + 1200)
+    record = follower.follow()
+    assert record.pid == os.getpid() and record.mode == "Pomodoro" and record.count == 3
+    assert shared_state.format_state(record).startswith("Pomodoro ")
+
+def test_follower_takes_over_when_the_heartbeat_stops(pair, monkeypatch):
+    leader, follower = pair
+    leader.publish(STATE_RUNNING, "Pomodoro", 1, 1200.0, time.time() + 1200)
+    # La líder muere: el sistema suelta su candado y el latido deja de avanzar
+    os.close(leader.lock)
+    leader.lock = None
+    later = time.time() + shared_state.STALE_AFTER + 1
+    monkeypatch.setattr(shared_state.time, "time", lambda: later)
+    record = follower.follow()
+    assert follower.leader and record.mode == "Pomodoro"
+
+def test_follower_waits_while_the_leader_is_alive(pair):
+    leader, follower = pair
+    leader.publish(STATE_RUNNING, "Pomodoro", 1, 1200.0, time.time() + 1200)
+    follower.follow()
+    assert leader.leader and not follower.leader
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback):
+        self.scheduled.append(delay)
+        return len(self.scheduled)
+
+    def after_cancel(self, after_id):
+        pass
+
+def test_hidden_follower_keeps_a_slow_tick():
+    # Oculta, una seguidora debe seguir leyendo el latido para tomar el relevo
+    from main import PomodoroApp, TickScheduler
+    shared = SimpleNamespace(leader=False)
+    app = SimpleNamespace(api=None, shared=shared, FOLLOW_HIDDEN_SECONDS=5.0)
+    app.following = lambda: PomodoroApp.following(app)
+    scheduler = TickScheduler(FakeRoot(), lambda: 0.25)
+    scheduler.keep_alive = lambda: PomodoroApp.needs_ticks(app)
+    scheduler.on_unmap()
+    assert scheduler.root.scheduled == [5000]
+    shared.leader = True
+    scheduler.reschedule()
+    assert scheduler.root.scheduled[-1] == 251
+    app.shared = None
+    scheduler.reschedule()
+    assert len(scheduler.root.scheduled) == 2 and scheduler.after_id is None
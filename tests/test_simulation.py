@@ -0,0 +1,7 @@
+from simulation import TOLERANCE, simulate
+
+def test_simulated_days_match_history_without_drift():
+    report = simulate(days=2, pomodoros=6, seed=3)
+    assert report["pomodoros"] == 12
+    assert report["max_drift"] <= TOLERANCE
+    assert report["history_mismatches"] == {}
@@ -0,0 +1,51 @@
+from datetime import date, datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import stats
+from history import HistoryStore
+
+TODAY = date(2026, 3, 11)   # miércoles
+
+def at(day, hour):
+    return datetime(2026, 3, day, hour).timestamp()
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    # Racha del 9 al 11 y otra más larga del 2 al 5
+    for day in (2, 3, 4, 5, 9, 10, 11):
+        store.record("finish", "Pomodoro", 1500, 1500, at(day, 9))
+    store.record("reset", "Pomodoro", 1500, 600, at(11, 14))
+    store.record("pause", "Pomodoro", 1500, 300, at(11, 15))
+    store.record("finish", "Descanso Corto", 300, 300, at(11, 10))
+    store.close()
+    reader = HistoryStore(store.path)
+    yield reader
+    reader.close()
+
+def test_report_from_rollups(store):
+    report = stats.build_report(store.connection(), today=TODAY)
+    assert report["last_7_days"].tolist() == [1500, 0, 0, 0, 1500, 1500, 2100]
+    assert report["last_30_days_total"] == 7 * 1500 + 600
+    assert (report["current_streak"], report["longest_streak"]) == (3, 4)
+    focus = report["modes"]["Pomodoro"]
+    assert (focus["completed"], focus["abandoned"], focus["pauses"]) == (7, 1, 1)
+    assert focus["completion_ratio"] == pytest.approx(7 / 8)
+    assert focus["interruption_rate"] == pytest.approx(2 / 8)
+    assert report["modes"]["Descanso Largo"]["completion_ratio"] == 0.0
+
+def test_weeks_and_heatmap(store):
+    report = stats.build_report(store.connection(), today=TODAY)
+    # Semanas de lunes a domingo: 2-8 y 9-15 de marzo
+    assert report["weeks"][-2:].tolist() == [4 * 1500, 3 * 1500 + 600]
+    heatmap = report["heatmap"]
+    # Cada finalización de las 9:00 cae en la hora 8; el reinicio de las 14:00 cuenta 600 s a las 13
+    assert heatmap[TODAY.weekday(), 8] == 1500 * 2 and heatmap.sum() == 7 * 1500 + 600
+    assert "Racha actual: 3 días" in stats.format_report(report)
+
+def test_streak_broken_before_yesterday(store):
+    report = stats.build_report(store.connection(), today=date(2026, 3, 13))
+    assert report["current_streak"] == 0
@@ -0,0 +1,100 @@
+from tasks import TaskStore
+
+def make_store(tmp_path):
+    return TaskStore(str(tmp_path / "tasks.db"))
+
+def test_filter_by_word_prefixes(tmp_path):
+    store = make_store(tmp_path)
+    try:
+        informe = store.add("Escribir el informe trimestral")
+        store.add("Revisar correo")
+        revision = store.add("Revisión del informe")
+        assert store.filter("inf") == [informe, revision]
+        assert store.filter("revis inf") == [revision]
+        assert store.filter("trimestralmente") == []
+        assert store.filter("trimestral") == [informe]
+        assert len(store.filter("")) == 3
+    finally:
+        store.close()
+
+def test_filter_follows_updates_and_deletes(tmp_path):
+    store = make_store(tmp_path)
+    try:
+        task = store.add("Leer")
+        store.update(task.id, title="Estudiar")
+        assert store.filter("leer") == []
+        assert store.filter("estu") == [task]
+        store.delete(task.id)
+        assert store.filter("estu") == []
+    finally:
+        store.close()
+
+def test_next_task_by_priority(tmp_path):
+    store = make_store(tmp_path)
+    try:
+        low = store.add("Baja", priority=3)
+        high = store.add("Alta", priority=1)
+        medium = store.add("Media", priority=2)
+        assert store.next_task() is high
+        store.set_done(high.id)
+        assert store.next_task() is medium
+        store.update(low.id, priority=1)
+        assert store.next_task() is low
+        store.delete(low.id)
+        assert store.next_task() is medium
+        store.set_done(high.id, False)
+        assert store.next_task() is high
+    finally:
+        store.close()
+
+def test_tasks_persist(tmp_path):
+    store = make_store(tmp_path)
+    task = store.add("Persistir", priority=1)
+    store.add_pomodoro(task.id)
+    store.set_active(task.id)
+    store.close()
+    store = make_store(tmp_path)
+    try:
+        loaded = store.tasks[task.id]
+        assert (loaded.title, loaded.actual, loaded.active) == ("Persistir", 1, True)
+        assert store.add("Otra").id == task.id + 1
+    finally:
+        store.close()
+
+def test_deleted_ids_are_not_reused(tmp_path):
+    store = make_store(tmp_path)
+    first = store.add("Primera")
+    last = store.add("Última")
+    store.delete(last.id)
+    assert store.add("Nueva").id == last.id + 1
+    store.close()
+    store = make_store(tmp_path)
+    try:
+        newest = max(store.tasks)
+        store.delete(newest)
+        store.close()
+        store = make_store(tmp_path)
+        assert store.add("Tras reiniciar").id == newest + 1
+        assert first.id in store.tasks
+    finally:
+        store.close()
+
+def test_ids_referenced_by_history_are_not_reused(tmp_path):
+    # Tabla anterior a AUTOINCREMENT: el historial recuerda las tareas borradas
+    import sqlite3
+    path = str(tmp_path / "tasks.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT NOT NULL, "
+                 "priority INTEGER NOT NULL DEFAULT 2, estimated INTEGER NOT NULL DEFAULT 1, "
+                 "actual INTEGER NOT NULL DEFAULT 0, done INTEGER NOT NULL DEFAULT 0, "
+                 "active INTEGER NOT NULL DEFAULT 0, created REAL NOT NULL)")
+    conn.execute("INSERT INTO tasks (id, title, created) VALUES (1, 'Queda', 0)")
+    conn.execute("CREATE TABLE events (ts REAL, task INTEGER)")
+    conn.execute("INSERT INTO events VALUES (0, 7)")
+    conn.commit()
+    conn.close()
+    store = TaskStore(path)
+    try:
+        assert store.add("Nueva").id == 8
+    finally:
+        store.close()
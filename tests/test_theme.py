@@ -0,0 +1,76 @@
+import tkinter as tk
+
+import theme
+from theme import PALETTES, ThemeEngine, compile_styles, resolve_palette
+
+class FakeStyle:
+    # Sustituye a ttk.Style, que necesita pantalla
+    def __init__(self):
+        self.configured = {}
+
+    def configure(self, name, **options):
+        self.configured[name] = options
+
+    def map(self, name, **maps):
+        pass
+
+class FakeWidget:
+    def __init__(self):
+        self.options = {}
+        self.destroyed = False
+
+    def configure(self, **options):
+        if self.destroyed:
+            raise tk.TclError("invalid command name")
+        self.options.update(options)
+
+class FakeCanvas:
+    def __init__(self):
+        self.items = {}
+
+    def itemconfig(self, item, **options):
+        if item not in self.items:
+            raise tk.TclError("invalid item")
+        self.items[item].update(options)
+
+def engine(**kwargs):
+    theme_engine = ThemeEngine(None, **kwargs)
+    theme_engine.style = FakeStyle()
+    return theme_engine
+
+def test_every_palette_compiles_every_style():
+    for name in PALETTES:
+        compiled = dict((style, options) for style, options, _ in compile_styles(resolve_palette(name)))
+        assert set(compiled) == {style for style, _, _, _ in theme.STYLES}
+        assert compiled["Timer.TLabel"]["foreground"] == PALETTES[name]["primary"]
+
+def test_switch_repaints_registered_widgets_and_items():
+    theme_engine = engine()
+    frame = theme_engine.register(FakeWidget(), bg="background")
+    gone = theme_engine.register(FakeWidget(), bg="surface")
+    canvas = FakeCanvas()
+    canvas.items[1] = {}
+    theme_engine.register_item(canvas, 1, fill="primary")
+    calls = []
+    theme_engine.add_listener(lambda: calls.append(theme_engine.colors["text"]))
+    colors = theme_engine.colors
+    gone.destroyed = True
+    theme_engine.set_theme("Nord")
+    assert frame.options["bg"] == PALETTES["Nord"]["background"]
+    assert canvas.items[1]["fill"] == PALETTES["Nord"]["primary"]
+    assert calls == [PALETTES["Nord"]["text"]]
+    # Los widgets destruidos se olvidan; el diccionario de colores es el mismo
+    assert gone not in theme_engine.widgets and theme_engine.colors is colors
+    theme_engine.set_theme("Nord")
+    assert len(calls) == 1
+
+def test_mode_accents_and_compile_cache():
+    theme_engine = engine(mode_accents=True)
+    theme_engine.apply()
+    theme_engine.set_mode("Descanso Corto")
+    assert theme_engine.colors["primary"] == PALETTES["Dracula"]["secondary"]
+    assert theme_engine.style.configured["Timer.TLabel"]["foreground"] == PALETTES["Dracula"]["secondary"]
+    theme_engine.set_mode_accents(False)
+    assert theme_engine.colors["primary"] == PALETTES["Dracula"]["primary"]
+    theme_engine.precompile()
+    assert len(theme_engine.compiled) == len(PALETTES) * (1 + len(theme.MODE_ACCENTS))
@@ -0,0 +1,193 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Temas de la interfaz. Cada paleta asigna colores a roles ("background",
+# "primary", ...); los estilos ttk y los widgets de Tk se describen por rol.
+# Cada combinación de tema y acento se compila una sola vez a las opciones
+# finales de ttk, y cambiar de tema es una única pasada que reconfigura
+# estilos, widgets registrados y elementos de Canvas, sin recrear nada.
+PALETTES = {
+    "Dracula": {
+        "background": "#191A21",
+        "surface": "#282A36",
+        "primary": "#FF79C6",
+        "secondary": "#8BE9FD",
+        "accent": "#50FA7B",
+        "text": "#F8F8F2",
+        "text_secondary": "#6272A4",
+        "error": "#FF5555",
+        "warning": "#FFB86C",
+        "success": "#50FA7B",
+        "info": "#BD93F9",
+    },
+    "Nord": {
+        "background": "#2E3440",
+        "surface": "#3B4252",
+        "primary": "#88C0D0",
+        "secondary": "#81A1C1",
+        "accent": "#A3BE8C",
+        "text": "#ECEFF4",
+        "text_secondary": "#7B88A1",
+        "error": "#BF616A",
+        "warning": "#D08770",
+        "success": "#A3BE8C",
+        "info": "#B48EAD",
+    },
+    "Claro": {
+        "background": "#F5F5F7",
+        "surface": "#E4E4EA",
+        "primary": "#D6336C",
+        "secondary": "#1C7ED6",
+        "accent": "#2F9E44",
+        "text": "#212529",
+        "text_secondary": "#6C757D",
+        "error": "#E03131",
+        "warning": "#F08C00",
+        "success": "#2F9E44",
+        "info": "#7048E8",
+    },
+}
+DEFAULT_THEME = "Dracula"
+
+# Con los acentos por modo activos, el rol "primary" toma otro color en los descansos
+MODE_ACCENTS = {"Descanso Corto": "secondary", "Descanso Largo": "accent"}
+
+# (estilo, opciones fijas, opciones de color por rol, mapa de estados por rol)
+STYLES = (
+    ("Title.TLabel", {"font": ("Segoe UI", 24, "bold")},
+     {"background": "background", "foreground": "accent"}, {}),
+    ("Subtitle.TLabel", {"font": ("Segoe UI", 18, "bold")},
+     {"background": "background", "foreground": "primary"}, {}),
+    ("Timer.TLabel", {"font": ("Segoe UI", 64, "bold")},
+     {"background": "background", "foreground": "primary"}, {}),
+    ("CompactTimer.TLabel", {"font": ("Segoe UI", 28, "bold")},
+     {"background": "background", "foreground": "primary"}, {}),
+    ("Text.TLabel", {"font": ("Segoe UI", 10)},
+     {"background": "background", "foreground": "text"}, {}),
+    ("Info.TLabel", {"font": ("Segoe UI", 10)},
+     {"background": "surface", "foreground": "text"}, {}),
+    ("InfoTitle.TLabel", {"font": ("Segoe UI", 12, "bold")},
+     {"background": "surface", "foreground": "info"}, {}),
+    ("Primary.TButton", {"font": ("Segoe UI", 10, "bold")},
+     {"background": "primary"},
+     {"background": (("active", "secondary"),), "foreground": (("active", "background"),)}),
+    ("Mode.TButton", {"font": ("Segoe UI", 10)},
+     {"background": "surface"},
+     {"background": (("active", "primary"),), "foreground": (("active", "background"),)}),
+    ("Action.TButton", {"font": ("Segoe UI", 10)},
+     {"background": "surface"},
+     {"background": (("active", "accent"),), "foreground": (("active", "background"),)}),
+    ("Horizontal.TProgressbar", {"borderwidth": 0, "thickness": 10},
+     {"background": "primary", "troughcolor": "surface"}, {}),
+)
+
+def resolve_palette(name, accent=None):
+    palette = dict(PALETTES[name])
+    if accent is not None:
+        palette["primary"] = palette[accent]
+    return palette
+
+def compile_styles(palette):
+    compiled = []
+    for name, fixed, colors, states in STYLES:
+        options = dict(fixed)
+        options.update((option, palette[role]) for option, role in colors.items())
+        maps = {option: [(state, palette[role]) for state, role in spec]
+                for option, spec in states.items()}
+        compiled.append((name, options, maps))
+    return tuple(compiled)
+
+class ThemeEngine:
+    def __init__(self, root, name=DEFAULT_THEME, mode_accents=False):
+        self.root = root
+        self.name = name if name in PALETTES else DEFAULT_THEME
+        self.mode = None
+        self.mode_accents = mode_accents
+        self.style = None
+        self.compiled = {}
+        self.applied = None
+        self.widgets = {}
+        self.items = []
+        self.listeners = []
+        # Diccionario compartido con la aplicación: se actualiza en sitio
+        self.colors = resolve_palette(self.name)
+
+    def key(self):
+        accent = MODE_ACCENTS.get(self.mode) if self.mode_accents else None
+        return self.name, accent
+
+    def compile(self, key):
+        compiled = self.compiled.get(key)
+        if compiled is None:
+            palette = resolve_palette(*key)
+            compiled = self.compiled[key] = (palette, compile_styles(palette))
+        return compiled
+
+    def precompile(self):
+        # Todas las combinaciones de una vez, fuera del arranque
+        for name in PALETTES:
+            for accent in (None,) + tuple(MODE_ACCENTS.values()):
+                self.compile((name, accent))
+
+    def register(self, widget, **roles):
+        # Widget de Tk con colores propios, p. ej. register(frame, bg="background");
+        # se pinta ya con el tema actual y se repinta en cada cambio
+        widget.configure(**self.resolve(roles))
+        self.widgets[widget] = roles
+        return widget
+
+    def register_item(self, canvas, item, **roles):
+        canvas.itemconfig(item, **self.resolve(roles))
+        self.items.append((canvas, item, roles))
+        return item
+
+    def resolve(self, roles):
+        return {option: self.colors[role] for option, role in roles.items()}
+
+    def add_listener(self, callback):
+        # Para lo que calcula sus colores al dibujar (se lee de self.colors)
+        self.listeners.append(callback)
+
+    def apply(self, force=False):
+        key = self.key()
+        if key == self.applied and not force:
+            return
+        palette, styles = self.compile(key)
+        self.colors.update(palette)
+        if self.style is None:
+            self.style = ttk.Style(self.root)
+            self.style.theme_use("clam")
+        for name, options, maps in styles:
+            self.style.configure(name, **options)
+            if maps:
+                self.style.map(name, **maps)
+        for widget, roles in list(self.widgets.items()):
+            try:
+                widget.configure(**self.resolve(roles))
+            except tk.TclError:
+                del self.widgets[widget]    # destruido
+        alive = []
+        for canvas, item, roles in self.items:
+            try:
+                canvas.itemconfig(item, **self.resolve(roles))
+                alive.append((canvas, item, roles))
+            except tk.TclError:
+                pass
+        self.items = alive
+        for callback in self.listeners:
+            callback()
+        self.applied = key
+
+    def set_theme(self, name):
+        if name in PALETTES:
+            self.name = name
+            self.apply()
+
+    def set_mode(self, mode):
+        self.mode = mode
+        if self.mode_accents:
+            self.apply()
+
+    def set_mode_accents(self, enabled):
+        self.mode_accents = enabled
+        self.apply()